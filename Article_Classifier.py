@@ -0,0 +1,224 @@
+#Article_Classifier.py
+
+import argparse
+import csv
+import zlib
+from array import array
+from functools import lru_cache
+
+import numpy as np
+from scipy import optimize, sparse
+
+from Article_Store import tokenize
+
+# Settings for the linear category classifier, an alternative to keyword scoring with spaCy
+N_FEATURES = 2 ** 18  # Columns that the words and word pairs of an article are hashed to
+MAX_ITERATIONS = 300  # L-BFGS iterations while training
+MIN_DOCUMENT_FREQUENCY = 5  # Words and word pairs found in fewer training articles are ignored; raise it for large corpora
+L2_PENALTY = 1e-4  # Pulls the weights towards zero, so that words seen in a few articles are not learned by heart
+MODEL_PATH = 'category_model.npz'
+GENERAL = 'general'  # The class of articles that match no category ('general-<title> news')
+PAIR_MULTIPLIER = 0x9E3779B1  # Mixes the hashes of two adjacent words into the hash of the pair
+
+
+@lru_cache(maxsize=500000)
+def word_hash(word):
+    """
+    Return the 32-bit hash of a word. It is stable across processes and runs, so saved models stay valid.
+    """
+    return zlib.crc32(word.encode('utf-8'))
+
+
+def hashed_counts(texts):
+    """
+    Count the words and adjacent word pairs of texts into a sparse matrix of N_FEATURES columns.
+    Only the words are hashed in Python; the pairs are hashed from them with array arithmetic.
+
+    Args:
+        texts (iterable): The texts, one per row.
+    Returns:
+        scipy.sparse.csr_matrix: The term counts, one row per text.
+    """
+    hashes = array('I')
+    starts = array('q', [0])
+    for text in texts:
+        hashes.extend(map(word_hash, tokenize(text, stemming=True)))
+        starts.append(len(hashes))
+    words = np.frombuffer(hashes, dtype=np.uint32).astype(np.uint64)
+    starts = np.frombuffer(starts, dtype=np.int64)
+    rows = np.repeat(np.arange(len(starts) - 1), np.diff(starts))
+
+    # Pairs of adjacent words, leaving out those that span the end of one text and the start of the next
+    pairs = (words[:-1] * PAIR_MULTIPLIER + words[1:] + 1) % 2 ** 32
+    within = rows[:-1] == rows[1:]
+    columns = np.concatenate([words % N_FEATURES, pairs[within] % N_FEATURES]).astype(np.int32)
+    rows = np.concatenate([rows, rows[:-1][within]])
+    # Repeated terms of a text add up to a single entry holding their count
+    return sparse.csr_matrix((np.ones(len(columns), dtype=np.float32), (rows, columns)),
+                             shape=(len(starts) - 1, N_FEATURES))
+
+
+def label_of(category):
+    """
+    Return the class a category belongs to: GENERAL for the per-article 'general-... news' categories.
+    """
+    return GENERAL if category.startswith('general-') else category
+
+
+class CategoryClassifier:
+    """
+    A multinomial logistic regression over TF-IDF weighted, hashed words and word pairs of the title and summary.
+    A batch of articles is categorized with one sparse matrix multiplication, on the CPU, without NLP models.
+
+    Args:
+        categories (list): The class names, in the order of the columns of `weights`.
+        weights (numpy.ndarray): The N_FEATURES x len(categories) weights.
+        bias (numpy.ndarray): The bias of each class.
+        idf (numpy.ndarray): The inverse document frequency of each feature in the training articles.
+    """
+
+    def __init__(self, categories, weights, bias, idf):
+        self.categories = list(categories)
+        self.weights = weights
+        self.bias = bias
+        self.idf = idf
+
+    @staticmethod
+    def _tfidf(counts, idf):
+        """
+        Turn term counts into TF-IDF features, with sublinear term frequencies. The rows are not length-normalized:
+        the keywords that decide a category should weigh the same in a short summary as in a long one.
+        """
+        features = counts.astype(np.float32)
+        features.data = (1 + np.log(features.data)) * idf[features.indices]
+        return features
+
+    def features(self, pairs):
+        """
+        Return the feature matrix of articles given as (title, summary) tuples.
+        """
+        return self._tfidf(hashed_counts(title + " " + summary for title, summary in pairs), self.idf)
+
+    @classmethod
+    def train(cls, pairs, categories, max_iterations=MAX_ITERATIONS, min_document_frequency=MIN_DOCUMENT_FREQUENCY):
+        """
+        Train a classifier on articles categorized before, e.g. by the keyword categorizer, by minimizing
+        the L2-regularized cross-entropy with L-BFGS over all articles at once.
+
+        Args:
+            pairs (list): (title, summary) tuples of the articles.
+            categories (list): The category of each article.
+            max_iterations (int): The maximum number of L-BFGS iterations.
+            min_document_frequency (int): Features found in fewer training articles get no weight.
+        Returns:
+            CategoryClassifier: The trained classifier.
+        """
+        labels = [label_of(category) for category in categories]
+        names = sorted(set(labels))
+        targets = np.array([names.index(label) for label in labels])
+        counts = hashed_counts(title + " " + summary for title, summary in pairs)
+        document_frequency = np.bincount(counts.indices, minlength=N_FEATURES)
+        idf = (np.log((1 + len(pairs)) / (1 + document_frequency)) + 1).astype(np.float32)
+        features = cls._tfidf(counts, idf)
+
+        # Only the features that occur in enough training articles get a weight; the others stay zero
+        columns = np.flatnonzero(document_frequency >= min_document_frequency)
+        features = features[:, columns].astype(np.float64).tocsr()
+        features_t = features.T.tocsr()
+        shape = (len(columns), len(names))
+        rows = np.arange(len(pairs))
+
+        def loss(parameters):
+            weights, bias = parameters[:-len(names)].reshape(shape), parameters[-len(names):]
+            scores = features.dot(weights) + bias
+            scores -= scores.max(axis=1, keepdims=True)
+            probabilities = np.exp(scores)
+            totals = probabilities.sum(axis=1)
+            value = np.mean(np.log(totals) - scores[rows, targets]) + L2_PENALTY / 2 * np.sum(weights ** 2)
+            probabilities /= totals[:, None]
+            probabilities[rows, targets] -= 1  # Gradient of the cross-entropy with respect to the scores
+            probabilities /= len(pairs)
+            gradient = np.concatenate([(features_t.dot(probabilities) + L2_PENALTY * weights).ravel(),
+                                       probabilities.sum(axis=0)])
+            return value, gradient
+
+        result = optimize.minimize(loss, np.zeros(shape[0] * shape[1] + len(names)), jac=True, method='L-BFGS-B',
+                                   options={'maxiter': max_iterations})
+        weights = np.zeros((N_FEATURES, len(names)), dtype=np.float32)
+        weights[columns] = result.x[:-len(names)].reshape(shape)
+        return cls(names, weights, result.x[-len(names):].astype(np.float32), idf)
+
+    def predict(self, pairs):
+        """
+        Return the class of each article, given as (title, summary) tuples.
+        """
+        if not pairs:
+            return []
+        scores = self.features(pairs).dot(self.weights) + self.bias
+        return [self.categories[index] for index in scores.argmax(axis=1)]
+
+    def categorize(self, pairs):
+        """
+        Return the category of each article, in the format of the keyword categorizer:
+        articles of the GENERAL class get their own 'general-<title> news' category.
+        """
+        return [
+            'general-' + title + ' news' if label == GENERAL else label
+            for (title, _), label in zip(pairs, self.predict(pairs))
+        ]
+
+    def save(self, path=MODEL_PATH):
+        """
+        Save the classifier to a compressed NumPy file.
+        """
+        np.savez_compressed(path, categories=np.array(self.categories), weights=self.weights, bias=self.bias,
+                            idf=self.idf)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        """
+        Load a classifier saved with `save`.
+        """
+        with np.load(path) as model:
+            if model['weights'].shape[0] != N_FEATURES:
+                raise ValueError(f"{path} was trained with {model['weights'].shape[0]} features, not {N_FEATURES}")
+            return cls(model['categories'].tolist(), model['weights'], model['bias'], model['idf'])
+
+
+def read_categorized(path):
+    """
+    Read the (title, summary) pairs and categories of a CSV file in the format of 'categorized_news_articles.csv'.
+    """
+    with open(path, 'r', newline='', encoding='utf-8') as csvfile:
+        rows = list(csv.DictReader(csvfile))
+    return [(row['title'], row['summary']) for row in rows], [row['category'] for row in rows]
+
+
+def accuracy(classifier, pairs, categories):
+    """
+    Return the share of articles whose class the classifier predicts correctly.
+    """
+    predicted = classifier.predict(pairs)
+    return sum(label == label_of(category) for label, category in zip(predicted, categories)) / max(len(pairs), 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the category classifier on already categorized articles.")
+    parser.add_argument('csv_file', help="Categorized articles, e.g. categorized_news_articles.csv")
+    parser.add_argument('--model', default=MODEL_PATH, help="The file to save the model to")
+    parser.add_argument('--holdout', type=float, default=0.0,
+                        help="Share of the articles kept out of training to measure the accuracy on")
+    parser.add_argument('--iterations', type=int, default=MAX_ITERATIONS, help="Maximum number of L-BFGS iterations")
+    parser.add_argument('--min-df', type=int, default=MIN_DOCUMENT_FREQUENCY,
+                        help="Minimum number of training articles a word or word pair must occur in")
+    args = parser.parse_args()
+
+    pairs, categories = read_categorized(args.csv_file)
+    split = len(pairs) - int(len(pairs) * args.holdout)
+    classifier = CategoryClassifier.train(pairs[:split], categories[:split], max_iterations=args.iterations,
+                                         min_document_frequency=args.min_df)
+    classifier.save(args.model)
+    print(f"Trained on {split} articles, {len(classifier.categories)} categories; saved to {args.model}")
+    if split < len(pairs):
+        print(f"Accuracy on {len(pairs) - split} held-out articles: "
+              f"{accuracy(classifier, pairs[split:], categories[split:]):.1%}")
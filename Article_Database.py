@@ -0,0 +1,395 @@
+#Article_Database.py
+
+import argparse
+import csv
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from itertools import islice
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from Article_Store import normalize_category, parse_date
+
+# Settings for the article database shared by the scraper, the categorizer and the API
+DATABASE_PATH = 'news_articles.sqlite'
+MMAP_SIZE = 1024 * 1024 * 1024  # Bytes of the database file that reads may memory-map instead of copying
+READ_BATCH_SIZE = 5000  # Rows fetched from SQLite at a time while iterating over the articles
+ARTICLE_COLUMNS = ['title', 'summary', 'url', 'source', 'publication_date']  # Columns of 'news_articles.csv'
+TRACKING_PARAMS = {'fbclid', 'gclid', 'ref', 'from', 'ftag'}  # Query parameters (besides utm_*) that do not change the article
+
+# An article read from the database; 'category' is None until the article is categorized,
+# and 'cluster_id' until it is deduplicated (see Article_Dedup.py)
+ArticleRow = namedtuple('ArticleRow', ['id'] + ARTICLE_COLUMNS + ['category', 'cluster_id'], defaults=[None])
+ROW_COLUMNS = ', '.join(ArticleRow._fields)
+# The articles the API serves: categorized, and neither a copy nor an earlier version of another article
+SERVED = "category IS NOT NULL AND (cluster_id IS NULL OR cluster_id = id)"
+# Columns written when an article is added
+STORED_FIELDS = ARTICLE_COLUMNS + ['category', 'category_key', 'date_ordinal', 'canonical_url']
+STORED_COLUMNS = ', '.join(STORED_FIELDS)
+
+
+def _stored_row(article):
+    """
+    Return the values of the STORED_FIELDS of an article dict.
+    """
+    category = article.get('category') or None
+    return (*(article[column] for column in ARTICLE_COLUMNS), category,
+            normalize_category(category) if category else None,
+            parse_date(article['publication_date']), article.get('canonical_url') or None)
+
+
+def normalize_url(url):
+    """
+    Normalize an article URL so that different spellings of the same link compare equal:
+    lowercase the scheme and host, drop the fragment, tracking query parameters and a trailing slash.
+    Used by the scraper to recognize known URLs and by deduplication to compare canonical URLs.
+
+    Args:
+        url (str): The URL to normalize.
+    Returns:
+        str: The normalized URL.
+    """
+    parts = urlparse(url.strip())
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS]
+    path = parts.path.rstrip('/') or '/'
+    return urlunparse((parts.scheme.lower(), parts.netloc.lower(), path, parts.params, urlencode(sorted(query)), ''))
+
+
+class ArticleDatabase:
+    """
+    The articles of the pipeline in a single SQLite file, replacing the CSV files between its stages.
+    The scraper adds articles without a category, the deduplication stage assigns them to clusters of
+    copies of the same story, the categorizer fills in the category of those that have none (except for
+    copies of an earlier article), and the API serves the categorized ones (see SERVED). Rows are not rewritten
+    once served: a changed article is added as a new version (see supersede). Ids are never reused, so they
+    also tell which articles were added since a given one.
+    Every thread gets its own connection, so the API can read from its worker threads while a reload runs.
+    """
+
+    def __init__(self, path=DATABASE_PATH):
+        self.path = path
+        self.local = threading.local()
+        db = self.connection()
+        db.execute("PRAGMA journal_mode=WAL")  # Readers do not block the writer, nor the writer the readers
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, summary TEXT NOT NULL, "
+            "url TEXT NOT NULL, source TEXT NOT NULL, publication_date TEXT NOT NULL, "
+            "category TEXT, category_key TEXT, date_ordinal INTEGER, "
+            "cluster_id INTEGER, canonical_url TEXT, signature BLOB)"
+        )
+        columns = {row[1] for row in db.execute("PRAGMA table_info(articles)")}
+        for column, kind in (('cluster_id', 'INTEGER'), ('canonical_url', 'TEXT'), ('signature', 'BLOB')):
+            if column not in columns:  # Added after the first version of the database
+                db.execute(f"ALTER TABLE articles ADD COLUMN {column} {kind}")
+        # Locality-sensitive hashing buckets of the cluster representatives, see Article_Dedup.py
+        db.execute("CREATE TABLE IF NOT EXISTS lsh_buckets (band INTEGER NOT NULL, bucket INTEGER NOT NULL, "
+                   "article_id INTEGER NOT NULL)")
+        db.execute("CREATE INDEX IF NOT EXISTS lsh_buckets_bucket ON lsh_buckets (band, bucket)")
+        # Indexes for the category and date filters, and for finding the articles still to categorize
+        db.execute("CREATE INDEX IF NOT EXISTS articles_category ON articles (category_key, id)")
+        db.execute("CREATE INDEX IF NOT EXISTS articles_date ON articles (date_ordinal, id)")
+        db.execute("CREATE INDEX IF NOT EXISTS articles_uncategorized ON articles (id) WHERE category IS NULL")
+        # Indexes for deduplication: articles still to cluster, clusters and canonical URLs
+        db.execute("CREATE INDEX IF NOT EXISTS articles_unclustered ON articles (id) WHERE cluster_id IS NULL")
+        db.execute("CREATE INDEX IF NOT EXISTS articles_cluster ON articles (cluster_id)")
+        db.execute("CREATE INDEX IF NOT EXISTS articles_canonical_url ON articles (canonical_url)")
+        db.execute("CREATE INDEX IF NOT EXISTS articles_url ON articles (url)")  # For updating articles by URL
+        db.commit()
+
+    def connection(self):
+        """
+        Return the connection of the current thread, opening it on first use.
+        """
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = self.local.db = sqlite3.connect(self.path, timeout=30)
+            db.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return db
+
+    def add_articles(self, articles, replace=False):
+        """
+        Add scraped articles, without a category unless they have one (e.g. when imported from a categorized CSV).
+
+        Args:
+            articles (iterable): Article dicts with the ARTICLE_COLUMNS keys, and optionally 'category'
+                and the 'canonical_url' given by the article page.
+            replace (bool): Whether to delete all stored articles first, in the same transaction.
+        Returns:
+            int: The number of added articles.
+        """
+        db = self.connection()
+        with db:
+            if replace:
+                db.execute("DELETE FROM articles")
+                db.execute("DELETE FROM lsh_buckets")
+            return db.executemany(
+                f"INSERT INTO articles ({STORED_COLUMNS}) VALUES ({', '.join('?' * len(STORED_FIELDS))})",
+                map(_stored_row, articles),
+            ).rowcount
+
+    def upsert_articles(self, articles):
+        """
+        Add scraped articles, skipping those already stored unchanged under the same URL. An article whose
+        title or summary changed is added as a new version, which takes the place of the stored one (see
+        supersede). Stored rows are never deleted or rewritten, so the API keeps serving the articles it
+        loaded, unchanged, while a new scrape is saved.
+
+        Args:
+            articles (iterable): Article dicts, as for add_articles.
+        Returns:
+            int: The number of added articles, new versions included.
+        """
+        db = self.connection()
+        count = 0
+        with db:
+            for article in articles:
+                stored = db.execute("SELECT id, title, summary FROM articles WHERE url = ? ORDER BY id DESC LIMIT 1",
+                                    (article['url'],)).fetchone()
+                if stored is not None and (stored[1], stored[2]) == (article['title'], article['summary']):
+                    continue
+                new_id = db.execute(f"INSERT INTO articles ({STORED_COLUMNS}) "
+                                    f"VALUES ({', '.join('?' * len(STORED_FIELDS))})", _stored_row(article)).lastrowid
+                if stored is not None:
+                    self.supersede(stored[0], new_id)
+                count += 1
+        return count
+
+    def supersede(self, article_id, new_id):
+        """
+        Let a newer version of an article, e.g. republished with a new title, take its place: the article and
+        the copies in its cluster join the cluster of the new version, so that only the new version is
+        served once it is categorized. The stored rows are not rewritten, so a store loaded before keeps
+        serving consistent articles until the API reloads. Changes are only visible to other connections
+        after `commit()`.
+        """
+        db = self.connection()
+        db.execute("UPDATE articles SET cluster_id = ? WHERE id = ? OR cluster_id = ?", (new_id, article_id, article_id))
+        db.execute("DELETE FROM lsh_buckets WHERE article_id = ?", (article_id,))
+
+    def uncategorized(self, after=0, limit=None):
+        """
+        Return articles that have no category yet, in id order, leaving out copies of an earlier article.
+
+        Args:
+            after (int): Only return articles with a higher id than this one.
+            limit (int): Return at most this many articles.
+        Returns:
+            list: Dicts with the 'id', 'title' and 'summary' of the articles.
+        """
+        rows = self.connection().execute(
+            "SELECT id, title, summary FROM articles WHERE category IS NULL AND id > ? "
+            "AND (cluster_id IS NULL OR cluster_id = id) ORDER BY id LIMIT ?",
+            (after, limit if limit is not None else -1),
+        )
+        return [{'id': article_id, 'title': title, 'summary': summary} for article_id, title, summary in rows]
+
+    def set_categories(self, rows):
+        """
+        Store the category of categorized articles, given as dicts with an 'id' and a 'category'.
+        """
+        with self.connection() as db:
+            db.executemany(
+                "UPDATE articles SET category = ?, category_key = ? WHERE id = ?",
+                [(row['category'], normalize_category(row['category']), row['id']) for row in rows],
+            )
+
+    def articles(self, after=0, categorized=True):
+        """
+        Iterate over the stored articles in id order, reading them from SQLite in batches.
+
+        Args:
+            after (int): Only return articles with a higher id than this one.
+            categorized (bool): Only return the served articles: those that have a category,
+                leaving out copies and earlier versions of another article.
+        Yields:
+            ArticleRow: The articles.
+        """
+        condition = f"AND {SERVED}" if categorized else ""
+        while True:
+            rows = self.connection().execute(
+                f"SELECT {ROW_COLUMNS} FROM articles WHERE id > ? {condition} ORDER BY id LIMIT ?",
+                (after, READ_BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                return
+            yield from map(ArticleRow._make, rows)
+            after = rows[-1][0]
+
+    def get_many(self, ids, categorized=False):
+        """
+        Read articles by id.
+
+        Args:
+            ids (list): The ids of the articles.
+            categorized (bool): Only return articles that have a category.
+        Returns:
+            list: The articles that exist, in the order of `ids`.
+        """
+        found = {}
+        condition = "AND category IS NOT NULL" if categorized else ""
+        for i in range(0, len(ids), 500):  # Stay below SQLite's limit on query parameters
+            batch = ids[i:i + 500]
+            rows = self.connection().execute(
+                f"SELECT {ROW_COLUMNS} FROM articles WHERE id IN ({','.join('?' * len(batch))}) {condition}",
+                batch,
+            )
+            for row in rows:
+                found[row[0]] = ArticleRow._make(row)
+        return [found[article_id] for article_id in ids if article_id in found]
+
+    def unclustered(self, after=0, limit=None):
+        """
+        Return articles that were not deduplicated yet, in id order.
+
+        Args:
+            after (int): Only return articles with a higher id than this one.
+            limit (int): Return at most this many articles.
+        Returns:
+            list: Dicts with the 'id', 'title', 'summary', 'url', 'source' and 'canonical_url' (None unless
+                the scraper found one on the article page) of the articles.
+        """
+        rows = self.connection().execute(
+            "SELECT id, title, summary, url, source, canonical_url FROM articles "
+            "WHERE cluster_id IS NULL AND id > ? ORDER BY id LIMIT ?",
+            (after, limit if limit is not None else -1),
+        )
+        columns = ('id', 'title', 'summary', 'url', 'source', 'canonical_url')
+        return [dict(zip(columns, row)) for row in rows]
+
+    def find_by_url(self, canonical_url):
+        """
+        Return the cluster of a deduplicated article with the given canonical URL, or None if there is none.
+        """
+        row = self.connection().execute(
+            "SELECT cluster_id FROM articles WHERE canonical_url = ? AND cluster_id IS NOT NULL LIMIT 1",
+            (canonical_url,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def lsh_candidates(self, buckets):
+        """
+        Return the signatures of the cluster representatives sharing at least one bucket.
+
+        Args:
+            buckets (list): (band, bucket) pairs.
+        Returns:
+            dict: The signature (bytes) of each candidate, by id.
+        """
+        db = self.connection()
+        ids = set()
+        for band, bucket in buckets:
+            ids.update(row[0] for row in db.execute(
+                "SELECT article_id FROM lsh_buckets WHERE band = ? AND bucket = ?", (band, bucket)))
+        found = {}
+        for article_id in sorted(ids):
+            row = db.execute("SELECT signature FROM articles WHERE id = ?", (article_id,)).fetchone()
+            if row is not None:
+                found[article_id] = row[0]
+        return found
+
+    def set_cluster(self, article_id, cluster_id, canonical_url, signature, buckets=()):
+        """
+        Store the cluster of a deduplicated article. A representative (`cluster_id` equal to its id) is
+        added to the LSH `buckets`; a copy of an earlier article keeps any category it had, but is not served
+        (see SERVED). Changes are only visible to other connections after `commit()`.
+        """
+        db = self.connection()
+        db.execute("UPDATE articles SET cluster_id = ?, canonical_url = ?, signature = ? WHERE id = ?",
+                   (cluster_id, canonical_url, signature, article_id))
+        if cluster_id == article_id:
+            db.executemany("INSERT INTO lsh_buckets VALUES (?, ?, ?)",
+                           [(band, bucket, article_id) for band, bucket in buckets])
+
+    def commit(self):
+        """
+        Commit the changes made with set_cluster and supersede.
+        """
+        self.connection().commit()
+
+    def cluster_members(self, cluster_id):
+        """
+        Return the articles of a cluster, in id order.
+        """
+        rows = self.connection().execute(
+            f"SELECT {ROW_COLUMNS} FROM articles WHERE cluster_id = ? ORDER BY id", (cluster_id,))
+        return list(map(ArticleRow._make, rows))
+
+    def count(self, last=None):
+        """
+        Return the number of served articles (see articles), only counting those up to the id `last` if it is given.
+        """
+        return self.connection().execute(
+            f"SELECT COUNT(*) FROM articles WHERE {SERVED} AND id <= ?",
+            (last if last is not None else 2 ** 63 - 1,),
+        ).fetchone()[0]
+
+    def import_csv(self, path, replace=False):
+        """
+        Add the articles of a CSV file in the format of 'news_articles.csv' or 'categorized_news_articles.csv'.
+
+        Returns:
+            int: The number of imported articles.
+        """
+        with open(path, 'r', newline='', encoding='utf-8') as csvfile:
+            return self.add_articles(csv.DictReader(csvfile), replace=replace)
+
+    def export_csv(self, path, categorized=True, representatives=False):
+        """
+        Write the articles to a CSV file in the format of 'categorized_news_articles.csv',
+        or of 'news_articles.csv' with all articles if `categorized` is False.
+        If `representatives` is set, copies of an earlier article are left out.
+
+        Returns:
+            int: The number of exported articles.
+        """
+        fieldnames = ARTICLE_COLUMNS + ['category'] if categorized else ARTICLE_COLUMNS
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
+            articles = self.articles(categorized=categorized)
+            if representatives:
+                articles = (row for row in articles if row.cluster_id is None or row.cluster_id == row.id)
+            while True:
+                rows = [row[1:len(fieldnames) + 1] for row in islice(articles, READ_BATCH_SIZE)]
+                if not rows:
+                    break
+                writer.writerows(rows)
+                count += len(rows)
+        return count
+
+    def file_stat(self):
+        """
+        Return the sizes and modification times of the database file and its write-ahead log,
+        which change whenever articles are written.
+        """
+        stats = []
+        for path in (self.path, self.path + '-wal'):
+            try:
+                stat = os.stat(path)
+                stats.append((stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                stats.append(None)
+        return tuple(stats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import articles from CSV files into the article database, or export them.")
+    parser.add_argument('command', choices=['import', 'export'])
+    parser.add_argument('csv_file', help="The CSV file to read or write")
+    parser.add_argument('--database', default=DATABASE_PATH, help="The article database")
+    parser.add_argument('--replace', action='store_true', help="Delete the stored articles before importing")
+    parser.add_argument('--uncategorized', action='store_true',
+                        help="Export all articles without their category, as in 'news_articles.csv'")
+    args = parser.parse_args()
+
+    database = ArticleDatabase(args.database)
+    if args.command == 'import':
+        count = database.import_csv(args.csv_file, replace=args.replace)
+        print(f"Imported {count} articles from {args.csv_file} into {args.database}")
+    else:
+        count = database.export_csv(args.csv_file, categorized=not args.uncategorized)
+        print(f"Exported {count} articles from {args.database} to {args.csv_file}")
@@ -0,0 +1,189 @@
+#Article_Dedup.py
+
+import argparse
+import hashlib
+import logging
+import random
+import zlib
+from array import array
+
+from Article_Database import ArticleDatabase, DATABASE_PATH, normalize_url
+from Article_Store import tokenize
+
+# Settings for finding near-duplicate articles with MinHash and locality-sensitive hashing (LSH)
+SHINGLE_SIZE = 3  # Words per shingle
+NUM_HASHES = 64  # MinHash values per signature
+BANDS = 16  # LSH bands; articles sharing all NUM_HASHES // BANDS values of any band are compared
+SIMILARITY_THRESHOLD = 0.6  # Estimated Jaccard similarity above which two articles are copies of one story
+CHUNK_SIZE = 2000  # Articles deduplicated per transaction
+
+# One random 32-bit mask per MinHash value; XOR with a mask acts as a random permutation of the shingle hashes.
+# Fixed, so that signatures stored by earlier runs stay comparable.
+HASH_MASKS = [random.Random(20240101 + i).getrandbits(32) for i in range(NUM_HASHES)]
+
+
+def shingles(title, summary):
+    """
+    Return the hashes of the overlapping word sequences of an article's title and summary.
+
+    Args:
+        title (str): The article title.
+        summary (str): The article summary.
+    Returns:
+        set: The 32-bit hashes of the shingles.
+    """
+    words = tokenize(title + " " + summary, stemming=False)
+    if len(words) < SHINGLE_SIZE:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))}
+    return {zlib.crc32(' '.join(words[i:i + SHINGLE_SIZE]).encode('utf-8'))
+            for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(hashes):
+    """
+    Return the MinHash signature of a set of shingle hashes. The share of equal values in the
+    signatures of two articles estimates the Jaccard similarity of their shingle sets.
+    """
+    return array('I', [min(h ^ mask for h in hashes) for mask in HASH_MASKS])
+
+
+def lsh_buckets(signature):
+    """
+    Return the (band, bucket) pairs of a signature: a hash of each band of consecutive values.
+    Articles at the similarity threshold share at least one bucket with high probability,
+    so only those need to be compared.
+    """
+    rows = NUM_HASHES // BANDS
+    return [(band, int.from_bytes(hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(),
+                                                  digest_size=8).digest(), 'little', signed=True))
+            for band in range(BANDS)]
+
+
+def similarity(signature, other):
+    """
+    Return the estimated Jaccard similarity of two signatures.
+    """
+    return sum(a == b for a, b in zip(signature, other)) / len(signature)
+
+
+def find_cluster(database, canonical_url, signature, buckets):
+    """
+    Return the cluster an article belongs to: that of an article with the same canonical URL,
+    else that of the most similar representative above SIMILARITY_THRESHOLD, else None.
+
+    Returns:
+        tuple: The cluster id (or None), and whether it was found by canonical URL.
+    """
+    cluster_id = database.find_by_url(canonical_url)
+    if cluster_id is not None:
+        return cluster_id, True
+    best, best_similarity = None, SIMILARITY_THRESHOLD
+    for candidate, stored in database.lsh_candidates(buckets).items():
+        score = similarity(signature, array('I', stored))
+        if score >= best_similarity:
+            best, best_similarity = candidate, score
+    return best, False
+
+
+def is_new_version(representative, article):
+    """
+    Return whether an article with the same canonical URL as a cluster representative is a newer version
+    of it rather than a copy: published by the same source (or under the same URL), with a changed title
+    or summary. Copies syndicated by other sources never replace the representative.
+
+    Args:
+        representative (ArticleRow): The representative of the cluster.
+        article (dict): The article, as returned by ArticleDatabase.unclustered.
+    """
+    same_publisher = (representative.source == article['source']
+                      or normalize_url(representative.url) == normalize_url(article['url']))
+    return same_publisher and (representative.title, representative.summary) != (article['title'], article['summary'])
+
+
+def dedup_articles(database):
+    """
+    Assign every article of an article database that was not deduplicated yet to a cluster.
+    An article joins the cluster of an earlier article with the same canonical URL or a near-identical
+    title and summary; otherwise it starts its own cluster as its representative. Only representatives
+    are categorized and served. An article of the same source with the same canonical URL but a changed
+    title or summary is a newer version of the story: it becomes the representative in place of the earlier
+    one, and is categorized in turn.
+    Each article is compared only with the representatives that share an LSH bucket with it, so the cost
+    per article does not grow with the size of the corpus.
+
+    Args:
+        database (ArticleDatabase): The article database.
+    Returns:
+        tuple: The number of deduplicated articles and how many articles are no longer served because of them:
+            the copies of an earlier article, and the earlier versions replaced by a newer one.
+    """
+    total = duplicates = updates = 0
+    after = 0
+    while True:
+        rows = database.unclustered(after, CHUNK_SIZE)
+        if not rows:
+            break
+        for row in rows:
+            # Prefer the canonical URL the article page declares, which also unifies syndicated copies
+            canonical_url = normalize_url(row['canonical_url'] or row['url'])
+            signature = minhash(shingles(row['title'], row['summary']))
+            buckets = lsh_buckets(signature)
+            cluster_id, same_url = find_cluster(database, canonical_url, signature, buckets)
+            if cluster_id is None or cluster_id == row['id']:
+                # A new story, or a representative whose content was updated: it represents its own cluster
+                cluster_id = row['id']
+            elif same_url and any(is_new_version(representative, row)
+                                  for representative in database.get_many([cluster_id])):
+                # The same article republished with a new title or summary: it takes the cluster over
+                database.supersede(cluster_id, row['id'])
+                cluster_id = row['id']
+                updates += 1
+            else:
+                duplicates += 1
+            # Articles earlier in the chunk are already visible to this connection before the commit
+            database.set_cluster(row['id'], cluster_id, canonical_url, signature.tobytes(), buckets)
+        database.commit()
+        total += len(rows)
+        after = rows[-1]['id']
+    logging.info(f"Deduplicated {total} articles, {duplicates} of them copies of an earlier article "
+                 f"and {updates} newer versions of one.")
+    return total, duplicates + updates
+
+
+def dedup_database(path=DATABASE_PATH):
+    """
+    Deduplicate the new articles of the article database at `path` (see dedup_articles).
+    """
+    return dedup_articles(ArticleDatabase(path))
+
+
+def dedup_csv(input_file, output_file):
+    """
+    Remove copies of earlier articles from a CSV file in the format of 'news_articles.csv',
+    going through an in-memory article database.
+
+    Args:
+        input_file (str): The CSV file to deduplicate.
+        output_file (str): The CSV file to write the representatives to (may be the same file).
+    Returns:
+        tuple: The number of articles read and how many of them were dropped as copies.
+    """
+    database = ArticleDatabase(':memory:')
+    database.import_csv(input_file)
+    result = dedup_articles(database)
+    database.export_csv(output_file, categorized=False, representatives=True)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate articles between scraping and categorization.")
+    parser.add_argument('--csv', action='store_true',
+                        help="Remove duplicates from news_articles.csv instead of clustering the article database")
+    args = parser.parse_args()
+
+    if args.csv:
+        total, duplicates = dedup_csv('news_articles.csv', 'news_articles.csv')
+        print(f"Removed {duplicates} duplicates of {total} articles from news_articles.csv")
+    else:
+        total, duplicates = dedup_database()
+        print(f"Found {duplicates} duplicates among {total} new articles in {DATABASE_PATH}")
@@ -0,0 +1,599 @@
+#Article_Store.py
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+import math
+import re
+import uuid
+
+# Settings for the full-text search index
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+SEARCH_STEMMING = True  # Reduce words to a common stem, so that 'elections' also finds 'election'
+BM25_K1 = 1.2  # How quickly repeated occurrences of a term stop adding to the score
+BM25_B = 0.75  # How strongly long articles are penalized
+MAX_PREFIX_EXPANSIONS = 50  # Indexed terms a prefix may expand to
+
+# Articles read from the article database at a time while streaming query results
+STREAM_BATCH_SIZE = 500
+
+
+def parse_date(value):
+    """
+    Parse a 'YYYY-MM-DD' date into its proleptic Gregorian ordinal.
+
+    Args:
+        value (str): The date to parse.
+    Returns:
+        int: The ordinal of the date, or None if it is not a 'YYYY-MM-DD' date.
+    """
+    try:
+        if len(value) == 10 and value[4] == '-' and value[7] == '-':
+            return date.fromisoformat(value).toordinal()  # Much faster than strptime for the common case
+        return datetime.strptime(value, "%Y-%m-%d").toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_category(category):
+    """
+    Normalize a category name for lookups, so that filters are case-insensitive.
+    """
+    return category.lower()
+
+
+@lru_cache(maxsize=200000)
+def stem(token):
+    """
+    Reduce a word to a crude stem by stripping common English suffixes.
+    It only needs to map inflections of a word to the same string, not to produce a real word.
+    """
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    for suffix, min_length in (('ing', 6), ('ed', 5), ('es', 5), ('s', 4)):
+        if len(token) >= min_length and token.endswith(suffix) and not token.endswith('ss'):
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text, stemming=SEARCH_STEMMING):
+    """
+    Split text into lowercase alphanumeric terms, stemmed if `stemming` is set.
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    return [stem(token) for token in tokens] if stemming else tokens
+
+
+class SearchIndex:
+    """
+    An inverted full-text index over the title and summary of articles, ranked with BM25.
+    Each term maps to a posting list of article ids in ascending order (`array('I')`) and the
+    length-normalized term frequency of the term in each of those articles (`array('f')`). Postings are
+    most of the memory the store holds, so they use 4-byte ids and single-precision weights, which still
+    rank articles as double precision does except between scores equal to about seven digits.
+    A query multiplies these by the inverse document frequency of its terms, which is cheap to compute
+    per query and lets new articles be added without touching the entries of existing ones.
+    """
+
+    def __init__(self, articles, stemming=SEARCH_STEMMING):
+        """
+        Args:
+            articles (iterable): The articles to index, in ascending id order.
+            stemming (bool): Whether to index stemmed terms.
+        """
+        self.stemming = stemming
+        self.total = 0
+        self.average_length = 1
+        self.postings = {}
+        self.terms = []
+        self._add(articles, rebalance=True)
+
+    def _add(self, articles, rebalance=False):
+        """
+        Add articles with higher ids than any indexed one. Posting lists are never modified in place,
+        only replaced, so that searches running on another reference to them are not affected.
+        The average article length is only recomputed when `rebalance` is set, i.e. on a full build.
+        """
+        term_counts = {}  # term -> ([ids], [occurrences]), with ids in the order the articles come in
+        lengths = {}
+        for article in articles:
+            terms = tokenize(article.title + " " + article.summary, self.stemming)
+            lengths[article.id] = len(terms)
+            for term, count in Counter(terms).items():
+                counts = term_counts.get(term)
+                if counts is None:
+                    counts = term_counts[term] = ([], [])
+                counts[0].append(article.id)
+                counts[1].append(count)
+
+        self.total += len(lengths)
+        if rebalance and lengths:
+            self.average_length = sum(lengths.values()) / len(lengths)
+        # The part of the BM25 denominator that depends only on the article length
+        norms = {i: BM25_K1 * (1 - BM25_B + BM25_B * length / self.average_length) for i, length in lengths.items()}
+        new_terms = []
+        for term, (ids, counts) in term_counts.items():
+            parts = array('f', [count * (BM25_K1 + 1) / (count + norms[i]) for i, count in zip(ids, counts)])
+            existing = self.postings.get(term)
+            if existing is None:
+                new_terms.append(term)
+                self.postings[term] = (array('I', ids), parts)
+            else:
+                self.postings[term] = (existing[0] + array('I', ids), existing[1] + parts)
+        if new_terms:
+            self.terms = sorted(self.terms + new_terms)  # For prefix lookups
+
+    def extended(self, articles):
+        """
+        Return a new index that also covers `articles`, which must have higher ids than any indexed one.
+        Posting lists of terms that do not occur in them are shared with this index, which is left unchanged.
+        """
+        index = SearchIndex.__new__(SearchIndex)
+        index.__dict__.update(self.__dict__)
+        index.postings = dict(self.postings)
+        index._add(list(articles))
+        return index
+
+    def idf(self, document_frequency):
+        """
+        Return the BM25 inverse document frequency of a term found in `document_frequency` articles.
+        """
+        return math.log(1 + (self.total - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def expand_prefix(self, prefix):
+        """
+        Return the indexed terms starting with `prefix`, shortest first, at most MAX_PREFIX_EXPANSIONS of them.
+        """
+        low = bisect_left(self.terms, prefix)
+        high = bisect_left(self.terms, prefix + '\uffff')
+        return sorted(self.terms[low:high], key=lambda term: (len(term), term))[:MAX_PREFIX_EXPANSIONS]
+
+    def term_postings(self, word, prefix=False):
+        """
+        Return the posting list of a query word, merged over all its completions if `prefix` is set.
+
+        Returns:
+            tuple: The ids, their weights, and the factor (the idf) the weights still need to be multiplied by.
+        """
+        term = stem(word) if self.stemming else word
+        if not prefix:
+            ids, parts = self.postings.get(term, (array('I'), array('f')))
+            return ids, parts, self.idf(len(ids))
+        merged = {}
+        for completion in {term, *self.expand_prefix(word)}:
+            ids, parts = self.postings.get(completion, ((), ()))
+            idf = self.idf(len(ids))
+            for i, part in zip(ids, parts):
+                if idf * part > merged.get(i, 0.0):
+                    merged[i] = idf * part
+        ids = sorted(merged)
+        return array('l', ids), array('d', [merged[i] for i in ids]), 1.0
+
+    def search(self, query, mode='and', prefix=True):
+        """
+        Find the articles matching a query, best match first.
+
+        Args:
+            query (str): The search terms.
+            mode (str): 'and' to require every term, 'or' to require any of them.
+            prefix (bool): Whether the last term also matches longer words, as while the user is typing.
+        Returns:
+            list: The ids of the matching articles, by descending score and then ascending id.
+        """
+        words = tokenize(query, stemming=False)
+        if not words:
+            return []
+        postings = [self.term_postings(word, prefix and i == len(words) - 1) for i, word in enumerate(words)]
+
+        if len(postings) == 1:
+            # The order only depends on the weights; the ids are ascending, and a stable sort keeps ties in that order
+            ids, weights, _ = postings[0]
+            return [ids[k] for k in sorted(range(len(ids)), key=weights.__getitem__, reverse=True)]
+
+        scores = {}
+        if mode == 'or':
+            for ids, weights, factor in postings:
+                for i, weight in zip(ids, weights):
+                    scores[i] = scores.get(i, 0.0) + factor * weight
+            scores = {i: scores[i] for i in sorted(scores)}  # Ascending ids, so ties keep that order below
+        else:
+            # Walk the shortest posting list and look each of its ids up in the others
+            postings.sort(key=lambda posting: len(posting[0]))
+            (first_ids, first_weights, first_factor), others = postings[0], postings[1:]
+            for i, weight in zip(first_ids, first_weights):
+                score = first_factor * weight
+                for ids, weights, factor in others:
+                    position = bisect_left(ids, i)
+                    if position == len(ids) or ids[position] != i:
+                        break
+                    score += factor * weights[position]
+                else:
+                    scores[i] = score
+        return sorted(scores, key=scores.__getitem__, reverse=True)
+
+
+class TextColumn:
+    """
+    Strings stored back to back as UTF-8 in one shared buffer, with the offset where each of them ends.
+    A string costs its encoded size plus 8 bytes, and is only decoded when it is read.
+    Values are only ever appended, so readers of the first values are not affected by later appends.
+    """
+    __slots__ = ('buffer', 'ends')
+
+    def __init__(self, buffer=None, ends=None):
+        self.buffer = bytearray() if buffer is None else buffer
+        self.ends = array('q') if ends is None else ends
+
+    def append(self, value):
+        self.buffer += value.encode('utf-8')
+        self.ends.append(len(self.buffer))
+
+    def __getitem__(self, position):
+        start = self.ends[position - 1] if position else 0
+        return self.buffer[start:self.ends[position]].decode('utf-8')
+
+    def truncated(self, length):
+        """
+        Return a copy holding only the first `length` values.
+        """
+        end = self.ends[length - 1] if length else 0
+        return TextColumn(self.buffer[:end], self.ends[:length])
+
+
+class CodeColumn:
+    """
+    Strings that repeat a lot, such as sources and categories, stored as integer codes into a table
+    holding a single copy of each distinct value.
+    """
+    __slots__ = ('values', 'codes', 'lookup')
+
+    def __init__(self, values=None, codes=None, lookup=None):
+        self.values = [] if values is None else values
+        self.codes = array('i') if codes is None else codes
+        self.lookup = {} if lookup is None else lookup  # value -> code
+
+    def append(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, position):
+        return self.values[self.codes[position]]
+
+    def truncated(self, length):
+        """
+        Return a copy holding only the first `length` values.
+        """
+        return CodeColumn(list(self.values), self.codes[:length], dict(self.lookup))
+
+
+class ArticleColumns:
+    """
+    The articles of an ArticleStore, field by field, by position: the order they were added in, which is
+    also ascending id order. Ids and date ordinals are kept in arrays; titles, summaries and URLs in
+    TextColumns and sources and categories in CodeColumns, unless `text` is False because the articles
+    are read from an ArticleDatabase. Publication dates are only kept as text when they are not in
+    'YYYY-MM-DD' form.
+    """
+
+    def __init__(self, text=True):
+        self.ids = array('q')
+        self.dates = array('l')  # Date ordinal of each article, 0 if its publication date is not a date
+        self.text = text
+        if text:
+            self.titles = TextColumn()
+            self.summaries = TextColumn()
+            self.urls = TextColumn()
+            self.sources = CodeColumn()
+            self.categories = CodeColumn()
+            self.clusters = array('q')  # Cluster id of each article, 0 if it was not deduplicated
+            self.raw_dates = {}  # position -> publication date that cannot be rebuilt from its ordinal
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, article):
+        """
+        Add an article, with a higher id than any added one.
+        """
+        if self.ids and article.id <= self.ids[-1]:
+            raise ValueError(f"Article id {article.id} is not higher than the stored ids")
+        ordinal = parse_date(article.publication_date)
+        if self.text:
+            value = article.publication_date
+            if ordinal is None or len(value) != 10 or value[4] != '-' or value[7] != '-':
+                self.raw_dates[len(self.ids)] = value  # Not in the form the ordinal is turned back into
+            self.titles.append(article.title)
+            self.summaries.append(article.summary)
+            self.urls.append(article.url)
+            self.sources.append(article.source)
+            self.categories.append(article.category)
+            self.clusters.append(getattr(article, 'cluster_id', None) or 0)
+        self.dates.append(ordinal or 0)
+        self.ids.append(article.id)  # Last, so that the article is complete once it is counted
+
+    def position(self, article_id, length):
+        """
+        Return the position of an article among the first `length` ones, or None if it is not there.
+        """
+        position = bisect_left(self.ids, article_id, 0, length)
+        return position if position < length and self.ids[position] == article_id else None
+
+    def truncated(self, length):
+        """
+        Return a copy holding only the first `length` articles.
+        """
+        columns = ArticleColumns(self.text)
+        columns.ids = self.ids[:length]
+        columns.dates = self.dates[:length]
+        if self.text:
+            for name in ('titles', 'summaries', 'urls', 'sources', 'categories'):
+                setattr(columns, name, getattr(self, name).truncated(length))
+            columns.clusters = self.clusters[:length]
+            columns.raw_dates = {position: value for position, value in self.raw_dates.items() if position < length}
+        return columns
+
+
+class ArticleRecord:
+    """
+    A read-only view of one article of an ArticleColumns. Its fields are decoded when they are read,
+    so serializing only some fields of an article only decodes those.
+    """
+    __slots__ = ('columns', 'position')
+
+    def __init__(self, columns, position):
+        self.columns = columns
+        self.position = position
+
+    @property
+    def id(self):
+        return self.columns.ids[self.position]
+
+    @property
+    def title(self):
+        return self.columns.titles[self.position]
+
+    @property
+    def summary(self):
+        return self.columns.summaries[self.position]
+
+    @property
+    def url(self):
+        return self.columns.urls[self.position]
+
+    @property
+    def source(self):
+        return self.columns.sources[self.position]
+
+    @property
+    def publication_date(self):
+        raw = self.columns.raw_dates.get(self.position)
+        return raw if raw is not None else date.fromordinal(self.columns.dates[self.position]).isoformat()
+
+    @property
+    def category(self):
+        return self.columns.categories[self.position]
+
+    @property
+    def cluster_id(self):
+        return self.columns.clusters[self.position] or None
+
+
+class ArticleStore:
+    """
+    An immutable, indexed collection of articles, built once when the articles are loaded.
+    Articles are held in compact ArticleColumns and referred to by their position in them.
+    - `by_category` maps each normalized category to the ascending positions of its articles.
+    - `date_keys` holds the publication date ordinals in ascending order and `date_positions` the matching
+      positions, so that a date range is found with two binary searches.
+    - `search_index` is the full-text index of the titles and summaries.
+    Queries return ArticleRecord views (or rows of the `database`) in id order, i.e. the order the
+    articles were loaded in, and their cost depends on the number of matching articles rather than
+    on the size of the corpus.
+    """
+
+    def __init__(self, articles, search=True, database=None):
+        """
+        Args:
+            articles (iterable): The articles to store, in ascending id order. They are only iterated over once.
+            search (bool): Whether to build the full-text search index.
+            database (ArticleDatabase): Where to read the returned articles from. If set, only the indexes
+                are kept in memory.
+        """
+        self.database = database
+        self.version = uuid.uuid4().hex  # Tells the contents of stores apart, e.g. for caching responses
+        self.columns = ArticleColumns(text=database is None)
+        self.count = 0  # Articles of `columns` that belong to this store, see extended
+        self.by_category = {}
+        self.category_sets = {}  # normalized category -> set of positions, see category_members
+        self.search_index = None
+        indexed = self._index(articles)
+        if search:
+            self.search_index = SearchIndex(indexed)  # Built in the same pass as the other indexes
+        for _ in indexed:  # Index the articles the search index did not consume
+            pass
+        dates = self.columns.dates
+        # A stable sort, so that articles with the same date stay in position order
+        self.date_positions = array('l', sorted((p for p in range(self.count) if dates[p]), key=dates.__getitem__))
+        self.date_keys = array('l', (dates[p] for p in self.date_positions))
+
+    def _index(self, articles):
+        """
+        Add articles to the columns and the category index, yielding each of them once it is added.
+        """
+        for article in articles:
+            self.columns.append(article)
+            self.by_category.setdefault(normalize_category(article.category), array('l')).append(self.count)
+            self.count += 1
+            yield article
+
+    def extended(self, articles):
+        """
+        Return a new store holding the articles of this one and `articles`, e.g. rows appended to the CSV file.
+        This store is left unchanged, so that requests still using it are not affected. Articles are only
+        appended to the columns, so the new store shares them with this one unless they were already extended;
+        it copies the other indexes and shares the posting lists of search terms that do not occur in `articles`.
+
+        Args:
+            articles (iterable): The articles to add, with higher ids than any stored article.
+        Returns:
+            ArticleStore: The extended store.
+        """
+        articles = list(articles)
+        store = ArticleStore.__new__(ArticleStore)
+        store.database = self.database
+        store.version = uuid.uuid4().hex
+        store.columns = self.columns if len(self.columns) == self.count else self.columns.truncated(self.count)
+        store.count = self.count
+        store.by_category = {key: array('l', positions) for key, positions in self.by_category.items()}
+        store.category_sets = {}
+        store.date_keys = array('l', self.date_keys)
+        store.date_positions = array('l', self.date_positions)
+        for _ in store._index(articles):
+            ordinal = store.columns.dates[store.count - 1]
+            if ordinal:
+                # The new article is the last, so it goes after any stored article with the same date
+                position = bisect_right(store.date_keys, ordinal)
+                store.date_keys.insert(position, ordinal)
+                store.date_positions.insert(position, store.count - 1)
+        store.search_index = self.search_index.extended(articles) if self.search_index is not None else None
+        return store
+
+    def fetch(self, positions):
+        """
+        Return the articles at the given positions, in that order.
+        """
+        if self.database is not None:
+            # Rows are never rewritten once categorized, but leave out any that lost their category meanwhile
+            return self.database.get_many([self.columns.ids[position] for position in positions], categorized=True)
+        return [ArticleRecord(self.columns, position) for position in positions]
+
+    def iter_fetch(self, positions):
+        """
+        Yield the articles at the given positions, in that order, reading them from the database
+        STREAM_BATCH_SIZE at a time, so that a large result is never held in memory at once.
+        """
+        positions = iter(positions)
+        while True:
+            batch = list(islice(positions, STREAM_BATCH_SIZE))
+            if not batch:
+                return
+            yield from self.fetch(batch)
+
+    def id_at(self, position):
+        """
+        Return the id of the article at a position.
+        """
+        return self.columns.ids[position]
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def last_id(self):
+        """
+        The highest stored id, or 0 if the store is empty.
+        """
+        return self.columns.ids[self.count - 1] if self.count else 0
+
+    def get(self, article_id):
+        """
+        Return the article with the given id, or None if there is none.
+        """
+        position = self.columns.position(article_id, self.count)
+        if position is None:
+            return None
+        articles = self.fetch([position])
+        return articles[0] if articles else None
+
+    def category_members(self, key):
+        """
+        Return the positions of a normalized category as a set, built on first use and then kept.
+        """
+        members = self.category_sets.get(key)
+        if members is None:
+            members = self.category_sets[key] = frozenset(self.by_category.get(key, ()))
+        return members
+
+    def query(self, category=None, start=None, end=None, after=None, limit=None):
+        """
+        Find the articles matching all of the given filters.
+
+        Args:
+            category (str): Only return articles of this category (case-insensitive).
+            start (int): Only return articles published on or after this date ordinal.
+            end (int): Only return articles published on or before this date ordinal.
+            after (int): Only return articles with a higher id than this one (keyset pagination).
+            limit (int): Return at most this many articles.
+        Returns:
+            list: The matching articles, in id order.
+        """
+        return self.fetch(self.match_positions(category, start, end, after, limit))
+
+    def match_positions(self, category=None, start=None, end=None, after=None, limit=None):
+        """
+        Find the positions of the articles matching all of the given filters (see query), without reading
+        the articles, e.g. to stream them with iter_fetch.
+
+        Returns:
+            iterable: The positions of the matching articles, in id order; lazily computed where possible.
+        """
+        # Positions are in id order, so the articles after the cursor are those from this position on
+        first = bisect_right(self.columns.ids, after, 0, self.count) if after is not None else 0
+        positions = range(self.count)
+        if category is not None:
+            key = normalize_category(category)
+            positions = self.by_category.get(key, ())
+        if start is not None or end is not None:
+            low = bisect_left(self.date_keys, start) if start is not None else 0
+            high = bisect_right(self.date_keys, end) if end is not None else len(self.date_keys)
+            if high - low <= len(positions):
+                # The date range is the smaller candidate set: check the category of each article in it
+                positions = self.date_positions[low:high]
+                if category is not None:
+                    members = self.category_members(key)
+                    positions = [position for position in positions if position in members]
+                positions = sorted(positions)
+            else:
+                # The category is the smaller candidate set: check the date of each of its articles,
+                # stopping as soon as the page is full
+                dates = self.columns.dates
+                lowest = start if start is not None else 1
+                highest = end if end is not None else float('inf')
+                matches = (position for position in islice(positions, bisect_left(positions, first), None)
+                           if dates[position] and lowest <= dates[position] <= highest)
+                return islice(matches, limit)
+
+        offset = bisect_left(positions, first)
+        stop = offset + limit if limit is not None else None
+        return positions[offset:stop]
+
+    def search(self, query, mode='and', prefix=True, after=None, limit=None):
+        """
+        Find the articles matching a full-text query, best match first (see SearchIndex.search).
+
+        Args:
+            after (int): Only return the articles ranked below the article with this id (pagination).
+            limit (int): Return at most this many articles.
+        """
+        return self.fetch(self.search_positions(query, mode, prefix, after, limit))
+
+    def search_positions(self, query, mode='and', prefix=True, after=None, limit=None):
+        """
+        Find the positions of the articles matching a full-text query (see search), best match first,
+        without reading the articles.
+        """
+        ids = self.search_index.search(query, mode, prefix)
+        offset = 0
+        if after is not None:
+            try:
+                offset = ids.index(after) + 1
+            except ValueError:
+                return []  # The previous page ended with an article that no longer matches
+        stop = offset + limit if limit is not None else None
+        return [self.columns.position(article_id, self.count) for article_id in ids[offset:stop]]
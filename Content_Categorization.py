@@ -1,171 +1,647 @@
-#Content_Categorization.py
-
-import csv
-import nltk
-import spacy
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
-from textblob import TextBlob
-
-# Download necessary NLTK data for tokenization, stopwords, and lemmatization
-nltk.download('punkt')
-nltk.download('punkt_tab')
-nltk.download('stopwords')
-nltk.download('wordnet')
-
-# Load spaCy model for named entity recognition (NER)
-nlp = spacy.load('en_core_web_sm')
-
-# Initialize lemmatizer for reducing words to their base form
-# and load stop words for removing common words like 'the', 'is', etc.
-lemmatizer = WordNetLemmatizer()
-stop_words = set(stopwords.words('english'))
-
-# Define categories and associated keywords for text classification
-categories = {
-    'politics': ['government', 'election', 'politics', 'president', 'congress', 'senate', 'party', 'vote', 'policy', 'law'],
-    'technology': ['technology', 'software', 'hardware', 'internet', 'computer', 'AI', 'gadget', 'innovation', 'device'],
-    'sports': [
-        'sports', 'football', 'basketball', 'soccer', 'tennis', 'Olympics', 'athlete', 'competition', 'match',
-        'WWE', 'NFL', 'Shohei Ohtani', 'cycling', 'championships'
-    ],
-    'entertainment': [
-        'movie', 'music', 'celebrity', 'film', 'TV', 'Hollywood', 'show', 'theater', 'concert',
-        'Ananya Panday', 'Arshad Warsi', 'Aishwarya Rai', 'Bhumi Pednekar', 'Bollywood', 'movie reviews'
-    ],
-    'business': ['business', 'economy', 'finance', 'stock', 'market', 'trade', 'investment', 'profit', 'corporation'],
-    'health': [
-        'health', 'medicine', 'doctor', 'patient', 'treatment', 'disease', 'wellness', 'nutrition', 'exercise',
-        'ADHD', 'relationships', 'stress relief', 'enterovirus'
-    ],
-    'science': ['science', 'research', 'experiment', 'study', 'biology', 'chemistry', 'physics', 'discovery', 'theory'],
-    'travel': ['travel', 'tourism', 'vacation', 'trip', 'destination', 'flight', 'hotel', 'adventure'],
-    'lifestyle': [
-        'lifestyle', 'fashion', 'food', 'fitness', 'home', 'beauty', 'wellbeing', 'hobby', 'meditation'
-    ],
-    'reviews': ['review', 'critics', 'hate', 'good'],
-    'education': ['education', 'school', 'college', 'university', 'learning', 'student', 'teacher', 'curriculum', 'class'],
-    'news / current events': ['Hezbollah', 'Israel', 'Biden', 'Middle East conflict', 'politics'],
-    'opinion / features': ['opinions', 'features', 'commentary']
-}
-
-
-def preprocess_text(text):
-    """
-    Preprocess the given text by:
-    1. Lowercasing the text.
-    2. Tokenizing the text into words.
-    3. Lemmatizing words (reducing them to base form).
-    4. Removing stopwords and non-alphanumeric tokens.
-    
-    Args:
-        text (str): The text to be processed.
-    Returns:
-        list: A list of processed word tokens.
-    """
-    tokens = word_tokenize(text.lower())  # Tokenize the text
-    tokens = [lemmatizer.lemmatize(token) for token in tokens if token.isalnum()]  # Lemmatize and remove non-alphanumeric tokens
-    tokens = [token for token in tokens if token not in stop_words]  # Remove stop words
-    return tokens
-
-
-def extract_entities(text):
-    """
-    Extract named entities (such as people, organizations, locations) using spaCy's NER.
-    
-    Args:
-        text (str): The text to extract entities from.
-    Returns:
-        list: A list of named entities found in the text.
-    """
-    doc = nlp(text)
-    entities = [ent.text for ent in doc.ents]  # Extract named entities
-    return entities
-
-
-def get_sentiment(text):
-    """
-    Analyze the sentiment of the given text using TextBlob.
-    Sentiment polarity ranges from -1 (negative) to 1 (positive).
-    
-    Args:
-        text (str): The text to analyze for sentiment.
-    Returns:
-        float: The polarity score of the text.
-    """
-    blob = TextBlob(text)
-    return blob.sentiment.polarity
-
-
-def categorize_article(title, summary):
-    """
-    Categorize an article based on its title and summary by:
-    1. Preprocessing the text (tokenization, lemmatization, stopword removal).
-    2. Extracting named entities (people, places, etc.).
-    3. Analyzing sentiment using TextBlob.
-    4. Matching tokens and entities with predefined categories and keywords.
-    
-    Args:
-        title (str): The article title.
-        summary (str): The article summary.
-    Returns:
-        str: The most relevant category for the article.
-    """
-    tokens = preprocess_text(title + " " + summary)  # Preprocess title and summary together
-    entities = extract_entities(title + " " + summary)  # Extract named entities
-    sentiment = get_sentiment(title + " " + summary)  # Analyze sentiment
-    scores = {category: 0 for category in categories}  # Initialize scores for each category
-
-    # Score the tokens by comparing them with category keywords
-    for token in tokens:
-        for category, keywords in categories.items():
-            if token in keywords:
-                scores[category] += 1
-
-    # Also score based on named entities
-    for entity in entities:
-        for category, keywords in categories.items():
-            if entity.lower() in keywords:
-                scores[category] += 1
-
-    # Determine the best category based on the highest score
-    if max(scores.values()) > 0:
-        best_category = max(scores, key=scores.get)
-        if 'reviews' in best_category or sentiment < 0:
-            return 'reviews or opinion-based'
-        return best_category
-    else:
-        return 'general-' + title + ' news'  # If no match, return as general news
-
-
-def categorize_articles(input_file, output_file):
-    """
-    Categorize all articles from the input CSV file and save the categorized results to an output CSV file.
-    
-    Args:
-        input_file (str): The name of the input CSV file containing articles.
-        output_file (str): The name of the output CSV file to save categorized articles.
-    """
-    with open(input_file, 'r', newline='', encoding='utf-8') as infile, \
-         open(output_file, 'w', newline='', encoding='utf-8') as outfile:
-        
-        # Read articles from the input CSV
-        reader = csv.DictReader(infile)
-        # Prepare to write categorized articles with an added 'category' column
-        fieldnames = reader.fieldnames + ['category']
-        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-        
-        writer.writeheader()  # Write the header of the output CSV
-
-        # Process each article, categorize it, and write the result
-        for row in reader:
-            category = categorize_article(row['title'], row['summary'])  # Categorize each article
-            row['category'] = category  # Add the category to the article row
-            writer.writerow(row)  # Write the categorized article to the output CSV
-
-
-if __name__ == "__main__":
-    # Categorize articles from the 'news_articles.csv' file and save them to 'categorized_news_articles.csv'
-    categorize_articles('news_articles.csv', 'categorized_news_articles.csv')
-    print("Articles categorized and saved to categorized_news_articles.csv")
+#Content_Categorization.py
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from functools import lru_cache
+from itertools import islice
+from multiprocessing import Pool
+from Article_Database import ArticleDatabase, DATABASE_PATH
+
+# NLTK data needed for tokenization, stopwords, and lemmatization, with its location in the NLTK data directory
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+}
+
+# NLP models and data, loaded on first use by load_models() so that importing this module stays cheap
+nlp = None  # spaCy model for named entity recognition (NER)
+ner_disabled = []  # Only the entities are used, so every other spaCy component is skipped
+lemmatizer = None  # Reduces words to their base form
+stop_words = set()  # Common words like 'the', 'is', etc.
+word_tokenize = None
+TextBlob = None
+
+# Settings for batch categorization
+BATCH_SIZE = 256  # Texts per spaCy batch
+CHUNK_SIZE = 2000  # Rows read from the CSV and handed to a worker at a time
+
+# Settings for the persistent cache of categorization results (set the path to None to disable it)
+RESULT_CACHE_PATH = 'categorization_cache.sqlite'
+RESULT_CACHE_MAX_ENTRIES = 500000  # Entries kept before the least recently used are evicted
+RESULT_CACHE_TOUCH_BATCH = 1000  # Cache hits whose last use is recorded in one commit
+result_cache = None  # Opened on first use by get_result_cache()
+result_cache_taxonomy = None  # The categories table result_cache was opened for
+
+# Optional linear classifier (see Article_Classifier.py) used instead of keyword scoring when set
+classifier = None
+
+# Define categories and associated keywords for text classification
+categories = {
+    'politics': ['government', 'election', 'politics', 'president', 'congress', 'senate', 'party', 'vote', 'policy', 'law'],
+    'technology': ['technology', 'software', 'hardware', 'internet', 'computer', 'AI', 'gadget', 'innovation', 'device'],
+    'sports': [
+        'sports', 'football', 'basketball', 'soccer', 'tennis', 'Olympics', 'athlete', 'competition', 'match',
+        'WWE', 'NFL', 'Shohei Ohtani', 'cycling', 'championships'
+    ],
+    'entertainment': [
+        'movie', 'music', 'celebrity', 'film', 'TV', 'Hollywood', 'show', 'theater', 'concert',
+        'Ananya Panday', 'Arshad Warsi', 'Aishwarya Rai', 'Bhumi Pednekar', 'Bollywood', 'movie reviews'
+    ],
+    'business': ['business', 'economy', 'finance', 'stock', 'market', 'trade', 'investment', 'profit', 'corporation'],
+    'health': [
+        'health', 'medicine', 'doctor', 'patient', 'treatment', 'disease', 'wellness', 'nutrition', 'exercise',
+        'ADHD', 'relationships', 'stress relief', 'enterovirus'
+    ],
+    'science': ['science', 'research', 'experiment', 'study', 'biology', 'chemistry', 'physics', 'discovery', 'theory'],
+    'travel': ['travel', 'tourism', 'vacation', 'trip', 'destination', 'flight', 'hotel', 'adventure'],
+    'lifestyle': [
+        'lifestyle', 'fashion', 'food', 'fitness', 'home', 'beauty', 'wellbeing', 'hobby', 'meditation'
+    ],
+    'reviews': ['review', 'critics', 'hate', 'good'],
+    'education': ['education', 'school', 'college', 'university', 'learning', 'student', 'teacher', 'curriculum', 'class'],
+    'news / current events': ['Hezbollah', 'Israel', 'Biden', 'Middle East conflict', 'politics'],
+    'opinion / features': ['opinions', 'features', 'commentary']
+}
+
+
+# Compiled form of the categories table, built on first use (see get_keyword_index)
+keyword_index = None
+
+
+def load_taxonomy(path):
+    """
+    Load a categories table from a JSON file mapping each category to its list of keywords.
+    
+    Args:
+        path (str): The path of the JSON file.
+    Returns:
+        dict: The categories and their keywords.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_models():
+    """
+    Load the NLTK data, the spaCy model and TextBlob, once per process.
+    NLTK data is only downloaded when it is missing from the local NLTK data directory,
+    so no network call is made once it has been fetched.
+    """
+    global nlp, ner_disabled, lemmatizer, stop_words, word_tokenize, TextBlob
+    if nlp is not None:
+        return
+    import nltk
+    import spacy
+    from nltk.corpus import stopwords
+    from nltk.stem import WordNetLemmatizer
+    from nltk.tokenize import word_tokenize as nltk_word_tokenize
+    from textblob import TextBlob as textblob_TextBlob
+
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(name, quiet=True)
+
+    lemmatizer = WordNetLemmatizer()
+    stop_words = set(stopwords.words('english'))
+    word_tokenize = nltk_word_tokenize
+    TextBlob = textblob_TextBlob
+    model = spacy.load('en_core_web_sm')
+    ner_disabled = [name for name in model.pipe_names if name not in ('tok2vec', 'ner')]
+    nlp = model  # Set last, as it marks the models as loaded
+
+
+def init_worker(taxonomy, model=None):
+    """
+    Prepare a worker process to serve many categorization batches:
+    load the models and build the keyword index once, up front.
+    
+    Args:
+        taxonomy (dict): The categories table to use in the worker.
+        model (CategoryClassifier): The classifier to use instead of keyword scoring, if any.
+    """
+    global result_cache, result_cache_taxonomy
+    set_taxonomy(taxonomy)
+    set_classifier(model)
+    if model is None:
+        load_models()
+        get_keyword_index()
+    result_cache = result_cache_taxonomy = None  # Never share the parent's database connection with a worker
+
+
+def start_workers(n_process):
+    """
+    Start a pool of worker processes with the models already loaded.
+    The pool can be passed to categorize_articles repeatedly, so the models are loaded only once.
+    
+    Args:
+        n_process (int): The number of worker processes.
+    Returns:
+        multiprocessing.pool.Pool: The pool of preloaded workers.
+    """
+    return Pool(n_process, initializer=init_worker, initargs=(categories, classifier))
+
+
+def set_taxonomy(new_categories):
+    """
+    Replace the categories table used for scoring; the keyword index is rebuilt on next use.
+    
+    Args:
+        new_categories (dict): The categories and their keywords.
+    """
+    global categories, keyword_index
+    categories = new_categories
+    keyword_index = None
+
+
+def set_classifier(model):
+    """
+    Categorize with a trained classifier instead of keyword scoring, or with keyword scoring again if `model` is None.
+    The classifier needs no NLP models and does not use the result cache.
+    
+    Args:
+        model (CategoryClassifier): The classifier, e.g. from CategoryClassifier.load().
+    """
+    global classifier
+    classifier = model
+
+
+def taxonomy_version(table):
+    """
+    Return a hash identifying a categories table, so that results computed with another table are never reused.
+    It only depends on the table itself, so it is known without loading the models or building the keyword index.
+    """
+    return hashlib.sha1(json.dumps(table, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class KeywordIndex:
+    """
+    The categories table compiled for single-pass scoring.
+    Keywords are normalized with the same preprocessing as article text, so 'AI' matches 'ai'
+    and 'championships' matches its lemma. Single-word keywords go into a token -> categories map;
+    multi-word keywords such as 'Shohei Ohtani' go into a token trie that is walked from each position.
+    """
+
+    def __init__(self, categories):
+        self.categories = list(categories)
+        self.version = taxonomy_version(categories)
+        self.words = {}  # token -> categories
+        self.trie = {}  # token -> nested trie nodes; the None key holds the categories of a complete phrase
+        self.keywords = {}  # normalized keyword (tuple of tokens) -> categories, for matching whole entities
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                terms = tuple(preprocess_text(keyword))
+                if not terms:
+                    continue
+                self.keywords.setdefault(terms, set()).add(category)
+                if len(terms) == 1:
+                    self.words.setdefault(terms[0], set()).add(category)
+                else:
+                    node = self.trie
+                    for term in terms:
+                        node = node.setdefault(term, {})
+                    node.setdefault(None, set()).add(category)
+
+    def score(self, tokens, entities):
+        """
+        Score every category by the keywords found in the tokens and the named entities.
+        
+        Args:
+            tokens (list): The preprocessed tokens of the article text.
+            entities (list): The named entities found in the article text.
+        Returns:
+            dict: The score of each category, in the order of the categories table.
+        """
+        scores = dict.fromkeys(self.categories, 0)
+        for i, token in enumerate(tokens):
+            for category in self.words.get(token, ()):
+                scores[category] += 1
+            # Follow the trie as far as the following tokens allow, counting every phrase completed on the way
+            node = self.trie.get(token)
+            j = i + 1
+            while node is not None:
+                for category in node.get(None, ()):
+                    scores[category] += 1
+                node = node.get(tokens[j]) if j < len(tokens) else None
+                j += 1
+        for entity in entities:
+            for category in self.keywords.get(tuple(preprocess_text(entity)), ()):
+                scores[category] += 1
+        return scores
+
+
+def get_keyword_index():
+    """
+    Return the keyword index of the current categories table, building it on first use.
+    """
+    global keyword_index
+    if keyword_index is None:
+        keyword_index = KeywordIndex(categories)
+    return keyword_index
+
+
+class ResultCache:
+    """
+    A persistent SQLite memo of categorization results, keyed by a hash of the title, summary
+    and categories table version. Entries of other table versions are dropped when the cache is opened,
+    and the least recently used entries are evicted beyond `max_entries`. The last use of found entries is
+    recorded RESULT_CACHE_TOUCH_BATCH at a time, or with the next put_many or evict, rather than on every lookup.
+    """
+
+    def __init__(self, path, version, max_entries=RESULT_CACHE_MAX_ENTRIES):
+        self.version = version
+        self.max_entries = max_entries
+        self.touched = {}  # key -> time of its last use, not written yet
+        # Worker processes share the file, so let writers wait for each other instead of failing
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, version TEXT NOT NULL, category TEXT NOT NULL, "
+            "entities TEXT NOT NULL, sentiment REAL, used_at REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_used_at ON results (used_at)")
+        self.db.execute("DELETE FROM results WHERE version != ?", (version,))
+        self.db.commit()
+
+    def key(self, title, summary):
+        """
+        Return the cache key of an article.
+        """
+        return hashlib.sha1(f"{self.version}\0{title}\0{summary}".encode('utf-8')).hexdigest()
+
+    def get_many(self, keys):
+        """
+        Look up many keys at once and mark the found entries as recently used.
+        
+        Returns:
+            dict: The cached result (category, entities and sentiment) of every key that was found.
+        """
+        found = {}
+        unique_keys = list(set(keys))
+        for i in range(0, len(unique_keys), 500):  # Stay below SQLite's limit on query parameters
+            batch = unique_keys[i:i + 500]
+            rows = self.db.execute(
+                f"SELECT key, category, entities, sentiment FROM results WHERE key IN ({','.join('?' * len(batch))})",
+                batch,
+            )
+            for key, category, entities, sentiment in rows:
+                found[key] = {'category': category, 'entities': json.loads(entities), 'sentiment': sentiment}
+        now = time.time()
+        self.touched.update(dict.fromkeys(found, now))
+        if len(self.touched) >= RESULT_CACHE_TOUCH_BATCH:
+            self.flush()
+        return found
+
+    def _write_touched(self):
+        """
+        Write the last use of the entries found since the previous write, without committing.
+        """
+        if self.touched:
+            self.db.executemany("UPDATE results SET used_at = ? WHERE key = ?",
+                                [(used_at, key) for key, used_at in self.touched.items()])
+            self.touched = {}
+
+    def flush(self):
+        """
+        Commit the last use of the entries found since the previous commit.
+        """
+        if self.touched:
+            self._write_touched()
+            self.db.commit()
+
+    def put_many(self, results):
+        """
+        Store many results, given as a dict mapping each key to its result.
+        """
+        now = time.time()
+        self.db.executemany(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+            [(key, self.version, result['category'], json.dumps(result['entities']), result['sentiment'], now)
+             for key, result in results.items()],
+        )
+        self._write_touched()
+        self.db.commit()
+
+    def evict(self):
+        """
+        Remove the least recently used entries beyond `max_entries`.
+        
+        Returns:
+            int: The number of evicted entries.
+        """
+        self._write_touched()
+        evicted = self.db.execute(
+            "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        self.db.commit()
+        return evicted
+
+
+def get_result_cache():
+    """
+    Return the result cache for the current categories table, opening it on first use.
+    The models and the keyword index are only loaded on the first cache miss (see analyze_articles),
+    so a run whose results are all cached never loads them.
+    
+    Returns:
+        ResultCache: The cache, or None if RESULT_CACHE_PATH is None.
+    """
+    global result_cache, result_cache_taxonomy
+    # Hash the table only when it was replaced (see set_taxonomy), not on every call
+    if RESULT_CACHE_PATH and (result_cache is None or result_cache_taxonomy is not categories):
+        version = taxonomy_version(categories)
+        if result_cache is None or result_cache.version != version:
+            if result_cache is not None:
+                result_cache.flush()
+            result_cache = ResultCache(RESULT_CACHE_PATH, version)
+        result_cache_taxonomy = categories
+    return result_cache
+
+
+@lru_cache(maxsize=100000)
+def lemmatize(token):
+    """
+    Lemmatize a single token, remembering the result since the same words recur across articles.
+    """
+    return lemmatizer.lemmatize(token)
+
+
+def preprocess_text(text):
+    """
+    Preprocess the given text by:
+    1. Lowercasing the text.
+    2. Tokenizing the text into words.
+    3. Lemmatizing words (reducing them to base form).
+    4. Removing stopwords and non-alphanumeric tokens.
+    
+    Args:
+        text (str): The text to be processed.
+    Returns:
+        list: A list of processed word tokens.
+    """
+    load_models()
+    tokens = word_tokenize(text.lower())  # Tokenize the text
+    tokens = [lemmatize(token) for token in tokens if token.isalnum()]  # Lemmatize and remove non-alphanumeric tokens
+    tokens = [token for token in tokens if token not in stop_words]  # Remove stop words
+    return tokens
+
+
+def extract_entities(text):
+    """
+    Extract named entities (such as people, organizations, locations) using spaCy's NER.
+    
+    Args:
+        text (str): The text to extract entities from.
+    Returns:
+        list: A list of named entities found in the text.
+    """
+    load_models()
+    doc = nlp(text, disable=ner_disabled)
+    entities = [ent.text for ent in doc.ents]  # Extract named entities
+    return entities
+
+
+def get_sentiment(text):
+    """
+    Analyze the sentiment of the given text using TextBlob.
+    Sentiment polarity ranges from -1 (negative) to 1 (positive).
+    
+    Args:
+        text (str): The text to analyze for sentiment.
+    Returns:
+        float: The polarity score of the text.
+    """
+    load_models()
+    blob = TextBlob(text)
+    return blob.sentiment.polarity
+
+
+def categorize_article(title, summary):
+    """
+    Categorize an article based on its title and summary by:
+    1. Preprocessing the text (tokenization, lemmatization, stopword removal).
+    2. Extracting named entities (people, places, etc.).
+    3. Analyzing sentiment using TextBlob.
+    4. Matching tokens and entities with predefined categories and keywords.
+    Results of articles that were categorized before are taken from the result cache.
+    
+    Args:
+        title (str): The article title.
+        summary (str): The article summary.
+    Returns:
+        str: The most relevant category for the article.
+    """
+    return categorize_batch([(title, summary)])[0]
+
+
+def analyze_article(title, text, tokens, entities):
+    """
+    Pick the category of an article from its preprocessed tokens and named entities.
+    The sentiment is only analyzed when a category matched, since it is not needed otherwise.
+    
+    Args:
+        title (str): The article title.
+        text (str): The title and summary joined together.
+        tokens (list): The preprocessed tokens of the text.
+        entities (list): The named entities found in the text.
+    Returns:
+        dict: The 'category', the 'entities' and the 'sentiment' (None if it was not needed) of the article.
+    """
+    # Score the tokens and named entities against the category keywords in one pass
+    scores = get_keyword_index().score(tokens, entities)
+    result = {'category': None, 'entities': entities, 'sentiment': None}
+
+    # Determine the best category based on the highest score
+    if max(scores.values()) > 0:
+        best_category = max(scores, key=scores.get)
+        if 'reviews' in best_category:
+            result['category'] = 'reviews or opinion-based'
+        else:
+            result['sentiment'] = get_sentiment(text)
+            result['category'] = 'reviews or opinion-based' if result['sentiment'] < 0 else best_category
+    else:
+        result['category'] = 'general-' + title + ' news'  # If no match, return as general news
+    return result
+
+
+def analyze_articles(pairs):
+    """
+    Analyze a batch of articles. Cached results are reused; the remaining articles go through spaCy
+    all at once with only the NER components enabled, and their results are added to the cache.
+    
+    Args:
+        pairs (list): (title, summary) tuples of the articles.
+    Returns:
+        list: The result of each article (see analyze_article), in the same order.
+    """
+    cache = get_result_cache()
+    keys = [cache.key(title, summary) for title, summary in pairs] if cache else [None] * len(pairs)
+    results = cache.get_many(keys) if cache else {}
+
+    missing = [(key, title, summary) for key, (title, summary) in zip(keys, pairs) if key not in results]
+    if missing:
+        load_models()
+        texts = [title + " " + summary for _, title, summary in missing]
+        docs = nlp.pipe(texts, batch_size=BATCH_SIZE, disable=ner_disabled)
+        computed = [
+            analyze_article(title, text, preprocess_text(text), [ent.text for ent in doc.ents])
+            for (_, title, _), text, doc in zip(missing, texts, docs)
+        ]
+        if not cache:
+            return computed
+        new_results = {key: result for (key, _, _), result in zip(missing, computed)}
+        cache.put_many(new_results)
+        results.update(new_results)
+    return [results[key] for key in keys]
+
+
+def categorize_batch(pairs):
+    """
+    Categorize a batch of articles (see analyze_articles), or classify them all at once
+    if a classifier is set (see set_classifier).
+    
+    Args:
+        pairs (list): (title, summary) tuples of the articles.
+    Returns:
+        list: The category of each article, in the same order.
+    """
+    if classifier is not None:
+        return classifier.categorize(pairs)
+    return [result['category'] for result in analyze_articles(pairs)]
+
+
+def categorize_rows(rows):
+    """
+    Categorize a chunk of CSV rows in place, adding a 'category' column to each.
+    
+    Args:
+        rows (list): The article rows read from the input CSV.
+    Returns:
+        list: The same rows, with their categories.
+    """
+    row_categories = categorize_batch([(row['title'], row['summary']) for row in rows])
+    for row, category in zip(rows, row_categories):
+        row['category'] = category  # Add the category to the article row
+    return rows
+
+
+def categorize_articles(input_file, output_file, n_process=1, pool=None):
+    """
+    Categorize all articles from the input CSV file and save the categorized results to an output CSV file.
+    Rows are read in chunks and categorized in batches, optionally spread over several processes.
+    
+    Args:
+        input_file (str): The name of the input CSV file containing articles.
+        output_file (str): The name of the output CSV file to save categorized articles.
+        n_process (int): The number of worker processes to categorize with.
+        pool (multiprocessing.pool.Pool): Preloaded workers from start_workers() to use instead of starting new ones.
+    """
+    # Write to a temporary file and move it into place at the end, so that readers such as the API
+    # never see a truncated or half-written output file
+    temporary = output_file + '.tmp'
+    with open(input_file, 'r', newline='', encoding='utf-8') as infile, \
+         open(temporary, 'w', newline='', encoding='utf-8') as outfile:
+        
+        # Read articles from the input CSV
+        reader = csv.DictReader(infile)
+        # Prepare to write categorized articles with an added 'category' column
+        fieldnames = reader.fieldnames + ['category']
+        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+        
+        writer.writeheader()  # Write the header of the output CSV
+
+        # Split the articles into chunks of rows and categorize them chunk by chunk, keeping their order
+        chunks = iter(lambda: list(islice(reader, CHUNK_SIZE)), [])
+        if pool is not None:
+            for rows in pool.imap(categorize_rows, chunks):
+                writer.writerows(rows)  # Write the categorized articles to the output CSV
+        elif n_process > 1:
+            with start_workers(n_process) as workers:
+                for rows in workers.imap(categorize_rows, chunks):
+                    writer.writerows(rows)  # Write the categorized articles to the output CSV
+        else:
+            for rows in chunks:
+                writer.writerows(categorize_rows(rows))  # Write the categorized articles to the output CSV
+    os.replace(temporary, output_file)
+
+    # Keep the result cache within its size limit
+    if classifier is None and get_result_cache():
+        get_result_cache().evict()
+
+
+def categorize_database(path=DATABASE_PATH, n_process=1, pool=None):
+    """
+    Categorize the articles of the article database that have no category yet, and store their categories.
+    Articles are read and stored in chunks, so the categories of finished chunks are kept if the run stops.
+    
+    Args:
+        path (str): The path of the article database.
+        n_process (int): The number of worker processes to categorize with.
+        pool (multiprocessing.pool.Pool): Preloaded workers from start_workers() to use instead of starting new ones.
+    Returns:
+        int: The number of categorized articles.
+    """
+    database = ArticleDatabase(path)
+
+    def chunks():
+        after = 0
+        while True:
+            rows = database.uncategorized(after, CHUNK_SIZE)
+            if not rows:
+                return
+            after = rows[-1]['id']
+            yield rows
+
+    def store(results):
+        count = 0
+        for rows in results:
+            database.set_categories(rows)  # Store the categories of the chunk
+            count += len(rows)
+        return count
+
+    if pool is not None:
+        count = store(pool.imap(categorize_rows, chunks()))
+    elif n_process > 1:
+        with start_workers(n_process) as workers:
+            count = store(workers.imap(categorize_rows, chunks()))
+    else:
+        count = store(map(categorize_rows, chunks()))
+
+    # Keep the result cache within its size limit
+    if classifier is None and get_result_cache():
+        get_result_cache().evict()
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Categorize scraped news articles.")
+    parser.add_argument('--processes', type=int, default=1, help="Number of worker processes to categorize with")
+    parser.add_argument('--csv', action='store_true',
+                        help="Categorize news_articles.csv into categorized_news_articles.csv instead of the article database")
+    parser.add_argument('--taxonomy', help="JSON file mapping each category to its keywords (replaces the built-in table)")
+    parser.add_argument('--model', help="Categorize with a classifier trained by Article_Classifier.py instead of keywords")
+    args = parser.parse_args()
+    if args.taxonomy:
+        set_taxonomy(load_taxonomy(args.taxonomy))
+    if args.model:
+        from Article_Classifier import CategoryClassifier
+        set_classifier(CategoryClassifier.load(args.model))
+
+    if args.csv:
+        # Categorize articles from the 'news_articles.csv' file and save them to 'categorized_news_articles.csv'
+        categorize_articles('news_articles.csv', 'categorized_news_articles.csv', n_process=args.processes)
+        print("Articles categorized and saved to categorized_news_articles.csv")
+    else:
+        # Categorize the new articles of the article database
+        count = categorize_database(n_process=args.processes)
+        print(f"{count} articles categorized and saved to {DATABASE_PATH}")
@@ -1,103 +1,553 @@
-#News_Api.py
-
-from fastapi import FastAPI, Query, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional
-import csv
-from datetime import datetime
-from fastapi.middleware.cors import CORSMiddleware
-
-# Initialize FastAPI app
-app = FastAPI()
-
-# Enable CORS to allow cross-origin requests from any origin
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allow requests from all origins
-    allow_credentials=True,
-    allow_methods=["*"],  # Allow all HTTP methods (GET, POST, etc.)
-    allow_headers=["*"],  # Allow all headers in requests
-)
-
-# Define the Article model for the API
-class Article(BaseModel):
-    id: int
-    title: str
-    summary: str
-    url: str
-    source: str
-    publication_date: str
-    category: str
-
-# List to hold all the articles after loading from CSV
-articles = []
-
-def load_articles():
-    """
-    Load articles from the 'categorized_news_articles.csv' file
-    and populate the 'articles' list.
-    """
-    with open('categorized_news_articles.csv', 'r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for idx, row in enumerate(reader, start=1):
-            articles.append(Article(id=idx, **row))  # Append each article as an Article object
-
-# Event hook to load articles when the app starts up
-@app.on_event("startup")
-async def startup_event():
-    load_articles()  # Load articles into memory when the API starts
-
-# Endpoint to get all articles or filter based on category and/or date range
-@app.get("/articles", response_model=List[Article])
-async def get_articles(
-    category: Optional[str] = None,  # Optional category filter
-    start_date: Optional[str] = None,  # Optional start date filter (YYYY-MM-DD)
-    end_date: Optional[str] = None  # Optional end date filter (YYYY-MM-DD)
-):
-    filtered_articles = articles  # Start with all articles
-
-    # Filter by category if provided
-    if category:
-        filtered_articles = [a for a in filtered_articles if a.category.lower() == category.lower()]
-    
-    # Filter by start date if provided
-    if start_date:
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        filtered_articles = [a for a in filtered_articles if datetime.strptime(a.publication_date, "%Y-%m-%d") >= start]
-    
-    # Filter by end date if provided
-    if end_date:
-        end = datetime.strptime(end_date, "%Y-%m-%d")
-        filtered_articles = [a for a in filtered_articles if datetime.strptime(a.publication_date, "%Y-%m-%d") <= end]
-
-    return filtered_articles  # Return the filtered articles list
-
-# Endpoint to get a single article by its ID
-@app.get("/articles/{article_id}", response_model=Article)
-async def get_article(article_id: int):
-    """
-    Get a specific article by its ID.
-    Raise a 404 error if the article is not found.
-    """
-    for article in articles:
-        if article.id == article_id:  # Find the article by its ID
-            return article
-    raise HTTPException(status_code=404, detail="Article not found")  # Return 404 if not found
-
-# Endpoint to search articles based on a query string
-@app.get("/search", response_model=List[Article])
-async def search_articles(q: str = Query(..., min_length=3)):
-    """
-    Search articles based on the query string.
-    It searches both the title and summary fields.
-    """
-    results = [
-        article for article in articles
-        if q.lower() in article.title.lower() or q.lower() in article.summary.lower()
-    ]
-    return results  # Return the search results
-
-# Main entry point to run the FastAPI app using uvicorn
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)  # Run the app on localhost, port 8000
+#News_Api.py
+
+from fastapi import FastAPI, Query, HTTPException, Request
+from pydantic import BaseModel
+from typing import List, Optional
+import asyncio
+from collections import OrderedDict
+import csv
+import hashlib
+import hmac
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from Article_Database import ARTICLE_COLUMNS, ArticleDatabase, ArticleRow, DATABASE_PATH
+from Article_Store import ArticleStore, normalize_category, parse_date, tokenize
+from News_Metrics import METRICS_PATH as PIPELINE_METRICS_PATH, MetricsRegistry
+
+# Initialize FastAPI app
+app = FastAPI()
+
+# Enable CORS to allow cross-origin requests from any origin
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # Allow requests from all origins
+    allow_credentials=True,
+    allow_methods=["*"],  # Allow all HTTP methods (GET, POST, etc.)
+    allow_headers=["*"],  # Allow all headers in requests
+    expose_headers=["X-Next-After", "ETag"],  # Let browsers read the pagination cursor and the validator
+)
+
+# Limits for paginated and streamed responses
+MAX_PAGE_SIZE = 1000  # Largest accepted 'limit'
+NDJSON_BATCH_SIZE = 1000  # Articles serialized per chunk of a streamed response
+
+# Settings for reloading the articles while the API is running
+ARTICLES_DATABASE = DATABASE_PATH  # Served when it exists, instead of the CSV file
+ARTICLES_FILE = 'categorized_news_articles.csv'
+RELOAD_INTERVAL = 5  # Seconds between checks of the articles file for changes
+
+# Settings for the /admin endpoints that change the API's state. With a token, a request must send it in the
+# X-Admin-Token header; without one, only requests from this machine that do not come from a web page are accepted.
+ADMIN_TOKEN = os.environ.get('NEWS_API_ADMIN_TOKEN') or None
+LOCAL_CLIENTS = {'127.0.0.1', '::1', 'localhost'}
+
+# Settings for caching responses of /articles and /search
+RESPONSE_CACHE_MAX_ENTRIES = 1024  # Responses kept before the least recently used are evicted
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Total size of cached responses before the least recently used are evicted
+RESPONSE_MAX_AGE = RELOAD_INTERVAL  # Seconds clients may reuse a response before revalidating it with its ETag
+
+# Metrics of the API served on /metrics, together with those the pipeline saved (see News_Pipeline.py)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)  # Upper bounds (seconds)
+api_metrics = MetricsRegistry({
+    'news_api_requests_total': ('counter', "Requests answered, by route, method and status code."),
+    'news_api_request_duration_seconds': ('histogram', "Time to answer a request, by route.", REQUEST_BUCKETS),
+    'news_api_articles': ('gauge', "Articles in the served article store."),
+    'news_api_loads_total': ('counter', "Loads of the articles since the API started."),
+    'news_api_last_load_timestamp_seconds': ('gauge', "Unix time of the last load of the articles."),
+    'news_api_last_load_seconds': ('gauge', "Duration of the last load of the articles."),
+    'news_api_last_load_rows': ('gauge', "Articles read by the last load."),
+    'news_api_response_cache_requests_total': ('counter', "Lookups of the response cache, by result."),
+    'news_api_response_cache_evictions_total': ('counter', "Responses evicted from the response cache."),
+    'news_api_response_cache_entries': ('gauge', "Responses in the response cache."),
+    'news_api_response_cache_bytes': ('gauge', "Size of the responses in the response cache."),
+    'process_resident_memory_bytes': ('gauge', "Resident memory of the API process."),
+})
+
+# Define the Article model for the API
+class Article(BaseModel):
+    id: int
+    title: str
+    summary: str
+    url: str
+    source: str
+    publication_date: str
+    category: str
+    cluster_id: Optional[int] = None  # Id of the first article of the same story, if duplicates were detected
+
+# Fields that can be requested with 'fields='
+ARTICLE_FIELDS = list(Article.model_fields)
+
+# Indexed store of all the articles. It is never modified: a reload builds a new store and swaps it in,
+# so that a request keeps working on the store it started with
+store = ArticleStore([])
+
+class ResponseCache:
+    """
+    An in-memory LRU cache of serialized responses, keyed by the version of the article store
+    and the normalized query parameters. Bounded both by the number of entries and by their total size.
+    Readers run on the event loop and reloads in a worker thread, so access is guarded by a lock.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (body, headers), least recently used first
+        self.size = 0
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'evictions': 0}
+
+    def get(self, key):
+        """
+        Return the cached (body, headers) of a key and mark it as recently used, or None.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry
+
+    def put(self, key, body, headers):
+        """
+        Store a response, evicting the least recently used ones beyond the limits.
+        """
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[0])
+            self.entries[key] = (body, headers)
+            self.size += len(body)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, (evicted, _) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        """
+        Drop every cached response, e.g. when the articles were reloaded.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def report(self):
+        """
+        Return the hit/miss counters and the current size of the cache.
+        """
+        with self.lock:
+            return {**self.stats, 'entries': len(self.entries), 'bytes': self.size}
+
+response_cache = ResponseCache()
+
+# What has been loaded, to tell appended articles from rewritten ones
+load_state = {'source': None, 'offset': 0, 'digest': None, 'fieldnames': None, 'stat': None, 'next_id': 1,
+              'database': None}
+# Metrics about the last load, reported by /admin/status
+load_stats = {'last_load_at': None, 'last_load_seconds': None, 'last_load_rows': 0, 'last_load_mode': None, 'loads': 0}
+# Only one load runs at a time; readers never take it
+reload_lock = threading.Lock()
+
+def file_stat(path):
+    """
+    Return the size and modification time of a file, or None if it does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+def source_stat():
+    """
+    Return the stat of the source the articles are loaded from: the article database if there is one,
+    otherwise the CSV file.
+    """
+    if os.path.exists(ARTICLES_DATABASE):
+        return ('database', get_database().file_stat())
+    return ('csv', file_stat(ARTICLES_FILE))
+
+def get_database():
+    """
+    Return the article database, opening it on first use.
+    """
+    if load_state['database'] is None:
+        load_state['database'] = ArticleDatabase(ARTICLES_DATABASE)
+    return load_state['database']
+
+def read_database(full):
+    """
+    Build the article store from the categorized articles of the article database. Only the indexes are
+    kept in memory; the articles themselves are read from the memory-mapped database when they are returned.
+    When articles were only added or categorized after the loaded ones, just those are added to a copy
+    of the current store.
+
+    Returns:
+        tuple: The new store, the number of articles read and whether the load was incremental.
+    """
+    database = get_database()
+    last = store.last_id
+    incremental = not full and load_state['source'] == 'database' and database.count(last) == len(store)
+    if incremental:
+        articles = list(database.articles(after=last))
+        return (store.extended(articles) if articles else store), len(articles), True
+    new_store = ArticleStore(database.articles(), database=database)
+    return new_store, len(new_store), False
+
+def article_row(article_id, row):
+    """
+    Return a CSV row as an ArticleRow, raising ValueError if it lacks a field.
+    The store copies it into its compact columns; Article models are only built for responses.
+    """
+    values = [row.get(field) for field in ARTICLE_COLUMNS + ['category']]
+    if None in values:
+        raise ValueError(f"Article {article_id} is missing fields")
+    return ArticleRow(article_id, *values)
+
+def read_csv(full):
+    """
+    Build the article store from the 'categorized_news_articles.csv' file.
+    When the file only had rows appended since the last load, only those rows are parsed and added to a copy
+    of the current store.
+
+    Returns:
+        tuple: The new store, the number of articles read and whether the load was incremental.
+    """
+    with open(ARTICLES_FILE, 'rb') as csvfile:
+        data = csvfile.read()
+    # Only complete lines are loaded; a row still being written is picked up by the next load
+    end = data.rfind(b'\n') + 1
+    offset = load_state['offset']
+    incremental = (not full and load_state['source'] == 'csv' and end >= offset
+                   and hashlib.sha1(data[:offset]).digest() == load_state['digest'])
+
+    if incremental:
+        reader = csv.DictReader(io.StringIO(data[offset:end].decode('utf-8'), newline=''),
+                                fieldnames=load_state['fieldnames'])
+        articles = [article_row(idx, row) for idx, row in enumerate(reader, start=load_state['next_id'])]
+        new_store = store.extended(articles) if articles else store
+    else:
+        reader = csv.DictReader(io.StringIO(data[:end].decode('utf-8'), newline=''))
+        articles = [article_row(idx, row) for idx, row in enumerate(reader, start=1)]
+        new_store = ArticleStore(articles)
+    load_state.update(fieldnames=reader.fieldnames,  # Read from the header unless the file was only appended to
+                      offset=end, digest=hashlib.sha1(data[:end]).digest(),
+                      next_id=load_state['next_id'] + len(articles) if incremental else len(articles) + 1)
+    return new_store, len(articles), incremental
+
+def load_articles(full=False):
+    """
+    Load the categorized articles and build the indexed article store from them, from the article database
+    if there is one and otherwise from the 'categorized_news_articles.csv' file.
+    Articles added since the last load are added to a copy of the current store when possible;
+    otherwise, or if `full` is set, everything is loaded again.
+
+    Args:
+        full (bool): Whether to reload everything even if articles were only added.
+    Returns:
+        int: The number of articles loaded.
+    """
+    global store
+    with reload_lock:
+        started = time.perf_counter()
+        stat = source_stat()
+        source = stat[0]
+        new_store, rows, incremental = read_database(full) if source == 'database' else read_csv(full)
+
+        if new_store is not store:
+            store = new_store  # Swap the new store in with a single assignment
+            response_cache.clear()  # Responses of the previous store can no longer be served
+        load_state.update(source=source, stat=stat)
+        load_stats.update(last_load_at=time.time(), last_load_seconds=round(time.perf_counter() - started, 4),
+                          last_load_rows=rows, last_load_mode='incremental' if incremental else 'full',
+                          loads=load_stats['loads'] + 1)
+        return rows
+
+async def watch_articles():
+    """
+    Reload the articles in the background whenever the article database or file changes.
+    A change is only loaded once the files have stayed the same for one interval,
+    so that articles still being written are not loaded over and over.
+    """
+    previous = load_state['stat']
+    while True:
+        await asyncio.sleep(RELOAD_INTERVAL)
+        current = source_stat()
+        if current[1] is not None and current == previous and current != load_state['stat']:
+            try:
+                await asyncio.to_thread(load_articles)
+            except Exception as e:  # Keep watching: the next change may well load fine
+                logging.error(f"Error reloading the articles: {e!r}")
+        previous = current
+
+def parse_fields(fields):
+    """
+    Parse a comma-separated 'fields=' projection. The id is always included, as it is the pagination cursor.
+    Raise a 400 error for unknown fields.
+    """
+    if not fields:
+        return ARTICLE_FIELDS
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in ARTICLE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ['id'] + [field for field in ARTICLE_FIELDS if field in requested and field != 'id']
+
+def render_articles(current, positions, fields, output, limit):
+    """
+    Serialize articles straight to JSON or NDJSON, without validating them through the response model again.
+    Articles are read from the store as they are written, so an NDJSON response never holds all of them at once.
+    The positions go up to `limit + 1` so that the presence of a next page is known; in that case
+    the id of the last returned article is sent in the 'X-Next-After' header, to be passed as 'after'.
+    """
+    headers = {}
+    if limit is not None:
+        positions = list(positions)  # At most one page of positions, not articles
+        if len(positions) > limit:
+            positions = positions[:limit]
+            headers['X-Next-After'] = str(current.id_at(positions[-1]))
+    rows = ({field: getattr(article, field) for field in fields} for article in current.iter_fetch(positions))
+
+    if output == 'ndjson':
+        def lines():
+            batch = []
+            for row in rows:
+                batch.append(json.dumps(row, ensure_ascii=False))
+                if len(batch) == NDJSON_BATCH_SIZE:
+                    yield '\n'.join(batch) + '\n'
+                    batch = []
+            if batch:
+                yield '\n'.join(batch) + '\n'
+        return StreamingResponse(lines(), media_type='application/x-ndjson', headers=headers)
+    body = json.dumps(list(rows), ensure_ascii=False, separators=(',', ':'))
+    return Response(body, media_type='application/json', headers=headers)
+
+def cached_response(request, current, key, render, cache=True):
+    """
+    Serve a response from the response cache, or render and cache it.
+    Its ETag is derived from the store version and the normalized parameters in `key`, so a request
+    whose If-None-Match matches is answered with 304 Not Modified before anything is looked up.
+    Streamed (NDJSON) responses are not cached (pass `cache=False`), but get the same validators.
+
+    Args:
+        request (Request): The incoming request.
+        current (ArticleStore): The store the response is computed from.
+        key (tuple): The endpoint and its normalized parameters.
+        render (callable): Computes the response when it is not cached.
+        cache (bool): Whether the response may be served from and stored in the response cache.
+    """
+    etag = '"' + hashlib.sha1(repr((current.version, key)).encode('utf-8')).hexdigest()[:20] + '"'
+    validators = {'ETag': etag, 'Cache-Control': f"public, max-age={RESPONSE_MAX_AGE}"}
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and (if_none_match.strip() == '*' or etag in (tag.strip() for tag in if_none_match.split(','))):
+        with response_cache.lock:
+            response_cache.stats['not_modified'] += 1
+        return Response(status_code=304, headers=validators)
+
+    entry = response_cache.get((current.version, key)) if cache else None
+    if entry is None:
+        response = render()
+        response.headers.update(validators)
+        if not cache:
+            return response
+        entry = (response.body, {name: value for name, value in response.headers.items() if name == 'x-next-after'})
+        response_cache.put((current.version, key), *entry)
+        return response
+    body, headers = entry
+    return Response(body, media_type='application/json', headers={**headers, **validators})
+
+def resident_memory():
+    """
+    Return the resident memory of this process in bytes, or None where /proc is not available.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+# Count and time every request by its route, e.g. '/articles/{article_id}', so that ids do not become labels
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get('route')
+    path = route.path if route is not None else 'unmatched'
+    # Streamed responses are timed until their headers are sent
+    api_metrics.observe('news_api_request_duration_seconds', time.perf_counter() - started, route=path)
+    api_metrics.inc('news_api_requests_total', route=path, method=request.method, status=response.status_code)
+    return response
+
+# Event hook to load articles when the app starts up
+@app.on_event("startup")
+async def startup_event():
+    load_articles()  # Load articles into memory when the API starts
+    app.state.watcher = asyncio.create_task(watch_articles())  # Then keep them up to date
+
+# Event hook to stop watching the articles file when the app shuts down
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.watcher.cancel()
+
+# Endpoint to get all articles or filter based on category and/or date range
+@app.get("/articles", response_model=List[Article])
+async def get_articles(
+    request: Request,
+    category: Optional[str] = None,  # Optional category filter
+    start_date: Optional[str] = None,  # Optional start date filter (YYYY-MM-DD)
+    end_date: Optional[str] = None,  # Optional end date filter (YYYY-MM-DD)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),  # Optional page size
+    after: Optional[int] = None,  # Id of the last article of the previous page
+    fields: Optional[str] = None,  # Optional comma-separated list of fields to return
+    output: str = Query('json', alias='format', pattern='^(json|ndjson)$')  # 'ndjson' streams one article per line
+):
+    # Parse the date filters once; the store compares them against pre-parsed publication dates
+    start = parse_date(start_date) if start_date else None
+    end = parse_date(end_date) if end_date else None
+    if (start_date and start is None) or (end_date and end is None):
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+
+    selected = parse_fields(fields)
+    current = store  # Serve the whole request from the same store, even if a reload swaps it meanwhile
+
+    def render():
+        # Look up the articles matching the category and date range in the store's indexes
+        positions = current.match_positions(category=category or None, start=start, end=end,
+                                            after=after, limit=limit + 1 if limit else None)
+        return render_articles(current, positions, selected, output, limit)
+
+    key = ('articles', normalize_category(category) if category else None, start, end, limit, after,
+           tuple(selected), output)
+    return cached_response(request, current, key, render, cache=output == 'json')
+
+# Endpoint to get a single article by its ID
+@app.get("/articles/{article_id}", response_model=Article)
+async def get_article(article_id: int):
+    """
+    Get a specific article by its ID.
+    Raise a 404 error if the article is not found.
+    """
+    article = store.get(article_id)  # Find the article by its ID
+    if article is None:
+        raise HTTPException(status_code=404, detail="Article not found")  # Return 404 if not found
+    return Article.model_validate(article, from_attributes=True)
+
+# Endpoint to get the other copies of an article's story, e.g. the same wire story from another source
+@app.get("/articles/{article_id}/duplicates")
+async def get_duplicates(article_id: int):
+    """
+    Get the articles found to be copies of the same story as the given article, which are not served
+    on their own. Only known when the articles come from the article database.
+    Raise a 404 error if the article is not found.
+    """
+    current = store
+    article = current.get(article_id)
+    if article is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    if current.database is None or article.cluster_id is None:
+        return []
+    return [{'id': copy.id, 'title': copy.title, 'url': copy.url, 'source': copy.source,
+             'publication_date': copy.publication_date}
+            for copy in current.database.cluster_members(article.cluster_id) if copy.id != article.id]
+
+# Endpoint to search articles based on a query string
+@app.get("/search", response_model=List[Article])
+async def search_articles(
+    request: Request,
+    q: str = Query(..., min_length=3),
+    mode: str = Query('and', pattern='^(and|or)$'),  # Require all terms ('and') or any of them ('or')
+    prefix: bool = True,  # Let the last term match longer words, for search-as-you-type
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),  # Optional page size
+    after: Optional[int] = None,  # Id of the last article of the previous page
+    fields: Optional[str] = None,  # Optional comma-separated list of fields to return
+    output: str = Query('json', alias='format', pattern='^(json|ndjson)$')  # 'ndjson' streams one article per line
+):
+    """
+    Search articles based on the query string.
+    It searches both the title and summary fields through the full-text index
+    and returns the best matches first.
+    """
+    selected = parse_fields(fields)
+    current = store  # Serve the whole request from the same store, even if a reload swaps it meanwhile
+
+    def render():
+        positions = current.search_positions(q, mode=mode, prefix=prefix, after=after,
+                                             limit=limit + 1 if limit else None)
+        return render_articles(current, positions, selected, output, limit)  # Return the ranked search results
+
+    # Queries with the same words give the same results, whatever their case and punctuation
+    key = ('search', ' '.join(tokenize(q, stemming=False)), mode, prefix, limit, after, tuple(selected), output)
+    return cached_response(request, current, key, render, cache=output == 'json')
+
+def check_admin(request: Request):
+    """
+    Reject a request to an /admin endpoint that changes the API's state unless it is allowed (see ADMIN_TOKEN).
+    A request carrying an Origin header was sent by a web page, which CORS would otherwise let through.
+
+    Args:
+        request (Request): The incoming request.
+    Raises:
+        HTTPException: 403 when the request is not allowed.
+    """
+    if ADMIN_TOKEN is not None:
+        allowed = hmac.compare_digest(request.headers.get('x-admin-token', '').encode('utf-8'), ADMIN_TOKEN.encode('utf-8'))
+    else:
+        allowed = request.client is not None and request.client.host in LOCAL_CLIENTS and 'origin' not in request.headers
+    if not allowed:
+        raise HTTPException(status_code=403, detail="Not allowed")
+
+# Endpoint to reload the articles file now, instead of waiting for the watcher to notice the change
+@app.post("/admin/reload")
+async def reload_articles(request: Request, full: bool = False):  # 'full' reloads the whole file, not just appended rows
+    check_admin(request)
+    try:
+        rows = await asyncio.to_thread(load_articles, full)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {e}")
+    return {'rows': rows, 'articles': len(store), **load_stats, 'response_cache': response_cache.report()}
+
+# Endpoint to report the size of the corpus, metrics about the last load and the response cache statistics
+@app.get("/admin/status")
+async def get_status():
+    return {'articles': len(store), **load_stats, 'response_cache': response_cache.report()}
+
+# Endpoint to report the metrics of the API and of the pipeline in the Prometheus text format
+@app.get("/metrics")
+async def get_metrics():
+    api_metrics.set('news_api_articles', len(store))
+    api_metrics.set('news_api_loads_total', load_stats['loads'])
+    if load_stats['last_load_at'] is not None:
+        api_metrics.set('news_api_last_load_timestamp_seconds', load_stats['last_load_at'])
+        api_metrics.set('news_api_last_load_seconds', load_stats['last_load_seconds'])
+        api_metrics.set('news_api_last_load_rows', load_stats['last_load_rows'])
+    cache = response_cache.report()
+    for result in ('hits', 'misses', 'not_modified'):
+        api_metrics.set('news_api_response_cache_requests_total', cache[result], result=result)
+    api_metrics.set('news_api_response_cache_evictions_total', cache['evictions'])
+    api_metrics.set('news_api_response_cache_entries', cache['entries'])
+    api_metrics.set('news_api_response_cache_bytes', cache['bytes'])
+    memory = resident_memory()
+    if memory is not None:
+        api_metrics.set('process_resident_memory_bytes', memory)
+
+    body = api_metrics.render()
+    try:
+        body += MetricsRegistry.load(PIPELINE_METRICS_PATH).render()
+    except (OSError, ValueError, KeyError) as e:
+        logging.error(f"Error reading the pipeline metrics: {e}")
+    return Response(body, media_type='text/plain; version=0.0.4; charset=utf-8')
+
+# Main entry point to run the FastAPI app using uvicorn
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000)  # Run the app on localhost, port 8000
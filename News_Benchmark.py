@@ -0,0 +1,987 @@
+#News_Benchmark.py
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+import csv
+import glob
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+import requests
+
+from Article_Database import ARTICLE_COLUMNS
+from Article_Store import ArticleStore, parse_date
+import News_Scraper
+from News_Sources import FRONT_PAGE_PRIORITY, SOURCES, ListingPage, ListingRule, Source
+
+# Canned article page served by the local stand-in for the news sites
+ARTICLE_PAGE = """<html><head><title>Article {id}</title></head><body>
+<h1>Article {id}</h1>
+<p>Paragraph one of article {id} covers the government and the economy.</p>
+<p>Paragraph two of article {id} talks about football and the championships.</p>
+<p>Paragraph three of article {id} mentions a new film and its music.</p>
+<p>Paragraph four of article {id} is not part of the summary.</p>
+</body></html>"""
+
+
+def synthetic_article_page(paragraphs=40):
+    """
+    Builds a page shaped like a real news article: a large head with scripts and styles,
+    navigation markup, and then the article paragraphs.
+    """
+    script = "<script>var config = {" + ",".join(f"'key{i}': '{'x' * 40}'" for i in range(1500)) + "};</script>"
+    nav = "<nav>" + "".join(f"<a href='/section/{i}'>Section {i}</a>" for i in range(300)) + "</nav>"
+    body = "".join(
+        f"<p>Paragraph {i} of the story, with <b>bold</b> and <a href='/x'>linked</a> words in it.</p>"
+        for i in range(paragraphs)
+    )
+    return f"<html><head>{script}<style>{'.c{color:red}' * 2000}</style></head><body>{nav}<article>{body}</article></body></html>"
+
+
+# Malformed article pages, on which parsers that repair the tree differently give different summaries
+MALFORMED_PAGES = [
+    b"<html><body><p>One<p>Two<p>Three<p>Four</body></html>",
+    b"<html><body><p>Intro <div>block</div> tail</p><p>B</p><p>C</p></body></html>",
+    b"<html><body><p>Open <b>bold <i>both</p><p>B</b> after</i></p><p>C</body></html>",
+    b"<html><body><table><p>In a table</p></table><p>B</p></body><p>After the body</p></html>",
+    # The first paragraph is never closed, so its text runs on to the end of the page
+    b"<html><body><p>Lead <p>B</p><p>C</p><p>D</p><div>" + b"x" * 40000 + b"</div><p>Later</p></body></html>",
+    b"<html><head><script>var p = '<p>';</script></head><body><!-- <p> --><P>A</P ><p>B</p><p>C</p></body></html>",
+]
+
+
+@contextmanager
+def serve_fixtures(pages, latency=0.0, hosts=1):
+    """
+    Runs local HTTP servers that stand in for the news sites.
+    Every server serves the same pages, so each one behaves like a separate host.
+    Args:
+        pages (dict): Maps a request path to the HTML returned for it; other paths get ARTICLE_PAGE.
+        latency (float): Artificial delay, in seconds, added to every response.
+        hosts (int): The number of servers (hosts) to start.
+    Yields:
+        list: The base URLs of the running servers.
+    """
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            body = pages.get(self.path, ARTICLE_PAGE.format(id=self.path.strip('/'))).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep the benchmark output readable
+
+    servers = [ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler) for _ in range(hosts)]
+    for server in servers:
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield [f"http://127.0.0.1:{server.server_address[1]}" for server in servers]
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+def bench_summaries(args):
+    """
+    Compares sequential and concurrent article-summary fetching against the local stand-in.
+    """
+    with serve_fixtures({}, latency=args.latency, hosts=args.hosts) as base_urls:
+        urls = [f"{base_urls[i % len(base_urls)]}/article-{i}" for i in range(args.articles)]
+
+        start = time.perf_counter()
+        sequential = [News_Scraper.get_article_summary(url) for url in urls]
+        sequential_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent = News_Scraper.fetch_article_summaries(urls)
+        concurrent_time = time.perf_counter() - start
+
+    assert concurrent == sequential, "Concurrent summaries differ from the sequential ones"
+    print(f"Articles: {args.articles} on {args.hosts} host(s), latency {args.latency * 1000:.0f} ms")
+    print(f"Sequential: {sequential_time:.2f} s ({args.articles / sequential_time:.1f} articles/sec)")
+    print(f"Concurrent: {concurrent_time:.2f} s ({args.articles / concurrent_time:.1f} articles/sec)")
+    print(f"Speedup: {sequential_time / concurrent_time:.1f}x")
+
+
+def bench_crawl(args):
+    """
+    Compares scraping sources one after another with the parallel scheduler, for growing numbers
+    of sources, each on its own local stand-in host with one front page listing its articles.
+    """
+    listing = "<html><body>" + "".join(
+        f"<div class='story'><a href='/article-{i}'>Story {i}</a></div>" for i in range(args.articles)
+    ) + "</body></html>"
+    page = ListingPage('/', [ListingRule('div.story')], priority=FRONT_PAGE_PRIORITY)
+    print(f"{args.articles} articles per source, latency {args.latency * 1000:.0f} ms")
+    for count in args.sources:
+        with serve_fixtures({'/': listing}, latency=args.latency, hosts=count) as base_urls:
+            sources = [Source(f"fixture{i}", f"Fixture {i}", base_url, [page]) for i, base_url in enumerate(base_urls)]
+
+            start = time.perf_counter()
+            sequential = [article for source in sources for article in News_Scraper.scrape_source(source)]
+            sequential_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            parallel = News_Scraper.crawl_sources(sources)
+            parallel_time = time.perf_counter() - start
+
+        assert parallel == sequential, "The scheduler scraped other articles than the sequential crawl"
+        print(f"{count} sources: sequential {sequential_time:.2f} s, scheduler {parallel_time:.2f} s "
+              f"({sequential_time / parallel_time:.1f}x)")
+
+
+def legacy_extract_summary(content):
+    """
+    The original extractor: a full 'html.parser' tree of the whole page, then the first 3 paragraphs.
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    paragraphs = soup.find_all('p')
+    return ' '.join([p.get_text().strip() for p in paragraphs[:3]])
+
+
+def fast_extract_summary(content):
+    """
+    The streaming extractor, fed with the page in the chunk size used for real responses.
+    """
+    size = News_Scraper.STREAM_CHUNK_SIZE
+    return News_Scraper.extract_summary_streaming(content[i:i + size] for i in range(0, len(content), size))
+
+
+def bench_parse(args):
+    """
+    Compares the original and the streaming summary extractors over saved HTML pages,
+    reporting pages/sec, peak memory and whether both produce the same summaries.
+    Both use the same parser, so the streaming extractor only gains what it saves by stopping after
+    the first paragraphs: about 15-20% on the generated page, and nothing on pages it must read to the end.
+    """
+    paths = [path for pattern in args.fixtures for path in glob.glob(pattern)]
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+    if not pages:
+        pages = [synthetic_article_page().encode('utf-8')]
+    print(f"Pages: {len(pages)} ({sum(len(page) for page in pages) / len(pages) / 1024:.0f} KiB on average), "
+          f"parser: {News_Scraper.ARTICLE_PARSER}")
+
+    # The malformed pages are only checked for equal summaries, not timed
+    mismatches = sum(legacy_extract_summary(page) != fast_extract_summary(page) for page in pages + MALFORMED_PAGES)
+    for name, extractor in (('Original', legacy_extract_summary), ('Streaming', fast_extract_summary)):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for page in pages:
+                extractor(page)
+        rate = args.rounds * len(pages) / (time.perf_counter() - start)
+
+        tracemalloc.start()
+        for page in pages:
+            extractor(page)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name}: {rate:.1f} pages/sec, peak memory {peak / 1024:.0f} KiB")
+    print(f"Summaries that differ: {mismatches} of {len(pages) + len(MALFORMED_PAGES)}")
+
+
+# Vocabulary and categories for generated corpora
+WORDS = ("government election market football tennis film music health doctor science research travel hotel "
+         "fashion food school student economy stock trade vote president court police weather climate storm "
+         "city village river border minister company profit bank startup software internet phone energy oil "
+         "festival concert actor series review critics launch mission space rocket cricket match team coach").split()
+SYLLABLES = "ba ke lo mi nu ra se ti vo za chi dre fla gro pli sto tra wen yor qua".split()
+CATEGORIES = ['politics', 'technology', 'sports', 'entertainment', 'business', 'health', 'science', 'travel',
+              'lifestyle', 'education', 'news / current events', 'opinion / features', 'reviews or opinion-based']
+
+
+def synthetic_vocabulary(size=20000):
+    """
+    Builds a vocabulary of `size` words (the real WORDS first, then made-up ones) and the cumulative
+    weights of a Zipf distribution over it, so that a few words are very common and most are rare.
+    """
+    rng = random.Random(42)
+    vocabulary = list(WORDS)
+    seen = set(vocabulary)
+    while len(vocabulary) < size:
+        word = ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            vocabulary.append(word)
+    cumulative, total = [], 0.0
+    for rank in range(1, size + 1):
+        total += 1 / rank
+        cumulative.append(total)
+    return vocabulary, cumulative
+
+
+def synthetic_corpus(n, seed=0):
+    """
+    Generates `n` categorized article rows shaped like the rows of categorized_news_articles.csv.
+    About a fifth of them fall into their own 'general-... news' category, as uncategorized articles do.
+    """
+    rng = random.Random(seed)
+    vocabulary, cumulative = synthetic_vocabulary()
+    first_day = date(2024, 1, 1).toordinal()
+    for i in range(n):
+        title = ' '.join(rng.choices(vocabulary, cum_weights=cumulative, k=8)).capitalize()
+        yield {
+            'title': title,
+            'summary': ' '.join(rng.choices(vocabulary, cum_weights=cumulative, k=60)).capitalize() + '.',
+            'url': f"https://example.com/news/{i}",
+            'source': rng.choice(['CNN', 'Times of India']),
+            'publication_date': date.fromordinal(first_day + rng.randrange(365)).isoformat(),
+            'category': f"general-{title} news" if rng.random() < 0.2 else rng.choice(CATEGORIES),
+        }
+
+
+def percentiles(timings):
+    """
+    Returns the p50 and p99 of a list of timings, in milliseconds.
+    """
+    timings = sorted(timings)
+    return timings[len(timings) // 2] * 1000, timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000
+
+
+def legacy_query(articles, category=None, start_date=None, end_date=None):
+    """
+    The original /articles filtering: linear scans that parse every publication date.
+    """
+    filtered_articles = articles
+    if category:
+        filtered_articles = [a for a in filtered_articles if a.category.lower() == category.lower()]
+    if start_date:
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        filtered_articles = [a for a in filtered_articles if datetime.strptime(a.publication_date, "%Y-%m-%d") >= start]
+    if end_date:
+        end = datetime.strptime(end_date, "%Y-%m-%d")
+        filtered_articles = [a for a in filtered_articles if datetime.strptime(a.publication_date, "%Y-%m-%d") <= end]
+    return filtered_articles
+
+
+def legacy_get(articles, article_id):
+    """
+    The original /articles/{article_id} lookup: a linear search.
+    """
+    for article in articles:
+        if article.id == article_id:
+            return article
+
+
+def bench_store(args):
+    """
+    Measures p50/p99 latency of the indexed article store for the /articles query shapes,
+    optionally against the original linear scans.
+    """
+    from News_Api import Article
+
+    articles = [Article.model_construct(id=i, **row) for i, row in enumerate(synthetic_corpus(args.articles), start=1)]
+    start = time.perf_counter()
+    store = ArticleStore(articles, search=False)
+    print(f"Articles: {len(store)}, store built in {time.perf_counter() - start:.2f} s")
+    if not args.baseline:
+        # The store copies the articles into its own columns; the models are only kept for the linear scans,
+        # which would otherwise slow down the garbage collections triggered by the queries
+        articles = None
+
+    rng = random.Random(1)
+
+    def week():
+        first = date(2024, 1, 1) + timedelta(days=rng.randrange(358))
+        return first.isoformat(), (first + timedelta(days=6)).isoformat()
+
+    queries = {
+        'by id': lambda: store.get(rng.randrange(1, len(store) + 1)),
+        'category': lambda: store.query(category=rng.choice(CATEGORIES).upper()),
+        'one week': lambda: store.query(None, *map(parse_date, week())),
+        'category + one week': lambda: store.query(rng.choice(CATEGORIES), *map(parse_date, week())),
+    }
+    legacy_queries = {
+        'by id': lambda: legacy_get(articles, rng.randrange(1, len(articles) + 1)),
+        'category': lambda: legacy_query(articles, category=rng.choice(CATEGORIES).upper()),
+        'one week': lambda: legacy_query(articles, None, *week()),
+        'category + one week': lambda: legacy_query(articles, rng.choice(CATEGORIES), *week()),
+    }
+    for name, query in queries.items():
+        timings = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            query()
+            timings.append(time.perf_counter() - start)
+        line = f"{name}: p50 {percentiles(timings)[0]:.3f} ms, p99 {percentiles(timings)[1]:.3f} ms"
+        if args.baseline:
+            timings = []
+            for _ in range(args.baseline):
+                start = time.perf_counter()
+                legacy_queries[name]()
+                timings.append(time.perf_counter() - start)
+            line += f" (linear scan: p50 {percentiles(timings)[0]:.1f} ms)"
+        print(line)
+
+
+def bench_search(args):
+    """
+    Measures p50/p99 latency of full-text queries on the search index,
+    optionally against the original substring scan of /search.
+    """
+    from News_Api import Article
+
+    articles = [Article.model_construct(id=i, **row) for i, row in enumerate(synthetic_corpus(args.articles), start=1)]
+    start = time.perf_counter()
+    store = ArticleStore(articles)
+    print(f"Articles: {len(store)}, store and search index built in {time.perf_counter() - start:.2f} s")
+
+    rng = random.Random(1)
+    vocabulary, cumulative = synthetic_vocabulary()
+    rare = vocabulary[1000:]  # Words that appear in a few hundred articles at most
+
+    def words(k):
+        return ' '.join(rng.choices(vocabulary, cum_weights=cumulative, k=k))
+
+    queries = {
+        'one term': lambda: words(1),
+        'rare term': lambda: rng.choice(rare),
+        'two terms (AND)': lambda: words(2),
+        'two terms (OR)': lambda: words(2),
+        'prefix': lambda: rng.choice(rare)[:4],
+    }
+    for name, make_query in queries.items():
+        mode = 'or' if 'OR' in name else 'and'
+        prefix = name == 'prefix'
+        timings, hits = [], 0
+        for _ in range(args.rounds):
+            query = make_query()
+            start = time.perf_counter()
+            hits += len(store.search(query, mode=mode, prefix=prefix))
+            timings.append(time.perf_counter() - start)
+        line = (f"{name}: p50 {percentiles(timings)[0]:.3f} ms, p99 {percentiles(timings)[1]:.3f} ms, "
+                f"{hits / args.rounds:.0f} results on average")
+        if args.baseline and name == 'one term':
+            timings = []
+            for _ in range(args.baseline):
+                q = make_query()
+                start = time.perf_counter()
+                [a for a in articles if q.lower() in a.title.lower() or q.lower() in a.summary.lower()]
+                timings.append(time.perf_counter() - start)
+            line += f" (substring scan: p50 {percentiles(timings)[0]:.1f} ms)"
+        print(line)
+
+
+def traced_bytes(build):
+    """
+    Returns what `build()` returns and the bytes it allocated that are still held afterwards.
+    """
+    tracemalloc.start()
+    result = build()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, held
+
+
+def bench_memory(args):
+    """
+    Measures the memory held per article by the API's article store, against the original
+    list of Pydantic Article models, for corpora of each of the given sizes.
+    """
+    from Article_Database import ArticleRow
+    from News_Api import Article
+
+    for n in args.articles:
+        text = sum(len(value.encode('utf-8')) for row in synthetic_corpus(n) for value in row.values())
+        print(f"{n} articles, {text / n:.0f} bytes of text per article")
+        articles, held = traced_bytes(lambda: [Article(id=i, **row) for i, row in enumerate(synthetic_corpus(n), start=1)])
+        print(f"  Pydantic models: {held / n:.0f} bytes per article")
+        del articles
+        builds = {'compact store': False, 'compact store + search index': True} if args.search else {'compact store': False}
+        for name, search in builds.items():
+            store, held = traced_bytes(lambda: ArticleStore(
+                (ArticleRow(i, **row) for i, row in enumerate(synthetic_corpus(n), start=1)), search=search))
+            print(f"  {name}: {held / n:.0f} bytes per article")
+            del store
+
+
+def topical_corpus(n, seed=0):
+    """
+    Generates `n` (title, summary) pairs of Zipf-distributed made-up words with up to three keywords of a random
+    category mixed in, so that the keyword categorizer spreads them over all categories and 'general' news.
+    """
+    import Content_Categorization
+    rng = random.Random(seed)
+    vocabulary, cumulative = synthetic_vocabulary()
+    # Leave out the real words, many of which are keywords themselves
+    filler = vocabulary[len(WORDS):]
+    filler_weights = [total - cumulative[len(WORDS) - 1] for total in cumulative[len(WORDS):]]
+    topics = list(Content_Categorization.categories.values())
+    pairs = []
+    for _ in range(n):
+        words = rng.choices(filler, cum_weights=filler_weights, k=68)
+        keywords = rng.choice(topics)
+        for _ in range(rng.randint(0, 3)):
+            words[rng.randrange(len(words))] = rng.choice(keywords)
+        pairs.append((' '.join(words[:8]).capitalize(), ' '.join(words[8:]).capitalize() + '.'))
+    return pairs
+
+
+def bench_classifier(args):
+    """
+    Compares the keyword categorizer with the linear classifier trained on its output:
+    articles/sec of both, and how often the classifier agrees with the keywords on held-out articles.
+    """
+    import Content_Categorization
+    from Article_Classifier import CategoryClassifier, accuracy, read_categorized
+    Content_Categorization.RESULT_CACHE_PATH = None  # Measure real categorization, not cache hits
+
+    pairs = read_categorized(args.input)[0] if args.input else topical_corpus(args.articles)
+    Content_Categorization.load_models()
+    Content_Categorization.get_keyword_index()
+    start = time.perf_counter()
+    labels = []
+    for i in range(0, len(pairs), Content_Categorization.CHUNK_SIZE):
+        labels += Content_Categorization.categorize_batch(pairs[i:i + Content_Categorization.CHUNK_SIZE])
+    rule_time = time.perf_counter() - start
+
+    split = int(len(pairs) * 0.8)
+    start = time.perf_counter()
+    classifier = CategoryClassifier.train(pairs[:split], labels[:split], min_document_frequency=args.min_df)
+    train_time = time.perf_counter() - start
+    test = pairs[split:]
+    start = time.perf_counter()
+    classifier.categorize(test)
+    classify_time = time.perf_counter() - start
+
+    print(f"Articles: {len(pairs)} ({split} to train, {len(test)} to test), {len(classifier.categories)} classes")
+    print(f"Keywords + spaCy: {len(pairs) / rule_time:.0f} articles/sec")
+    print(f"Classifier: {len(test) / classify_time:.0f} articles/sec, trained in {train_time:.1f} s")
+    print(f"Agreement with the keyword categories: {accuracy(classifier, test, labels[split:]):.1%}")
+
+
+# Runs in a fresh interpreter so that nothing is imported or loaded beforehand
+STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import Content_Categorization
+imported = time.perf_counter()
+Content_Categorization.categorize_article("Election results", "The government announced the vote count.")
+first_call = time.perf_counter()
+Content_Categorization.categorize_article("Match report", "The football team won the championships.")
+warm_call = time.perf_counter()
+print(json.dumps({'import': imported - start, 'first_call': first_call - imported, 'warm_call': warm_call - first_call}))
+"""
+
+
+def bench_startup(args):
+    """
+    Measures the import time of Content_Categorization and the latency of its first and second calls.
+    """
+    runs = []
+    for _ in range(args.rounds):
+        result = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], capture_output=True, text=True)
+        if result.returncode != 0:
+            print("Categorization failed to start:\n" + "\n".join(result.stderr.strip().splitlines()[-10:]))
+            return
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    for key, label in (('import', 'Import'), ('first_call', 'First call'), ('warm_call', 'Warm call')):
+        times = sorted(run[key] for run in runs)
+        print(f"{label}: {times[len(times) // 2] * 1000:.1f} ms (median of {len(times)})")
+
+
+# Files of a fixture directory written by 'record': the manifest maps each source to its saved pages
+FIXTURE_MANIFEST = 'manifest.json'
+SUITE_OUTPUT = 'benchmark_results.json'
+SERVER_STARTUP_TIMEOUT = 900  # Seconds allowed for the API to load a generated corpus
+
+
+def record_fixtures(args):
+    """
+    Saves the listing pages of the registered sources and the first articles they list to a fixture
+    directory, for 'suite --fixtures' to serve them again from a local stand-in, without the network.
+    """
+    manifest = {}
+    for name in args.sources:
+        source = SOURCES[name]
+        os.makedirs(os.path.join(args.directory, name), exist_ok=True)
+        entry = {'base_url': source.base_url, 'pages': {}, 'articles': {}, 'origins': [source.url('/').rstrip('/')]}
+        urls = []
+        for index, page in enumerate(source.pages):
+            content = News_Scraper.fetch(source.url(page.path)).content
+            entry['pages'][page.path] = f"{name}/page-{index}.html"
+            with open(os.path.join(args.directory, entry['pages'][page.path]), 'wb') as f:
+                f.write(content)
+            urls += [article['url'] for article in News_Scraper.parse_listing(source, page, content)]
+        # Every host the listings link to is served by the stand-in when the fixtures are replayed
+        for url in urls:
+            parts = urlparse(url)
+            if f"{parts.scheme}://{parts.netloc}" not in entry['origins']:
+                entry['origins'].append(f"{parts.scheme}://{parts.netloc}")
+        for index, url in enumerate(list(dict.fromkeys(urls))[:args.articles]):
+            try:
+                content = News_Scraper.fetch(url).content
+            except requests.RequestException as e:
+                print(f"Skipping {url}: {e}")
+                continue
+            entry['articles'][url] = f"{name}/article-{index:04d}.html"
+            with open(os.path.join(args.directory, entry['articles'][url]), 'wb') as f:
+                f.write(content)
+        manifest[name] = entry
+        print(f"{source.label}: {len(entry['pages'])} listing pages, {len(entry['articles'])} articles")
+    with open(os.path.join(args.directory, FIXTURE_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load_fixtures(directory):
+    """
+    Reads the fixtures saved by 'record'.
+    Returns:
+        list: (source, pages, origins) tuples: the registered source, its pages by URL path (listing pages
+              and articles) and the origins its links point to, which are rewritten to the local stand-in.
+    """
+    with open(os.path.join(directory, FIXTURE_MANIFEST), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    fixtures = []
+    for name, entry in manifest.items():
+        pages = {}
+        for key, path in list(entry['pages'].items()) + list(entry['articles'].items()):
+            parts = urlparse(key)
+            with open(os.path.join(directory, path), 'rb') as f:
+                pages[parts.path + ('?' + parts.query if parts.query else '')] = f.read().decode('utf-8', 'replace')
+        fixtures.append((SOURCES[name], pages, entry['origins']))
+    return fixtures
+
+
+def synthetic_fixtures(articles=100):
+    """
+    Generates fixtures shaped like the Times of India and CNN pages that the registered sources' rules
+    expect: front pages listing `articles` articles each (CNN also has an articles section), and heavy
+    article pages (see synthetic_article_page). Same arguments, same pages.
+    """
+    rng = random.Random(7)
+    vocabulary, cumulative = synthetic_vocabulary()
+
+    def title():
+        return ' '.join(rng.choices(vocabulary, cum_weights=cumulative, k=8)).capitalize()
+
+    toi_links = [f"/india/story-{i}.cms" for i in range(articles)]
+    toi_home = ("<html><body><div class='stroF AZ4wj'><span>Times of India</span><span>Updated: Jan 15, 2024</span></div>"
+                + "".join(f"<div class='col_l_6'><a href='{link}'>{title()}</a></div>" for link in toi_links)
+                + "".join(f"<figure class='_YVis'><a href='/videos/{i}'></a><figcaption>{title()}</figcaption></figure>"
+                          for i in range(articles // 10))
+                + "</body></html>")
+    front = [f"/2024/01/15/world/story-{i}/index.html" for i in range(articles)]
+    section = [f"/2024/01/15/business/story-{i}/index.html" for i in range(articles // 2)]
+    cnn_home = "<html><body>" + "".join(
+        f"<a href='{link}'><div class='container__headline'><span class='container__headline-text'>{title()}</span>"
+        f"</div></a>" for link in front) + "</body></html>"
+    cnn_articles = "<html><body>" + "".join(
+        f"<h3 class='cd__headline'><a href='{link}'>{title()}</a></h3>" for link in section) + "</body></html>"
+
+    article = synthetic_article_page()
+    toi_pages = {'/': toi_home, **{link: article for link in toi_links}}
+    cnn_pages = {'/': cnn_home, '/articles': cnn_articles, **{link: article for link in front + section}}
+    return [(SOURCES['toi'], toi_pages, []), (SOURCES['cnn'], cnn_pages, [])]
+
+
+@contextmanager
+def serve_sources(fixtures, latency=0.0):
+    """
+    Serves the fixtures of every source from its own local stand-in host (see serve_fixtures),
+    with absolute links to the source's origins rewritten to the stand-in.
+    Yields:
+        list: The sources, scraped from their stand-ins.
+    """
+    with ExitStack() as stack:
+        sources = []
+        for source, pages, origins in fixtures:
+            served = {}
+            base_url = stack.enter_context(serve_fixtures(served, latency=latency))[0]
+            for path, html in pages.items():
+                for origin in origins:
+                    html = html.replace(origin, base_url).replace(origin.split(':', 1)[1], base_url)
+                served[path] = html
+            sources.append(source.with_base_url(base_url))
+        yield sources
+
+
+def rate(count, seconds):
+    """
+    Returns a measurement of `count` items done in `seconds`, as stored in the suite results.
+    """
+    return {'count': count, 'seconds': round(seconds, 4), 'per_second': round(count / seconds, 2) if seconds else None}
+
+
+def latency_summary(timings):
+    """
+    Returns the mean and percentiles of a list of timings, in milliseconds.
+    """
+    timings = sorted(timings)
+    if not timings:
+        return {}
+
+    def percentile(p):
+        return round(timings[min(len(timings) - 1, int(len(timings) * p))] * 1000, 3)
+
+    return {'mean_ms': round(sum(timings) / len(timings) * 1000, 3), 'p50_ms': percentile(0.5),
+            'p90_ms': percentile(0.9), 'p99_ms': percentile(0.99), 'max_ms': round(timings[-1] * 1000, 3)}
+
+
+def suite_scrape(args):
+    """
+    Scrapes the fixture sources from local stand-ins: a whole crawl, get_article_summary one article at
+    a time and concurrently, and the extraction of the article pages alone, without the network.
+    """
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else synthetic_fixtures(args.scrape_articles)
+    with serve_sources(fixtures, latency=args.latency) as sources:
+        start = time.perf_counter()
+        articles = News_Scraper.crawl_sources(sources)
+        crawl_time = time.perf_counter() - start
+        # Articles with a fixed summary (e.g. videos) have no article page to fetch
+        fixed = {rule.summary for source in sources for page in source.pages for rule in page.rules if rule.summary}
+        urls = [article['url'] for article in articles if article['summary'] not in fixed]
+
+        start = time.perf_counter()
+        for url in urls:
+            News_Scraper.get_article_summary(url)
+        sequential_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        News_Scraper.fetch_article_summaries(urls)
+        concurrent_time = time.perf_counter() - start
+
+    # The article pages alone, without the listing pages
+    pages = [html.encode('utf-8') for source, served, _ in fixtures
+             for path, html in served.items() if path not in {page.path for page in source.pages}]
+    start = time.perf_counter()
+    for page in pages:
+        News_Scraper.extract_article(page)
+    parse_time = time.perf_counter() - start
+
+    results = {
+        'sources': len(fixtures),
+        'recorded': bool(args.fixtures),
+        'latency_ms': args.latency * 1000,
+        'crawl': rate(len(articles), crawl_time),
+        'summaries_sequential': rate(len(urls), sequential_time),
+        'summaries_concurrent': rate(len(urls), concurrent_time),
+        'extract_article': rate(len(pages), parse_time),
+    }
+    print(f"Scrape: crawl {results['crawl']['per_second']} articles/sec, get_article_summary "
+          f"{results['summaries_sequential']['per_second']} articles/sec sequential, "
+          f"{results['summaries_concurrent']['per_second']} concurrent; "
+          f"extraction {results['extract_article']['per_second']} pages/sec")
+    return results
+
+
+def suite_categorize(args):
+    """
+    Categorizes a generated CSV file of articles with categorize_articles, with the models loaded beforehand
+    and without the result cache.
+    """
+    import Content_Categorization
+    Content_Categorization.RESULT_CACHE_PATH = None  # Measure real categorization, not cache hits
+    Content_Categorization.load_models()
+    Content_Categorization.get_keyword_index()
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_file = os.path.join(directory, 'news_articles.csv')
+        with open(input_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(ARTICLE_COLUMNS)
+            for i, (title, summary) in enumerate(topical_corpus(args.categorize_articles)):
+                writer.writerow([title, summary, f"https://example.com/news/{i}", 'CNN', '2024-01-15'])
+        start = time.perf_counter()
+        Content_Categorization.categorize_articles(input_file, os.path.join(directory, 'categorized.csv'),
+                                                   n_process=args.processes)
+        elapsed = time.perf_counter() - start
+
+    results = {'processes': args.processes, 'categorize_articles': rate(args.categorize_articles, elapsed)}
+    print(f"Categorize: {results['categorize_articles']['per_second']} rows/sec with {args.processes} process(es)")
+    return results
+
+
+def metric_value(text, name):
+    """
+    Returns the value of an unlabelled metric in a Prometheus text exposition, or None if it is missing.
+    """
+    for line in text.splitlines():
+        if line.startswith(name + ' '):
+            return float(line.split()[1])
+    return None
+
+
+def generate_load(base_url, make_path, requests_count, concurrency):
+    """
+    Sends `requests_count` GET requests to paths made by `make_path()` from `concurrency` clients,
+    each with its own keep-alive connection, as fast as the API answers them.
+    Returns:
+        tuple: The latency of every successful request, the number of failed requests and the wall time.
+    """
+    paths = [make_path() for _ in range(requests_count)]  # Made up front, so every run sends the same requests
+    local = threading.local()
+
+    def get(path):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            response = local.session.get(base_url + path, timeout=60)
+        except requests.RequestException:
+            return None
+        return time.perf_counter() - start if response.status_code == 200 else None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(get, paths))
+    wall_time = time.perf_counter() - start
+    timings = [result for result in results if result is not None]
+    return timings, len(results) - len(timings), wall_time
+
+
+def suite_serve(args, articles):
+    """
+    Starts the API on a generated article database of `articles` articles and measures the latency and
+    throughput of /articles, /search and /articles/{id} under load, and the API's resident memory.
+    """
+    from Article_Database import ArticleDatabase, DATABASE_PATH
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        ArticleDatabase(os.path.join(directory, DATABASE_PATH)).add_articles(synthetic_corpus(articles))
+        build_time = time.perf_counter() - start
+
+        # Run the API in its own process, as in production, serving the generated database
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        base_url = f"http://127.0.0.1:{port}"
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+            filter(None, [os.path.dirname(os.path.abspath(__file__)), os.environ.get('PYTHONPATH')])))
+        with open(os.path.join(directory, 'api.log'), 'w+') as log:
+            server = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'News_Api:app', '--port', str(port),
+                                       '--log-level', 'warning'], cwd=directory, env=env, stdout=log, stderr=log)
+            try:
+                started = time.perf_counter()
+                while True:
+                    if server.poll() is not None:
+                        log.seek(0)
+                        raise RuntimeError("The API failed to start:\n" + log.read()[-2000:])
+                    try:
+                        status = requests.get(base_url + '/admin/status', timeout=5).json()
+                        break
+                    except requests.RequestException:
+                        if time.perf_counter() - started > SERVER_STARTUP_TIMEOUT:
+                            raise RuntimeError("The API did not start in time")
+                        time.sleep(0.2)
+                rss_loaded = metric_value(requests.get(base_url + '/metrics', timeout=30).text, 'process_resident_memory_bytes')
+
+                rng = random.Random(3)
+                vocabulary, cumulative = synthetic_vocabulary()
+
+                def week():
+                    first = date(2024, 1, 1) + timedelta(days=rng.randrange(358))
+                    return f"start_date={first.isoformat()}&end_date={(first + timedelta(days=6)).isoformat()}"
+
+                def articles_path():
+                    filters = rng.choice([f"category={rng.choice(CATEGORIES)}", week(),
+                                          f"category={rng.choice(CATEGORIES)}&{week()}"])
+                    return f"/articles?{filters}&limit={args.page_size}"
+
+                def search_path():
+                    words = '+'.join(rng.choices(vocabulary[:2000], cum_weights=cumulative[:2000], k=rng.randint(1, 2)))
+                    return f"/search?q={words}&limit={args.page_size}"
+
+                endpoints = {
+                    '/articles': articles_path,
+                    '/search': search_path,
+                    '/articles/{id}': lambda: f"/articles/{rng.randint(1, articles)}",
+                }
+                results = {'articles': articles, 'build_seconds': round(build_time, 2),
+                           'load_seconds': status['last_load_seconds'], 'concurrency': args.concurrency,
+                           'page_size': args.page_size, 'endpoints': {}}
+                for name, make_path in endpoints.items():
+                    timings, errors, wall_time = generate_load(base_url, make_path, args.requests, args.concurrency)
+                    results['endpoints'][name] = {**latency_summary(timings), 'errors': errors,
+                                                  'requests_per_second': round(len(timings) / wall_time, 1)}
+                    print(f"Serve {articles} articles, {name}: p50 {results['endpoints'][name]['p50_ms']} ms, "
+                          f"p99 {results['endpoints'][name]['p99_ms']} ms, "
+                          f"{results['endpoints'][name]['requests_per_second']} requests/sec, {errors} errors")
+                rss_after = metric_value(requests.get(base_url + '/metrics', timeout=30).text, 'process_resident_memory_bytes')
+            finally:
+                server.terminate()
+                server.wait()
+    results.update(rss_loaded_bytes=rss_loaded, rss_after_load_bytes=rss_after)
+    if rss_loaded is not None and rss_after is not None:
+        print(f"Serve {articles} articles: RSS {rss_loaded / 1024 / 1024:.0f} MiB loaded, "
+              f"{rss_after / 1024 / 1024:.0f} MiB after the load")
+    elif rss_loaded is not None:
+        print(f"Serve {articles} articles: RSS {rss_loaded / 1024 / 1024:.0f} MiB loaded")
+    return results
+
+
+def git_revision():
+    """
+    Returns the commit the benchmarked code is at and whether it has uncommitted changes, or (None, None).
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=directory, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=directory,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+def bench_suite(args):
+    """
+    Runs the reproducible benchmarks of scraping, categorization and serving, and writes their results
+    with the commit, machine and parameters to a JSON file, to compare commits with 'compare'.
+    """
+    commit, dirty = git_revision()
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'parameters': {key: value for key, value in vars(args).items() if key != 'func'},
+        'results': {},
+    }
+    if 'scrape' in args.only:
+        report['results']['scrape'] = suite_scrape(args)
+    if 'categorize' in args.only:
+        report['results']['categorize'] = suite_categorize(args)
+    if 'serve' in args.only:
+        report['results']['serve'] = {str(n): suite_serve(args, n) for n in args.serve_articles}
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+def flatten(results, prefix=''):
+    """
+    Flattens nested results into a dict of dotted keys to numbers.
+    """
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def bench_compare(args):
+    """
+    Compares the results of two suite runs, e.g. of two commits, metric by metric.
+    """
+    reports = []
+    for path in (args.baseline, args.candidate):
+        with open(path, 'r', encoding='utf-8') as f:
+            reports.append(json.load(f))
+    baseline, candidate = (flatten(report['results']) for report in reports)
+    print(f"Baseline {(reports[0]['commit'] or '?')[:10]}, candidate {(reports[1]['commit'] or '?')[:10]}")
+    for key in sorted(baseline.keys() & candidate.keys()):
+        old, new = baseline[key], candidate[key]
+        change = f"{(new - old) / old:+.1%}" if old else "n/a"
+        print(f"{key}: {old:g} -> {new:g} ({change})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the News Aggregator pipeline.")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    summaries_parser = subparsers.add_parser('summaries', help="Sequential vs. concurrent summary fetching")
+    summaries_parser.add_argument('--articles', type=int, default=150)
+    summaries_parser.add_argument('--latency', type=float, default=0.05)
+    summaries_parser.add_argument('--hosts', type=int, default=2)
+    summaries_parser.set_defaults(func=bench_summaries)
+
+    crawl_parser = subparsers.add_parser('crawl', help="Sequential vs. parallel scraping of many sources")
+    crawl_parser.add_argument('--sources', type=int, nargs='+', default=[2, 20, 100])
+    crawl_parser.add_argument('--articles', type=int, default=20, help="Articles listed by each source")
+    crawl_parser.add_argument('--latency', type=float, default=0.05)
+    crawl_parser.set_defaults(func=bench_crawl)
+
+    parse_parser = subparsers.add_parser('parse', help="Original vs. streaming summary extraction")
+    parse_parser.add_argument('fixtures', nargs='*', help="Saved HTML pages, e.g. toi_page_source.html")
+    parse_parser.add_argument('--rounds', type=int, default=20)
+    parse_parser.set_defaults(func=bench_parse)
+
+    classifier_parser = subparsers.add_parser('classifier', help="Keyword categorization vs. the linear classifier")
+    classifier_parser.add_argument('--articles', type=int, default=10000)
+    classifier_parser.add_argument('--input', help="Categorized CSV file to use instead of generated articles")
+    classifier_parser.add_argument('--min-df', type=int, default=20,
+                                   help="Minimum number of training articles a word or word pair must occur in")
+    classifier_parser.set_defaults(func=bench_classifier)
+
+    startup_parser = subparsers.add_parser('startup', help="Import time and first-call latency of categorization")
+    startup_parser.add_argument('--rounds', type=int, default=5)
+    startup_parser.set_defaults(func=bench_startup)
+
+    store_parser = subparsers.add_parser('store', help="Latency of /articles queries on the indexed store")
+    store_parser.add_argument('--articles', type=int, default=1000000)
+    store_parser.add_argument('--rounds', type=int, default=1000)
+    store_parser.add_argument('--baseline', type=int, default=0, help="Also time this many linear-scan queries")
+    store_parser.set_defaults(func=bench_store)
+
+    search_parser = subparsers.add_parser('search', help="Latency of /search queries on the full-text index")
+    search_parser.add_argument('--articles', type=int, default=200000)
+    search_parser.add_argument('--rounds', type=int, default=1000)
+    search_parser.add_argument('--baseline', type=int, default=0, help="Also time this many substring-scan queries")
+    search_parser.set_defaults(func=bench_search)
+
+    memory_parser = subparsers.add_parser('memory', help="Memory held per article by the article store")
+    memory_parser.add_argument('--articles', type=int, nargs='+', default=[100000, 1000000])
+    memory_parser.add_argument('--search', action='store_true', help="Also measure the store with its search index")
+    memory_parser.set_defaults(func=bench_memory)
+
+    record_parser = subparsers.add_parser('record', help="Save the sources' pages as fixtures for 'suite --fixtures'")
+    record_parser.add_argument('directory', help="Directory to save the fixtures to")
+    record_parser.add_argument('--sources', nargs='+', default=list(SOURCES), help="Names of the sources to record")
+    record_parser.add_argument('--articles', type=int, default=20, help="Articles to save per source")
+    record_parser.set_defaults(func=record_fixtures)
+
+    suite_parser = subparsers.add_parser('suite', help="Reproducible scrape, categorize and serve benchmarks, saved as JSON")
+    suite_parser.add_argument('--only', nargs='+', choices=['scrape', 'categorize', 'serve'],
+                              default=['scrape', 'categorize', 'serve'], help="Parts of the suite to run")
+    suite_parser.add_argument('--output', default=SUITE_OUTPUT, help="JSON file to write the results to")
+    suite_parser.add_argument('--fixtures', help="Directory saved by 'record', instead of generated TOI/CNN pages")
+    suite_parser.add_argument('--scrape-articles', type=int, default=100, help="Articles per generated front page")
+    suite_parser.add_argument('--latency', type=float, default=0.05, help="Delay added to every fixture response")
+    suite_parser.add_argument('--categorize-articles', type=int, default=10000)
+    suite_parser.add_argument('--processes', type=int, default=1, help="Processes to categorize with")
+    suite_parser.add_argument('--serve-articles', type=int, nargs='+', default=[10000, 100000],
+                              help="Sizes of the generated corpora the API is loaded with, up to 1000000")
+    suite_parser.add_argument('--requests', type=int, default=2000, help="Requests sent to each endpoint")
+    suite_parser.add_argument('--concurrency', type=int, default=8, help="Clients sending requests at the same time")
+    suite_parser.add_argument('--page-size', type=int, default=50, help="'limit' of /articles and /search requests")
+    suite_parser.set_defaults(func=bench_suite)
+
+    compare_parser = subparsers.add_parser('compare', help="Compare the results of two suite runs")
+    compare_parser.add_argument('baseline', help="Results of the earlier run, e.g. of the parent commit")
+    compare_parser.add_argument('candidate', help="Results of the later run")
+    compare_parser.set_defaults(func=bench_compare)
+
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)  # Silence the per-article scraper logs
+    News_Scraper.SUMMARY_CACHE_PATH = None  # Measure real fetches, not cache hits
+    args.func(args)
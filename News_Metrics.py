@@ -0,0 +1,184 @@
+#News_Metrics.py
+
+import json
+import math
+import os
+import threading
+
+# Where the pipeline saves its metrics, for the API to serve them on /metrics
+METRICS_PATH = 'pipeline_metrics.json'
+
+
+def _escape(value):
+    """
+    Escape a label value for the Prometheus text format.
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    """
+    Format a tuple of (name, value) label pairs as '{name="value",...}', or '' if there are none.
+    """
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{label}="{_escape(value)}"' for label, value in labels) + '}'
+
+
+def _format_value(value):
+    """
+    Format a sample value, writing whole numbers without a decimal point.
+    """
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and histograms with labels, rendered in the Prometheus text format.
+    The registry can be saved to and loaded from a JSON file, so that metrics recorded by one process
+    (the pipeline) are served by another (the API) and keep adding up over separate runs.
+    Updates may come from several threads, so access is guarded by a lock.
+
+    Args:
+        definitions (dict): Maps each metric name to its (type, help) tuple, or (type, help, buckets) for
+                            histograms, where type is 'counter', 'gauge' or 'histogram' and buckets are
+                            the sorted upper bounds of the histogram buckets.
+    """
+
+    def __init__(self, definitions=None):
+        self.metrics = {}  # name -> {'type', 'help', 'buckets', 'samples': {labels: value}}
+        self.lock = threading.Lock()
+        for name, definition in (definitions or {}).items():
+            self.define(name, *definition)
+
+    def define(self, name, kind, help_text, buckets=None):
+        """
+        Declare a metric, keeping its samples if it was already declared (e.g. loaded from a file).
+        """
+        with self.lock:
+            metric = self.metrics.setdefault(name, {'samples': {}})
+            metric.update(type=kind, help=help_text, buckets=list(buckets) if buckets else None)
+
+    def _sample(self, name, labels, default):
+        """
+        Return the key of the sample of a metric with the given labels, creating it with `default` if needed.
+        """
+        key = tuple(sorted((label, str(value)) for label, value in labels.items()))
+        samples = self.metrics[name]['samples']
+        if key not in samples:
+            samples[key] = default()
+        return key
+
+    def inc(self, name, value=1, **labels):
+        """
+        Add `value` to a counter (or gauge).
+        """
+        with self.lock:
+            key = self._sample(name, labels, lambda: 0)
+            self.metrics[name]['samples'][key] += value
+
+    def set(self, name, value, **labels):
+        """
+        Set a gauge to `value`.
+        """
+        with self.lock:
+            key = self._sample(name, labels, lambda: 0)
+            self.metrics[name]['samples'][key] = value
+
+    def observe(self, name, value, **labels):
+        """
+        Record one observation in a histogram.
+        """
+        buckets = self.metrics[name]['buckets']
+        counts = [0] * (len(buckets) + 1)
+        counts[next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))] = 1
+        self.add_histogram(name, counts, value, **labels)
+
+    def add_histogram(self, name, counts, total, **labels):
+        """
+        Add observations that were already counted per bucket to a histogram.
+
+        Args:
+            name (str): The name of the histogram.
+            counts (list): The number of new observations in each bucket (not cumulative), the last one
+                           for observations above the largest bound.
+            total (float): The sum of the new observations.
+        """
+        with self.lock:
+            metric = self.metrics[name]
+            key = self._sample(name, labels, lambda: {'counts': [0] * (len(metric['buckets']) + 1), 'sum': 0})
+            sample = metric['samples'][key]
+            sample['counts'] = [old + new for old, new in zip(sample['counts'], counts)]
+            sample['sum'] += total
+
+    def get(self, name, **labels):
+        """
+        Return the value of a counter or gauge sample, or 0 if it was never set.
+        """
+        key = tuple(sorted((label, str(value)) for label, value in labels.items()))
+        with self.lock:
+            return self.metrics[name]['samples'].get(key, 0)
+
+    def render(self):
+        """
+        Return all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self.lock:
+            for name, metric in self.metrics.items():
+                if not metric['samples']:
+                    continue
+                lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} {metric['type']}")
+                for labels, value in sorted(metric['samples'].items()):
+                    if metric['type'] != 'histogram':
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                        continue
+                    # Buckets are cumulative in the exposition format
+                    cumulative = 0
+                    for bound, count in zip(metric['buckets'] + [math.inf], value['counts']):
+                        cumulative += count
+                        bucket_labels = labels + (('le', _format_value(float(bound))),)
+                        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def save(self, path=METRICS_PATH):
+        """
+        Save the metrics to a JSON file. The file is replaced in one step, so a reader never sees half of it.
+        """
+        with self.lock:
+            data = {
+                name: {**{key: metric[key] for key in ('type', 'help', 'buckets')},
+                       'samples': [[dict(labels), value] for labels, value in metric['samples'].items()]}
+                for name, metric in self.metrics.items()
+            }
+        temporary = path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path=METRICS_PATH, definitions=None):
+        """
+        Load metrics saved with `save`, then declare `definitions` on top of them.
+        A missing file gives a registry without samples.
+        """
+        registry = cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        for name, metric in data.items():
+            registry.define(name, metric['type'], metric['help'], metric['buckets'])
+            for labels, value in metric['samples']:
+                registry.metrics[name]['samples'][tuple(sorted(labels.items()))] = value
+        for name, definition in (definitions or {}).items():
+            registry.define(name, *definition)
+        return registry
@@ -0,0 +1,257 @@
+#News_Pipeline.py
+
+import argparse
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+
+import Content_Categorization
+from Article_Database import DATABASE_PATH
+from Article_Dedup import dedup_database
+from News_Metrics import METRICS_PATH, MetricsRegistry
+from News_Scraper import (LATENCY_BUCKETS, SEEN_INDEX_PATH, CrawlScheduler, SeenIndex, crawl_sources,
+                          get_host_stats, get_summary_cache, save_articles)
+from News_Sources import SOURCES, load_sources
+
+# Settings for running the pipeline
+API_TIMEOUT = 60  # Seconds allowed for the API to reload its articles
+API_ADMIN_TOKEN = os.environ.get('NEWS_API_ADMIN_TOKEN')  # Sent to the API when it requires one to reload
+PROFILE_TOP = 15  # Functions logged for each stage run under cProfile
+MEMORY_TOP = 5  # Allocation sites logged for each stage run under tracemalloc
+
+# The metrics recorded by the pipeline, served by the API on /metrics
+METRICS = {
+    'news_pipeline_runs_total': ('counter', "Number of pipeline runs."),
+    'news_pipeline_last_run_timestamp_seconds': ('gauge', "Unix time at which the last pipeline run finished."),
+    'news_pipeline_last_run_seconds': ('gauge', "Duration of the last pipeline run."),
+    'news_pipeline_stage_seconds_total': ('counter', "Seconds spent in each pipeline stage."),
+    'news_pipeline_stage_last_seconds': ('gauge', "Seconds the last run spent in each pipeline stage."),
+    'news_pipeline_stage_rows_total': ('counter', "Rows written by each pipeline stage."),
+    'news_pipeline_stage_last_rows': ('gauge', "Rows written by each pipeline stage in the last run."),
+    'news_pipeline_stage_errors_total': ('counter', "Number of failed runs of each pipeline stage."),
+    'news_pipeline_stage_peak_bytes': ('gauge', "Peak memory allocated by Python in each stage of the last run, "
+                                                "with --trace-memory."),
+    'news_scraped_articles_total': ('counter', "New articles found on the listing pages of each source."),
+    'news_duplicates_total': ('counter', "Articles found to be copies of an earlier article."),
+    'news_categorize_seconds_per_article': ('gauge', "Categorization time per article in the last run."),
+    'news_fetch_requests_total': ('counter', "HTTP responses received from each source."),
+    'news_fetch_bytes_total': ('counter', "Bytes received from each source, as sent on the wire."),
+    'news_fetch_retries_total': ('counter', "Requests to each source that were retried."),
+    'news_fetch_errors_total': ('counter', "Connection errors and timeouts of requests to each source."),
+    'news_fetch_latency_seconds': ('histogram', "Time until the response of a request to each source arrived.",
+                                   LATENCY_BUCKETS),
+    'news_parse_seconds_total': ('counter', "Seconds spent parsing the pages of each source, by kind of page."),
+    'news_parsed_pages_total': ('counter', "Pages of each source parsed, by kind of page."),
+}
+
+
+class PipelineRunner:
+    """
+    Runs the stages of the pipeline in order: scrape the sources into the article database, cluster duplicates,
+    categorize the new articles and make the API reload them. Every run records how long each stage took and
+    how many rows it wrote, and per source the fetch latency and parse time, into a metrics registry that is
+    saved to a file for the API's /metrics route.
+
+    Args:
+        sources (list): The sources to scrape.
+        path (str): The path of the article database.
+        pool (multiprocessing.pool.Pool): Categorization workers from Content_Categorization.start_workers(), if any.
+        api_url (str): The base URL of the API, to reload its articles after every run; None to let it notice them.
+        metrics_path (str): The file the metrics are loaded from and saved to.
+        profile_dir (str): A directory to save a cProfile profile of every stage to, or None not to profile.
+        trace_memory (bool): Whether to trace the memory allocations of every stage with tracemalloc.
+    """
+
+    def __init__(self, sources, path=DATABASE_PATH, pool=None, api_url=None, metrics_path=METRICS_PATH,
+                 profile_dir=None, trace_memory=False):
+        self.path = path
+        self.pool = pool
+        self.api_url = api_url
+        self.metrics_path = metrics_path
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.seen_index = SeenIndex(SEEN_INDEX_PATH)
+        # Counters keep adding up over runs, also over separate processes
+        self.metrics = MetricsRegistry.load(metrics_path, METRICS)
+        self.source_of_host = {urlparse(source.base_url).netloc: source.label for source in sources}
+        self.host_stats = get_host_stats()  # Fetch counters already recorded, so only each run's are added
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a stage, optionally under cProfile and tracemalloc, and record its metrics.
+        Yields a dict in which the stage stores the number of rows it wrote as 'rows'; its duration
+        is added as 'seconds'. A stage that fails is logged and counted, and the next stages still run.
+        """
+        result = {'rows': 0, 'seconds': 0.0}
+        profiler = cProfile.Profile() if self.profile_dir else None
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield result
+        except Exception as e:
+            logging.error(f"Pipeline stage {name} failed: {str(e)}")
+            self.metrics.inc('news_pipeline_stage_errors_total', stage=name)
+        finally:
+            if profiler:
+                profiler.disable()
+            result['seconds'] = time.perf_counter() - start
+            if profiler:
+                self._save_profile(name, profiler)
+            if self.trace_memory:
+                self._record_memory(name)
+
+        self.metrics.inc('news_pipeline_stage_seconds_total', result['seconds'], stage=name)
+        self.metrics.set('news_pipeline_stage_last_seconds', result['seconds'], stage=name)
+        self.metrics.inc('news_pipeline_stage_rows_total', result['rows'], stage=name)
+        self.metrics.set('news_pipeline_stage_last_rows', result['rows'], stage=name)
+        logging.info(f"Stage {name}: {result['rows']} rows in {result['seconds']:.2f}s.")
+
+    def _save_profile(self, name, profiler):
+        """
+        Save the profile of a stage to '<profile_dir>/<stage>.prof' and log its most expensive functions.
+        Only the main thread is profiled: the fetches of the scrape stage run in worker threads,
+        and categorization with several processes in the workers, so those show up as waiting.
+        """
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"{name}.prof")
+        profiler.dump_stats(path)
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        logging.info(f"Profile of stage {name} saved to {path}:\n{report.getvalue()}")
+
+    def _record_memory(self, name):
+        """
+        Record the peak memory traced during a stage, log where the memory still held was allocated
+        and stop tracing, so every stage starts from zero.
+        """
+        peak = tracemalloc.get_traced_memory()[1]
+        top = tracemalloc.take_snapshot().statistics('lineno')[:MEMORY_TOP]
+        tracemalloc.stop()
+        self.metrics.set('news_pipeline_stage_peak_bytes', peak, stage=name)
+        logging.info(f"Stage {name}: peak traced memory {peak / 1024 / 1024:.1f} MiB; still held:\n"
+                     + '\n'.join(str(statistic) for statistic in top))
+
+    def record_sources(self, articles):
+        """
+        Add the new articles of each source, and the fetch and parse counters recorded since the last run,
+        to the per-source metrics. Hosts that belong to no source are reported under their own name.
+        """
+        for source, count in Counter(article['source'] for article in articles).items():
+            self.metrics.inc('news_scraped_articles_total', count, source=source)
+
+        current = get_host_stats()
+        for host, stats in current.items():
+            source = self.source_of_host.get(host, host)
+            before = self.host_stats.get(host, {'requests': 0, 'bytes': 0, 'retries': 0, 'errors': 0,
+                                                'latency_seconds': 0.0, 'parsed': {},
+                                                'latency_histogram': [0] * len(stats['latency_histogram'])})
+            for key in ('requests', 'bytes', 'retries', 'errors'):
+                if stats[key] > before[key]:
+                    self.metrics.inc(f'news_fetch_{key}_total', stats[key] - before[key], source=source)
+            if stats['requests'] > before['requests']:
+                counts = [now - then for now, then in zip(stats['latency_histogram'], before['latency_histogram'])]
+                self.metrics.add_histogram('news_fetch_latency_seconds', counts,
+                                           stats['latency_seconds'] - before['latency_seconds'], source=source)
+            for kind, (pages, seconds) in stats['parsed'].items():
+                pages_before, seconds_before = before['parsed'].get(kind, (0, 0.0))
+                if pages > pages_before:
+                    self.metrics.inc('news_parsed_pages_total', pages - pages_before, source=source, kind=kind)
+                    self.metrics.inc('news_parse_seconds_total', seconds - seconds_before, source=source, kind=kind)
+        self.host_stats = current
+
+    def reload_api(self):
+        """
+        Make the API load the new articles now, instead of when its watcher notices them.
+        Returns:
+            int: The number of articles the API loaded.
+        """
+        headers = {'X-Admin-Token': API_ADMIN_TOKEN} if API_ADMIN_TOKEN else {}
+        response = requests.post(self.api_url.rstrip('/') + '/admin/reload', headers=headers, timeout=API_TIMEOUT)
+        response.raise_for_status()
+        return response.json()['rows']
+
+    def run_once(self, crawl):
+        """
+        Run every stage of the pipeline once and save the metrics.
+        Args:
+            crawl (callable): Scrapes the listing pages, given the seen index, and returns the new articles,
+                              e.g. CrawlScheduler.run_once.
+        """
+        started = time.perf_counter()
+        articles = []
+        with self.stage('scrape') as result:
+            articles = crawl(self.seen_index)
+            result['rows'] = save_articles(articles, self.seen_index, path=self.path)
+        self.record_sources(articles)
+
+        with self.stage('dedup') as result:
+            result['rows'], duplicates = dedup_database(self.path)
+            self.metrics.inc('news_duplicates_total', duplicates)
+
+        with self.stage('categorize') as result:
+            result['rows'] = Content_Categorization.categorize_database(self.path, pool=self.pool)
+        if result['rows']:
+            self.metrics.set('news_categorize_seconds_per_article', result['seconds'] / result['rows'])
+
+        if self.api_url:
+            with self.stage('store') as result:
+                result['rows'] = self.reload_api()
+
+        # Keep the summary cache within its age and size limits
+        if get_summary_cache():
+            get_summary_cache().evict()
+        self.metrics.inc('news_pipeline_runs_total')
+        self.metrics.set('news_pipeline_last_run_timestamp_seconds', time.time())
+        self.metrics.set('news_pipeline_last_run_seconds', time.perf_counter() - started)
+        self.metrics.save(self.metrics_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Scrape, deduplicate and categorize new articles, then update the API, recording metrics.")
+    parser.add_argument('--sources', help="JSON file with the sources to scrape instead of the built-in ones")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running the pipeline whenever listing pages are due at their polling interval")
+    parser.add_argument('--processes', type=int, default=1, help="Number of worker processes to categorize with")
+    parser.add_argument('--model', help="Categorize with a classifier trained by Article_Classifier.py instead of keywords")
+    parser.add_argument('--api', help="Base URL of a running API to reload after every run, e.g. http://localhost:8000")
+    parser.add_argument('--metrics', default=METRICS_PATH, help="File to save the metrics to, for the API's /metrics")
+    parser.add_argument('--profile', metavar='DIR', help="Profile every stage with cProfile and save the profiles to DIR")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Trace the memory allocated in every stage with tracemalloc (slows the pipeline down)")
+    args = parser.parse_args()
+    sources = load_sources(args.sources) if args.sources else list(SOURCES.values())
+    if args.model:
+        from Article_Classifier import CategoryClassifier
+        Content_Categorization.set_classifier(CategoryClassifier.load(args.model))
+
+    # Start the categorization workers once, so their models are loaded only once in watch mode
+    pool = Content_Categorization.start_workers(args.processes) if args.processes > 1 else None
+    try:
+        runner = PipelineRunner(sources, pool=pool, api_url=args.api, metrics_path=args.metrics,
+                                profile_dir=args.profile, trace_memory=args.trace_memory)
+        if args.watch:
+            scheduler = CrawlScheduler(sources)
+            while True:
+                runner.run_once(scheduler.run_once)
+                time.sleep(max(min(scheduler.next_due) - time.monotonic(), 0))
+        else:
+            runner.run_once(lambda seen_index: crawl_sources(sources, seen_index))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    print(f"Pipeline finished; metrics saved to {args.metrics}")
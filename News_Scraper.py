@@ -1,295 +1,1172 @@
-import csv
-from datetime import datetime
-import logging
-from bs4 import BeautifulSoup
-import requests
-
-# Configure logging to capture events for tracking (INFO level)
-logging.basicConfig(level=logging.INFO, format='%(asctime)s-%(levelname)s-%(message)s')
-
-def get_article_summary(url):
-    """
-    Fetches the article content from the provided URL and extracts the first 2-3 paragraphs as a summary.
-    Args:
-        url (str): The URL of the article to fetch.
-    Returns:
-        str: A short summary of the article or a default message if the summary cannot be fetched.
-    """
-    try:
-        # Define headers to mimic a real browser request
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        # Make an HTTP request to fetch the article
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Extract the first 3 paragraphs to create a summary
-        paragraphs = soup.find_all('p')
-        summary = ' '.join([p.get_text().strip() for p in paragraphs[:3]])  # Concatenate the first 3 paragraphs
-
-        # Return the summary if available; otherwise, provide a default message
-        if len(summary) > 0:
-            return summary
-        else:
-            return "Summary not available."
-    except Exception as e:
-        logging.error(f"Error fetching article summary: {str(e)}")
-        return "Summary not available."
-
-def get_published_date_toi(soup):
-    """
-    Extracts the publication date from the Times of India article soup.
-    Args:
-        soup (BeautifulSoup): The BeautifulSoup object for the article page.
-    Returns:
-        str: The formatted publication date or a default message if not found.
-    """
-    try:
-        date_element = soup.find('div', class_='stroF AZ4wj')
-        if date_element:
-            date_text = date_element.find_all('span')[-1].get_text(strip=True)  # Get the last span for date
-            return date_text.replace("Updated: ", "").strip()  # Remove 'Updated: ' and strip whitespace
-    except Exception as e:
-        logging.error(f"Error fetching publication date for TOI: {str(e)}")
-    return datetime.now().strftime("%Y-%m-%d")
-
-
-def get_published_date_cnn(soup):
-    """
-    Extracts the publication date from the CNN article page.
-    Args:
-        soup (BeautifulSoup): Parsed HTML content of the CNN article page.
-    Returns:
-        str: The extracted publication date in 'YYYY-MM-DD' format.
-    """
-    try:
-        # Locate the date container in the HTML
-        date_element = soup.find('div', class_='timestamp vossi-timestamp')
-        if date_element:
-            # Extract the date string and convert it to a proper format
-            date_str = date_element.get_text(strip=True)
-            # Example format: "8:52 PM EDT, Sun September 29, 2024"
-            date_obj = datetime.strptime(date_str, "%I:%M %p %Z, %a %B %d, %Y")
-            # Format the date as 'YYYY-MM-DD'
-            formatted_date = date_obj.strftime("%Y-%m-%d")
-            return formatted_date
-        else:
-            return datetime.now().strftime("%Y-%m-%d")
-    except Exception as e:
-        logging.error(f"Error extracting CNN article date: {str(e)}")
-        return datetime.now().strftime("%Y-%m-%d")
-
-
-def scrape_toi():
-    """
-    Scrapes the homepage of Times of India for article titles, links, summaries, and publication dates.
-    Returns:
-        list: A list of dictionaries containing the article title, summary, URL, source, and publication date.
-    """
-    url = "https://timesofindia.indiatimes.com"
-    articles = []
-
-    try:
-        logging.info("Scraping Times of India...")
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Loop through each article element in the grid for standard articles
-        for article in soup.find_all('div', class_='col_l_6'):
-            title_element = article.find('a')  # Extract the <a> tag for the article link
-
-            if title_element:
-                title = title_element.text.strip()  # Extract the article title
-                article_url = title_element.get('href')  # Get the URL from the <a> tag
-                if article_url and not article_url.startswith('http'):
-                    article_url = f"https://timesofindia.indiatimes.com{article_url}"
-
-                # Get a summary of the article content
-                summary = get_article_summary(article_url)
-
-                # Get publication date from the article page
-                publication_date = get_published_date_toi(soup)
-
-                # Add the article info to the articles list
-                articles.append({
-                    'title': title,
-                    'summary': summary,  # Summary fetched from the article page
-                    'url': article_url,
-                    'source': 'Times of India',
-                    'publication_date': publication_date  # Publication date fetched from the article page
-                })
-                logging.info(f"Scraped TOI article: {title}")
-
-        # Loop through each video element in the grid for videos
-        for video in soup.find_all('figure', class_="_YVis"):
-            title_element = video.find('figcaption')  # Extract the figcaption for the title
-            link_element = video.find('a')  # The <a> tag contains the video link
-
-            if title_element and link_element:
-                title = title_element.text.strip()  # Extract the video title
-                video_url = link_element.get('href')  # Get the URL from the <a> tag
-                if video_url and not video_url.startswith('http'):
-                    video_url = f"https://timesofindia.indiatimes.com{video_url}"
-
-                # Default summary for video content
-                summary = "Video content available."
-
-                # Add the video info to the articles list
-                articles.append({
-                    'title': title,
-                    'summary': summary,  # Default summary for video content
-                    'url': video_url,
-                    'source': 'Times of India',
-                    'publication_date': datetime.now().strftime("%Y-%m-%d")  # Current date as the publication date
-                })
-                logging.info(f"Scraped TOI video: {title}")
-
-        # Additional articles in the linktype2 class
-        for additional_article in soup.find_all('div', class_='linktype2'):
-            title_element = additional_article.find('a')  # Extract the <a> tag for the article link
-
-            if title_element:
-                title = title_element.text.strip()  # Extract the article title
-                article_url = title_element.get('href')  # Get the URL from the <a> tag
-                if article_url and not article_url.startswith('http'):
-                    article_url = f"https://timesofindia.indiatimes.com{article_url}"
-
-                # Get a summary of the article content
-                summary = get_article_summary(article_url)
-
-                # Get publication date from the article page
-                publication_date = get_published_date_toi(soup)
-
-                # Add the article info to the articles list
-                articles.append({
-                    'title': title,
-                    'summary': summary,  # Summary fetched from the article page
-                    'url': article_url,
-                    'source': 'Times of India',
-                    'publication_date': publication_date  # Publication date fetched from the article page
-                })
-                logging.info(f"Scraped TOI additional article: {title}")
-
-        # If no articles are found, log a warning and save the page's HTML for debugging
-        if not articles:
-            logging.warning("No TOI articles found. Dumping page source for debugging.")
-            with open("toi_page_source.html", "w", encoding="utf-8") as f:
-                f.write(response.text)
-
-    except Exception as e:
-        logging.error(f"Error scraping Times of India: {str(e)}")
-
-    return articles
-
-def scrape_cnn():
-    """
-    Scrapes the homepage and articles section of CNN for article titles, links, and summaries.
-    Returns:
-        list: A list of dictionaries containing the article title, summary, URL, source, and publication date.
-    """
-    articles = []
-    urls_to_scrape = [
-        "https://edition.cnn.com/",
-        "https://edition.cnn.com/articles"
-    ]
-
-    for url in urls_to_scrape:
-        try:
-            logging.info(f"Scraping CNN from {url}...")
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Scrape articles from the main page
-            if url == "https://edition.cnn.com/":
-                for article in soup.find_all('div', class_='container__headline'):
-                    title_element = article.find('span', class_='container__headline-text')  # Extract the title text
-                    link_element = article.find_parent('a')  # Find the parent <a> tag for the article URL
-
-                    if title_element and link_element:
-                        title = title_element.text.strip()
-                        article_url = link_element.get('href')
-                        if article_url and not article_url.startswith('http'):
-                            article_url = f"https://edition.cnn.com{article_url}"
-
-                        # Get a summary of the article content
-                        summary = get_article_summary(article_url)
-
-                        # Append the article details to the list
-                        articles.append({
-                            'title': title,
-                            'summary': summary,  # Summary fetched from the article page
-                            'url': article_url,
-                            'source': 'CNN',
-                            'publication_date': datetime.now().strftime("%Y-%m-%d")  # Current date as the publication date
-                        })
-                        logging.info(f"Scraped CNN article: {title}")
-
-            # Scrape articles from the articles section
-            elif url == "https://edition.cnn.com/articles":
-                for article in soup.find_all('h3', class_='cd__headline'):
-                    title_element = article.find('a')  # Extract the <a> tag for the link
-
-                    if title_element:
-                        title = title_element.text.strip()  # Extract the article title
-                        article_url = title_element.get('href')  # Get the URL from the <a> tag
-                        if article_url and not article_url.startswith('http'):
-                            article_url = f"https://edition.cnn.com{article_url}"
-
-                        # Get a summary of the article content
-                        summary = get_article_summary(article_url)
-
-                        # Get publication date from the article page
-                        publication_date = get_published_date_cnn(soup)
-
-                        # Add the article info to the articles list
-                        articles.append({
-                            'title': title,
-                            'summary': summary,  # Summary fetched from the article page
-                            'url': article_url,
-                            'source': 'CNN',
-                            'publication_date': publication_date  # Publication date fetched from the article page
-                        })
-                        logging.info(f"Scraped CNN article: {title}")
-
-        except Exception as e:
-            logging.error(f"Error scraping CNN from {url}: {str(e)}")
-
-    return articles
-
-
-
-def save_to_csv(articles, filename='news_articles.csv'):
-    """
-    Saves the scraped articles to a CSV file.
-    Args:
-        articles (list): The list of articles to save.
-        filename (str): The name of the file to save the articles in.
-    """
-    keys = articles[0].keys() if articles else []
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=keys)
-        writer.writeheader()
-        writer.writerows(articles)
-
-    logging.info(f"Saved {len(articles)} articles to {filename}.")
-
-
-if __name__ == "__main__":
-    # Scrape articles from Times of India
-    toi_articles = scrape_toi()
-    # Scrape articles from CNN
-    cnn_articles = scrape_cnn()
-    # Combine both lists of articles
-    all_articles = toi_articles + cnn_articles
-    # Save to CSV
-    save_to_csv(all_articles)
\ No newline at end of file
+import argparse
+import bisect
+import csv
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import logging
+import random
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urljoin, urlparse
+from bs4 import BeautifulSoup, SoupStrainer
+import requests
+from requests.adapters import HTTPAdapter
+from Article_Database import ARTICLE_COLUMNS, ArticleDatabase, DATABASE_PATH, normalize_url
+from News_Sources import CRAWL_DELAY, SOURCES, load_sources
+
+try:
+    import lxml  # noqa: F401  (much faster than the pure-Python parser)
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode 'br' responses)
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+# Configure logging to capture events for tracking (INFO level)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s-%(levelname)s-%(message)s')
+
+# Limits for the concurrent article-summary fetch stage
+MAX_FETCH_WORKERS = 16  # Total number of summaries fetched at the same time
+PER_HOST_LIMIT = 4  # Maximum number of simultaneous requests to a single host
+FETCH_TIME_BUDGET = 120  # Seconds allowed for fetching all summaries of one scrape
+CRAWL_WORKERS = 64  # Total number of requests in flight while crawling many sources in parallel
+
+# Settings for extracting summaries from article pages
+SUMMARY_PARAGRAPHS = 3  # Number of leading paragraphs that make up a summary
+STREAM_CHUNK_SIZE = 16 * 1024  # Bytes read at a time while streaming an article page
+# Tags that open or close a paragraph, and the starts of comments, scripts and styles, whose content is not markup
+PARAGRAPH_TOKENS = re.compile(rb'<(/?)p(?=[\s/>])|<!--|<(script|style)\b', re.IGNORECASE)
+RAW_TEXT_ENDS = {b'script': re.compile(rb'</script\s*>', re.IGNORECASE), b'style': re.compile(rb'</style\s*>', re.IGNORECASE),
+                 None: re.compile(rb'-->')}
+ARTICLE_TAGS = SoupStrainer(['p', 'meta', 'link'])  # The only tags parsed from an article page
+# Article pages are always parsed with 'html.parser', like the original extractor: on malformed markup
+# (unclosed <p>, a <div> inside a <p>) lxml repairs the tree differently and would change the summaries
+ARTICLE_PARSER = 'html.parser'
+# JSON-LD blocks are found without parsing the (often huge) other scripts of the page
+JSON_LD = re.compile(rb'<script[^>]*application/ld\+json[^>]*>(.*?)</script', re.IGNORECASE | re.DOTALL)
+# Meta tags (by property, name or itemprop, lowercased) that hold the publication date, most reliable first
+DATE_META_KEYS = ('article:published_time', 'datepublished', 'og:published_time', 'publish-date', 'pubdate',
+                  'publishdate', 'parsely-pub-date', 'sailthru.date', 'dc.date.issued', 'dc.date', 'date')
+ISO_DATE_PREFIX = re.compile(r'\d{4}-\d{2}-\d{2}')
+# Dates written out on listing pages, e.g. 'Sep 29, 2024, 20:52 IST' on Times of India
+TEXT_DATE_PREFIX = re.compile(r'([A-Za-z]{3})[A-Za-z]*\.? (\d{1,2}), (\d{4})')
+
+# Settings for the shared HTTP fetch layer
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+CONNECT_TIMEOUT = 5  # Seconds allowed to open a connection
+READ_TIMEOUT = 20  # Seconds allowed between bytes of the response
+MAX_RETRIES = 3  # Retries after the first attempt for 429/5xx responses and connection errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5  # Seconds; doubled on every retry, with full jitter
+BACKOFF_MAX = 30  # Upper bound for any single wait, including Retry-After
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # Upper bounds (seconds) of the latency histogram
+
+# Settings for the on-disk conditional-GET cache of article summaries (set the path to None to disable it)
+SUMMARY_CACHE_PATH = 'article_cache.sqlite'
+SUMMARY_CACHE_MAX_AGE = 7 * 24 * 3600  # Seconds since an entry was last validated before it is evicted
+SUMMARY_CACHE_MAX_BYTES = 50 * 1024 * 1024  # Total size of cached entries before the least recently used are evicted
+
+# Index of already scraped URLs used by the incremental mode
+SEEN_INDEX_PATH = 'seen_urls.sqlite'
+
+_session = None
+_session_lock = threading.Lock()
+_host_stats = {}
+_host_stats_lock = threading.Lock()
+_summary_cache = None
+_summary_cache_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Returns the HTTP session shared by all fetches of this module, creating it on first use.
+    The session keeps connections alive and pools them per host.
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=256, pool_maxsize=max(PER_HOST_LIMIT, MAX_FETCH_WORKERS))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update({
+                'User-Agent': USER_AGENT,
+                'Accept-Encoding': ACCEPT_ENCODING,
+                'Connection': 'keep-alive',
+            })
+            _session = session
+    return _session
+
+
+def _record(host, latency=None, nbytes=0, retry=False, error=False, parsed=None, parse_seconds=0.0):
+    """
+    Updates the per-host counters with the outcome of one attempt, or with the time spent parsing
+    one page of the kind `parsed` ('listing' or 'article').
+    """
+    with _host_stats_lock:
+        stats = _host_stats.setdefault(host, {
+            'requests': 0, 'bytes': 0, 'retries': 0, 'errors': 0, 'latency_seconds': 0.0,
+            'latency_histogram': [0] * (len(LATENCY_BUCKETS) + 1),
+            'parsed': {},  # Maps the kind of page to the number of pages parsed and the seconds spent on them
+        })
+        if retry:
+            stats['retries'] += 1
+        if error:
+            stats['errors'] += 1
+        stats['bytes'] += nbytes
+        if latency is not None:
+            stats['requests'] += 1
+            stats['latency_seconds'] += latency
+            stats['latency_histogram'][bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        if parsed is not None:
+            pages, seconds = stats['parsed'].get(parsed, (0, 0.0))
+            stats['parsed'][parsed] = (pages + 1, seconds + parse_seconds)
+
+
+def _retry_delay(attempt, response=None):
+    """
+    Computes how long to wait before the next attempt, honoring a Retry-After header if present.
+    Args:
+        attempt (int): The number of the attempt that just failed (0 for the first).
+        response (requests.Response): The failed response, if any.
+    Returns:
+        float: The delay in seconds.
+    """
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(delay, 0), BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _out_of_time(deadline, delay=0):
+    """
+    Returns whether waiting `delay` more seconds would reach the `deadline` (a time.monotonic() value, or None).
+    """
+    return deadline is not None and time.monotonic() + delay >= deadline
+
+
+def fetch(url, deadline=None, **kwargs):
+    """
+    Fetches a URL through the shared session with timeouts, retrying 429/5xx responses
+    and connection errors with jittered exponential backoff.
+    Args:
+        url (str): The URL to fetch.
+        deadline (float): A time.monotonic() value that no attempt or backoff may wait past, if any.
+        **kwargs: Extra arguments passed to `requests.Session.get`.
+    Returns:
+        requests.Response: The successful response.
+    Raises:
+        requests.RequestException: If the request still fails after all retries, or the deadline is reached.
+    """
+    host = urlparse(url).netloc
+    timeout = kwargs.get('timeout', (CONNECT_TIMEOUT, READ_TIMEOUT))
+    session = get_session()
+    for attempt in range(MAX_RETRIES + 1):
+        if deadline is not None:
+            # Shorten the timeouts to the time that is left
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout(f"No time left to fetch {url}")
+            kwargs['timeout'] = tuple(min(t, remaining) for t in timeout) if isinstance(timeout, tuple) \
+                else min(timeout, remaining)
+        else:
+            kwargs['timeout'] = timeout
+        start = time.perf_counter()
+        try:
+            response = session.get(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            _record(host, error=True)
+            delay = _retry_delay(attempt)
+            if attempt == MAX_RETRIES or _out_of_time(deadline, delay):
+                raise
+            _record(host, retry=True)
+            time.sleep(delay)
+            continue
+
+        # Read the body (unless streaming) and count the bytes received on the wire, i.e. compressed
+        nbytes = len(response.content) if not kwargs.get('stream') else 0
+        if hasattr(response.raw, 'tell'):
+            nbytes = response.raw.tell() or nbytes
+        _record(host, latency=time.perf_counter() - start, nbytes=nbytes)
+
+        if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+            delay = _retry_delay(attempt, response)
+            if not _out_of_time(deadline, delay):
+                _record(host, retry=True)
+                response.close()
+                logging.warning(f"Got HTTP {response.status_code} from {host}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+        response.raise_for_status()
+        return response
+
+
+def get_host_stats():
+    """
+    Returns a snapshot of the per-host fetch counters.
+    Returns:
+        dict: Maps each host to its requests, bytes, retries, errors, total latency, latency histogram
+              and the pages parsed of each kind.
+    """
+    with _host_stats_lock:
+        return {
+            host: dict(stats, latency_histogram=list(stats['latency_histogram']), parsed=dict(stats['parsed']))
+            for host, stats in _host_stats.items()
+        }
+
+
+def log_host_stats():
+    """
+    Logs a one-line summary of the fetch counters for every host.
+    """
+    for host, stats in get_host_stats().items():
+        logging.info(
+            f"{host}: {stats['requests']} requests, {stats['bytes']} bytes, "
+            f"{stats['retries']} retries, {stats['errors']} errors, latency histogram {stats['latency_histogram']}"
+        )
+
+
+class SummaryCache:
+    """
+    A persistent SQLite cache of article summaries, publication dates and canonical URLs keyed by URL.
+    Each entry keeps the ETag and Last-Modified validators of the page it was extracted from,
+    so the next fetch can be a conditional GET that returns 304 when the article is unchanged.
+    """
+
+    def __init__(self, path, max_age=SUMMARY_CACHE_MAX_AGE, max_bytes=SUMMARY_CACHE_MAX_BYTES):
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, summary TEXT NOT NULL, "
+            "size INTEGER NOT NULL, validated_at REAL NOT NULL, used_at REAL NOT NULL, "
+            "publication_date TEXT, canonical_url TEXT)"
+        )
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(summaries)")}
+        for column in ('publication_date', 'canonical_url'):
+            if column not in columns:  # Added after the first version of the cache
+                self.db.execute(f"ALTER TABLE summaries ADD COLUMN {column} TEXT")
+        self.db.execute("CREATE INDEX IF NOT EXISTS summaries_used_at ON summaries (used_at)")
+        self.db.commit()
+
+    def get(self, url):
+        """
+        Returns the cached entry for a URL as a dict with 'etag', 'last_modified', 'summary',
+        'publication_date' and 'canonical_url', or None.
+        """
+        with self.lock:
+            row = self.db.execute(
+                "SELECT etag, last_modified, summary, publication_date, canonical_url FROM summaries "
+                "WHERE url = ? AND validated_at >= ?",
+                (url, time.time() - self.max_age),
+            ).fetchone()
+        if row is None:
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'summary': row[2], 'publication_date': row[3],
+                'canonical_url': row[4]}
+
+    def put(self, url, etag, last_modified, summary, publication_date=None, canonical_url=None):
+        """
+        Stores (or replaces) the details extracted from a page together with its validators.
+        """
+        now = time.time()
+        size = (len(url) + len(summary) + len(etag or '') + len(last_modified or '')
+                + len(publication_date or '') + len(canonical_url or ''))
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO summaries (url, etag, last_modified, summary, size, validated_at, used_at, "
+                "publication_date, canonical_url) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, summary, size, now, now, publication_date, canonical_url),
+            )
+            self.db.commit()
+
+    def touch(self, url):
+        """
+        Marks an entry as revalidated (after a 304 response) and recently used.
+        """
+        now = time.time()
+        with self.lock:
+            self.db.execute("UPDATE summaries SET validated_at = ?, used_at = ? WHERE url = ?", (now, now, url))
+            self.db.commit()
+
+    def evict(self):
+        """
+        Removes entries that were not validated within `max_age` seconds, then the least recently
+        used entries until the total size is within `max_bytes`.
+        Returns:
+            int: The number of evicted entries.
+        """
+        with self.lock:
+            evicted = self.db.execute(
+                "DELETE FROM summaries WHERE validated_at < ?", (time.time() - self.max_age,)
+            ).rowcount
+            total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+            if total > self.max_bytes:
+                stale = []
+                for url, size in self.db.execute("SELECT url, size FROM summaries ORDER BY used_at"):
+                    if total <= self.max_bytes:
+                        break
+                    stale.append((url,))
+                    total -= size
+                self.db.executemany("DELETE FROM summaries WHERE url = ?", stale)
+                evicted += len(stale)
+            self.db.commit()
+        return evicted
+
+
+def get_summary_cache():
+    """
+    Returns the summary cache shared by this module, opening it on first use.
+    Returns:
+        SummaryCache: The shared cache, or None if SUMMARY_CACHE_PATH is None.
+    """
+    global _summary_cache
+    with _summary_cache_lock:
+        if _summary_cache is None and SUMMARY_CACHE_PATH:
+            _summary_cache = SummaryCache(SUMMARY_CACHE_PATH)
+    return _summary_cache
+
+
+def parse_published_date(value):
+    """
+    Normalizes a publication timestamp (ISO 8601, as in meta tags and JSON-LD, RFC 2822, or written out
+    as on listing pages) to an ISO date, keeping the day as published rather than converting it to UTC.
+    Args:
+        value (str): The timestamp, e.g. '2024-09-29T20:52:00-04:00' or 'Sep 29, 2024, 20:52 IST'.
+    Returns:
+        str: The date in 'YYYY-MM-DD' format, or None if the value is not a date.
+    """
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).date().isoformat()
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).date().isoformat()
+    except (TypeError, ValueError):
+        pass
+    # Timestamps in other formats often still start with the date
+    match = ISO_DATE_PREFIX.match(value)
+    if match:
+        try:
+            return datetime.strptime(match.group(0), "%Y-%m-%d").date().isoformat()
+        except ValueError:
+            pass
+    match = TEXT_DATE_PREFIX.match(value)
+    if match:
+        try:
+            return datetime.strptime(' '.join(match.groups()), "%b %d %Y").date().isoformat()
+        except ValueError:
+            pass
+    return None
+
+
+def _json_ld_date(data):
+    """
+    Returns the first 'datePublished' found in JSON-LD data, searching nested objects and lists.
+    """
+    if isinstance(data, dict):
+        if isinstance(data.get('datePublished'), str):
+            return data['datePublished']
+        data = list(data.values())
+    if isinstance(data, list):
+        for item in data:
+            found = _json_ld_date(item)
+            if found:
+                return found
+    return None
+
+
+def _published_date(soup, content):
+    """
+    Finds the publication date of an article page in its meta tags, then in its JSON-LD.
+    """
+    meta = {}
+    for tag in soup.find_all('meta', content=True):
+        key = tag.get('property') or tag.get('name') or tag.get('itemprop')
+        if key:
+            meta.setdefault(key.lower(), tag['content'])
+    for key in DATE_META_KEYS:
+        if meta.get(key):
+            date = parse_published_date(meta[key])
+            if date:
+                return date
+
+    for block in JSON_LD.finditer(content):
+        try:
+            value = _json_ld_date(json.loads(block.group(1)))
+        except ValueError:
+            continue  # Broken JSON-LD is common; try the next block
+        if value:
+            date = parse_published_date(value)
+            if date:
+                return date
+    return None
+
+
+def _canonical_url(soup, url=None):
+    """
+    Finds the canonical URL of an article page: its <link rel="canonical">, else its og:url.
+    """
+    for link in soup.find_all('link', rel='canonical', href=True):
+        return urljoin(url, link['href'].strip()) if url else link['href'].strip()
+    tag = soup.find('meta', property='og:url', content=True)
+    if tag:
+        return urljoin(url, tag['content'].strip()) if url else tag['content'].strip()
+    return None
+
+
+def _parse_article(content, url=None):
+    """
+    Parses the paragraphs and metadata of an article page in a single pass.
+    Returns:
+        tuple: The article details (see extract_article) and the number of paragraphs found.
+    """
+    start = time.perf_counter()
+    soup = BeautifulSoup(content, ARTICLE_PARSER, parse_only=ARTICLE_TAGS)
+    paragraphs = soup.find_all('p', limit=SUMMARY_PARAGRAPHS)
+    details = {
+        'summary': ' '.join([p.get_text().strip() for p in paragraphs]),  # Concatenate the first 3 paragraphs
+        'publication_date': _published_date(soup, content),
+        'canonical_url': _canonical_url(soup, url),
+    }
+    if url:
+        _record(urlparse(url).netloc, parsed='article', parse_seconds=time.perf_counter() - start)
+    return details, len(paragraphs)
+
+
+def extract_article(content, url=None):
+    """
+    Extracts the summary, publication date and canonical URL of an article page.
+    Args:
+        content (bytes): The HTML of the article page.
+        url (str): The URL of the page, to resolve a relative canonical URL against.
+    Returns:
+        dict: The 'summary' (the first paragraphs, or an empty string if there are none),
+              'publication_date' (ISO date) and 'canonical_url', the last two None if the page does not say.
+    """
+    return _parse_article(content, url)[0]
+
+
+def _scan_paragraphs(buffer, position, open_paragraphs, opened):
+    """
+    Follows the paragraphs opened and closed in `buffer` from `position` on, as html.parser nests them:
+    a <p> inside an unclosed <p> is nested in it, and a </p> closes the innermost open one (or nothing).
+    Args:
+        buffer (bytearray): The beginning of the page.
+        position (int): Where the previous scan stopped.
+        open_paragraphs (list): The numbers of the paragraphs still open, in the order they were opened; updated.
+        opened (int): The number of paragraphs opened so far.
+    Returns:
+        tuple: Where to resume scanning once more of the page arrived, and the number of paragraphs opened.
+    """
+    while True:
+        match = PARAGRAPH_TOKENS.search(buffer, position)
+        if match is None:
+            return max(position, len(buffer) - 8), opened  # A tag may be cut off at the end of the buffer
+        if match.group(0)[1:2] in b'/pP':
+            if match.group(1):
+                if open_paragraphs:
+                    open_paragraphs.pop()
+            else:
+                open_paragraphs.append(opened)
+                opened += 1
+            position = match.end()
+            continue
+        # Skip the comment, script or style, or wait for its end
+        end = RAW_TEXT_ENDS[match.group(2) and match.group(2).lower()].search(buffer, match.end())
+        if end is None:
+            return match.start(), opened
+        position = end.end()
+
+
+def extract_article_streaming(chunks, url=None):
+    """
+    Extracts the details of an article page (see extract_article) that arrives in chunks, and stops
+    reading as soon as the first paragraphs are complete. The metadata is in the <head>, before them.
+    While a leading paragraph is left unclosed, its text runs on into the rest of the page, so the whole
+    page is read, as the original extractor did.
+    Args:
+        chunks (iterable): The chunks of the article page, as bytes.
+        url (str): The URL of the page, to resolve a relative canonical URL against.
+    Returns:
+        dict: The article details.
+    """
+    buffer = bytearray()
+    position = opened = 0
+    open_paragraphs = []
+    for chunk in chunks:
+        buffer += chunk
+        position, opened = _scan_paragraphs(buffer, position, open_paragraphs, opened)
+        if opened >= SUMMARY_PARAGRAPHS and (not open_paragraphs or open_paragraphs[0] >= SUMMARY_PARAGRAPHS):
+            # The scan does not know every corner of HTML, so check that the paragraphs are really there
+            details, found = _parse_article(bytes(buffer), url)
+            if found >= SUMMARY_PARAGRAPHS:
+                return details
+    return extract_article(bytes(buffer), url)
+
+
+def extract_summary(content):
+    """
+    Extracts the first paragraphs of an article page as a summary.
+    Args:
+        content (bytes): The HTML of the article page.
+    Returns:
+        str: The concatenated text of the first paragraphs, or an empty string if there are none.
+    """
+    return extract_article(content)['summary']
+
+
+def extract_summary_streaming(chunks):
+    """
+    Extracts a summary from an article page that arrives in chunks (see extract_article_streaming).
+    Args:
+        chunks (iterable): The chunks of the article page, as bytes.
+    Returns:
+        str: The concatenated text of the first paragraphs, or an empty string if there are none.
+    """
+    return extract_article_streaming(chunks)['summary']
+
+
+def _read_until(chunks, deadline):
+    """
+    Yields the chunks of a response, raising requests.Timeout once the deadline (if any) is reached.
+    """
+    for chunk in chunks:
+        if _out_of_time(deadline):
+            raise requests.Timeout("Time budget spent while reading the response")
+        yield chunk
+
+
+def get_article_details(url, deadline=None):
+    """
+    Fetches an article page once and extracts its summary, publication date and canonical URL.
+    Args:
+        url (str): The URL of the article to fetch.
+        deadline (float): A time.monotonic() value by which to give up on the page, if any.
+    Returns:
+        dict: The 'summary' (a default message if it cannot be fetched), 'publication_date' (ISO date)
+              and 'canonical_url' of the article, the last two None if they are unknown.
+    """
+    unavailable = {'summary': "Summary not available.", 'publication_date': None, 'canonical_url': None}
+    try:
+        # Send the validators of the cached copy, if any, so an unchanged page comes back as 304
+        cache = get_summary_cache()
+        cached = cache.get(url) if cache else None
+        headers = {}
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        # Stream the article through the shared session (raises an exception for HTTP errors)
+        response = fetch(url, deadline, headers=headers, stream=True)
+        if response.status_code == 304 and cached:
+            response.close()
+            cache.touch(url)
+            return {key: cached[key] for key in unavailable}
+
+        # Read only as much of the page as is needed for the first 3 paragraphs
+        try:
+            details = extract_article_streaming(_read_until(response.iter_content(STREAM_CHUNK_SIZE), deadline), url)
+        finally:
+            _record(urlparse(url).netloc, nbytes=response.raw.tell())
+            response.close()
+
+        # Return the details if a summary is available; otherwise, provide a default message
+        if len(details['summary']) > 0:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if cache and (etag or last_modified):
+                cache.put(url, etag, last_modified, details['summary'], details['publication_date'],
+                          details['canonical_url'])
+            return details
+        else:
+            return dict(unavailable, publication_date=details['publication_date'],
+                        canonical_url=details['canonical_url'])
+    except Exception as e:
+        logging.error(f"Error fetching article summary: {str(e)}")
+        return unavailable
+
+
+def get_article_summary(url):
+    """
+    Fetches the article content from the provided URL and extracts the first 2-3 paragraphs as a summary.
+    Args:
+        url (str): The URL of the article to fetch.
+    Returns:
+        str: A short summary of the article or a default message if the summary cannot be fetched.
+    """
+    return get_article_details(url)['summary']
+
+
+class HostLimiter:
+    """
+    Politeness limits per host: at most `concurrency` requests in flight and at least `delay`
+    seconds between the starts of two requests. Hosts can get their own limits with `configure`.
+    """
+
+    def __init__(self, concurrency=PER_HOST_LIMIT, delay=CRAWL_DELAY):
+        self.concurrency = concurrency
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def configure(self, host, concurrency=None, delay=None):
+        """
+        Sets the limits of one host; None keeps the default. Must be called before the host is used.
+        """
+        with self.lock:
+            self.hosts[host] = {
+                'slots': threading.Semaphore(concurrency or self.concurrency),
+                'delay': self.delay if delay is None else delay,
+                'next_start': 0.0,
+            }
+
+    def _host(self, host):
+        """
+        Returns the limits and state of a host, with the default limits if it was not configured.
+        """
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = {'slots': threading.Semaphore(self.concurrency), 'delay': self.delay,
+                                    'next_start': 0.0}
+            return self.hosts[host]
+
+    def acquire(self, host, timeout=None):
+        """
+        Waits for a free slot on a host and for its crawl delay to pass.
+        Args:
+            host (str): The host about to be requested.
+            timeout (float): The longest time to wait, in seconds, or None to wait as long as needed.
+        Returns:
+            bool: True once the request may start, False if that would be after the timeout.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        state = self._host(host)
+        if not state['slots'].acquire(timeout=max(timeout, 0) if timeout is not None else None):
+            return False
+        with self.lock:
+            start = max(time.monotonic(), state['next_start'])
+            if deadline is not None and start > deadline:
+                state['slots'].release()
+                return False
+            state['next_start'] = start + state['delay']  # Reserve the start time before sleeping
+        time.sleep(max(start - time.monotonic(), 0))
+        return True
+
+    def release(self, host):
+        """
+        Frees the slot taken by `acquire` once the request is done.
+        """
+        self._host(host)['slots'].release()
+
+
+def fetch_article_details(urls, max_workers=MAX_FETCH_WORKERS, per_host_limit=PER_HOST_LIMIT,
+                          time_budget=FETCH_TIME_BUDGET, limiter=None):
+    """
+    Fetches the details (see get_article_details) of many articles concurrently using a bounded thread pool.
+    Each host gets at most `per_host_limit` requests in flight, and the whole batch must
+    finish within `time_budget` seconds; articles that are not fetched in time get the default message.
+    Args:
+        urls (list): The article URLs to fetch.
+        max_workers (int): The total number of worker threads.
+        per_host_limit (int): The maximum number of simultaneous requests per host.
+        time_budget (float): The total time allowed for the batch, in seconds.
+        limiter (HostLimiter): Politeness limits shared with other fetches, used instead of `per_host_limit`.
+    Returns:
+        list: The details of the articles, in the same order as `urls`.
+    """
+    unique_urls = list(dict.fromkeys(urls))  # Fetch each URL only once, even if it is listed twice
+    if not unique_urls:
+        return []
+
+    deadline = time.monotonic() + time_budget
+    unavailable = {'summary': "Summary not available.", 'publication_date': None, 'canonical_url': None}
+    if limiter is None:
+        limiter = HostLimiter(per_host_limit, delay=0)
+
+    def fetch_one(url):
+        host = urlparse(url).netloc
+        # Wait for a free slot on this host, but never past the deadline
+        if not limiter.acquire(host, timeout=deadline - time.monotonic()):
+            return unavailable
+        try:
+            # The request, its retries and the reading of the page all stop at the deadline
+            return get_article_details(url, deadline)
+        finally:
+            limiter.release(host)
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(unique_urls)))
+    try:
+        futures = {url: executor.submit(fetch_one, url) for url in unique_urls}
+        done, not_done = wait(futures.values(), timeout=time_budget)
+    finally:
+        # Do not wait for stragglers once the budget is spent; those in flight give up at the deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if not_done:
+        logging.warning(f"Time budget exceeded: {len(not_done)} of {len(unique_urls)} summaries were not fetched.")
+    details = {
+        url: future.result() if future in done else unavailable
+        for url, future in futures.items()
+    }
+    return [details[url] for url in urls]
+
+
+def fetch_article_summaries(urls, **kwargs):
+    """
+    Fetches the summaries of many articles concurrently (see fetch_article_details).
+    Args:
+        urls (list): The article URLs to fetch.
+        **kwargs: Extra arguments passed to `fetch_article_details`.
+    Returns:
+        list: The summaries, in the same order as `urls`.
+    """
+    return [details['summary'] for details in fetch_article_details(urls, **kwargs)]
+
+
+def content_hash(article):
+    """
+    Hashes the listing content of an article (its title), which is known before the summary is fetched.
+    Args:
+        article (dict): The article dictionary.
+    Returns:
+        str: The hex digest of the hash.
+    """
+    return hashlib.sha1(article['title'].strip().encode('utf-8')).hexdigest()
+
+
+class SeenIndex:
+    """
+    A persistent SQLite index of the articles that were already scraped,
+    mapping each normalized URL to its content hash and the time it was first seen.
+    """
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "url TEXT PRIMARY KEY, content_hash TEXT NOT NULL, first_seen REAL NOT NULL, last_seen REAL NOT NULL)"
+        )
+        self.db.commit()
+
+    def is_known(self, article):
+        """
+        Checks whether an article was already scraped with the same content.
+        """
+        row = self.db.execute(
+            "SELECT content_hash FROM seen WHERE url = ?", (normalize_url(article['url']),)
+        ).fetchone()
+        return row is not None and row[0] == content_hash(article)
+
+    def add(self, articles):
+        """
+        Records articles as scraped, keeping the first-seen time of URLs that were already known.
+        """
+        now = time.time()
+        self.db.executemany(
+            "INSERT INTO seen VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET content_hash = excluded.content_hash, last_seen = excluded.last_seen",
+            [(normalize_url(article['url']), content_hash(article), now, now) for article in articles],
+        )
+        self.db.commit()
+
+
+def drop_known_articles(articles, seen_index):
+    """
+    Removes the articles that are already in the seen index, as well as repeated URLs within the list.
+    Args:
+        articles (list): The list of article dictionaries collected from the listing pages.
+        seen_index (SeenIndex): The index of already scraped articles.
+    Returns:
+        list: The new or changed articles.
+    """
+    new_articles = []
+    listed = set()
+    for article in articles:
+        url = normalize_url(article['url'])
+        if url in listed or seen_index.is_known(article):
+            continue
+        listed.add(url)
+        new_articles.append(article)
+    logging.info(f"Skipping {len(articles) - len(new_articles)} already scraped articles.")
+    return new_articles
+
+
+def fill_article_summaries(articles, **kwargs):
+    """
+    Fills in the summary of every article whose summary is still missing (None), fetching all of them
+    concurrently. The same fetch gives the article's publication date, which replaces the date taken
+    from the listing page, and its canonical URL, which is stored as 'canonical_url' when the page has one.
+    Args:
+        articles (list): The list of article dictionaries collected from the listing pages.
+        **kwargs: Extra arguments passed to `fetch_article_details`.
+    """
+    pending = [article for article in articles if article['summary'] is None]
+    details = fetch_article_details([article['url'] for article in pending], **kwargs)
+    for article, article_details in zip(pending, details):
+        article['summary'] = article_details['summary']
+        if article_details['publication_date']:
+            article['publication_date'] = article_details['publication_date']
+        if article_details['canonical_url']:
+            article['canonical_url'] = article_details['canonical_url']
+
+
+def parse_listing(source, page, content):
+    """
+    Collects the articles of a listing page by applying the page's rules in order.
+    Args:
+        source (Source): The source the page belongs to.
+        page (ListingPage): The listing page.
+        content (bytes): The HTML of the listing page.
+    Returns:
+        list: A list of dictionaries containing the article title, summary (None if it still has to be fetched),
+              URL, source, and publication date.
+    """
+    soup = BeautifulSoup(content, HTML_PARSER)
+    today = datetime.now().strftime("%Y-%m-%d")
+    page_date = None
+    articles = []
+    for rule in page.rules:
+        for item in soup.select(rule.item):
+            link_element = item.select_one(rule.link) if rule.link else item
+            title_element = item.select_one(rule.title) if rule.title else link_element
+            if not (title_element and link_element and link_element.get('href')):
+                continue
+            title = title_element.text.strip()  # Extract the article title
+
+            if rule.dated and source.date_extractor is not None:
+                if page_date is None:
+                    # Get the publication date from the listing page, once per page, as an ISO date
+                    # like all other dates; the date filters of the API skip anything else
+                    page_date = parse_published_date(source.date_extractor(soup) or '') or today
+                publication_date = page_date
+            else:
+                publication_date = today  # Current date as the publication date
+
+            articles.append({
+                'title': title,
+                'summary': rule.summary,  # None is filled in by fill_article_summaries
+                'url': source.url(link_element.get('href')),
+                'source': source.label,
+                'publication_date': publication_date
+            })
+            logging.info(f"Scraped {source.label} {rule.kind}: {title}")
+    return articles
+
+
+def scrape_listing(source, page, limiter=None):
+    """
+    Fetches one listing page of a source and collects its articles, without their summaries.
+    Args:
+        source (Source): The source the page belongs to.
+        page (ListingPage): The listing page.
+        limiter (HostLimiter): The politeness limits to respect, if any.
+    Returns:
+        list: The articles of the page (see parse_listing), or an empty list if the page could not be scraped.
+    """
+    url = source.url(page.path)
+    host = urlparse(url).netloc
+    try:
+        logging.info(f"Scraping {source.label} from {url}...")
+        if limiter is not None:
+            limiter.acquire(host)
+        try:
+            response = fetch(url)
+        finally:
+            if limiter is not None:
+                limiter.release(host)
+        start = time.perf_counter()
+        articles = parse_listing(source, page, response.content)
+        _record(host, parsed='listing', parse_seconds=time.perf_counter() - start)
+
+        # If no articles are found, log a warning and save the page's HTML for debugging
+        if not articles:
+            logging.warning(f"No {source.label} articles found on {url}. Dumping page source for debugging.")
+            with open(f"{source.name}_page_source.html", "w", encoding="utf-8") as f:
+                f.write(response.text)
+        return articles
+    except Exception as e:
+        logging.error(f"Error scraping {source.label} from {url}: {str(e)}")
+        return []
+
+
+def source_limiter(sources, concurrency=PER_HOST_LIMIT):
+    """
+    Returns a HostLimiter with the politeness settings of every source applied to its host.
+    """
+    limiter = HostLimiter(concurrency)
+    for source in sources:
+        limiter.configure(urlparse(source.base_url).netloc, source.concurrency, source.crawl_delay)
+    return limiter
+
+
+def crawl_pages(pages, seen_index=None, limiter=None, max_workers=CRAWL_WORKERS, time_budget=FETCH_TIME_BUDGET):
+    """
+    Scrapes listing pages of any number of sources in parallel, then fetches the summaries
+    of all their articles together, so the time of a cycle depends on the slowest host
+    rather than on the number of sources. Every request, listing or summary, goes through
+    the same per-host politeness limits.
+    Args:
+        pages (list): (Source, ListingPage) pairs, highest priority first; requests start in this order.
+        seen_index (SeenIndex): If given, articles already in the index are skipped before their summaries are fetched.
+        limiter (HostLimiter): The politeness limits, or None for those of the pages' sources.
+        max_workers (int): The number of requests in flight at the same time, over all hosts.
+        time_budget (float): The time allowed for fetching the summaries, in seconds.
+    Returns:
+        list: The articles of all pages, in the order of `pages`.
+    """
+    if not pages:
+        return []
+    if limiter is None:
+        limiter = source_limiter({source.name: source for source, page in pages}.values())
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pages))) as executor:
+        listings = list(executor.map(lambda pair: scrape_listing(pair[0], pair[1], limiter), pages))
+    articles = [article for listing in listings for article in listing]
+
+    # In incremental mode, skip the articles that were already scraped
+    if seen_index is not None:
+        articles = drop_known_articles(articles, seen_index)
+
+    # Fetch the summaries of articles from all pages concurrently
+    fill_article_summaries(articles, limiter=limiter, max_workers=max_workers, time_budget=time_budget)
+    return articles
+
+
+def crawl_sources(sources, seen_index=None, limiter=None, max_workers=CRAWL_WORKERS):
+    """
+    Scrapes every listing page of the given sources once, in parallel (see crawl_pages).
+    Args:
+        sources (list): The sources to scrape.
+        seen_index (SeenIndex): If given, articles already in the index are skipped before their summaries are fetched.
+        limiter (HostLimiter): The politeness limits, or None for those of the sources.
+        max_workers (int): The number of requests in flight at the same time, over all hosts.
+    Returns:
+        list: A list of dictionaries containing the article title, summary, URL, source, and publication date.
+    """
+    pages = [(source, page) for source in sources for page in source.pages]
+    pages.sort(key=lambda pair: -pair[1].priority)  # Stable, so sources keep their order within a priority
+    return crawl_pages(pages, seen_index, limiter, max_workers)
+
+
+def scrape_source(source, seen_index=None):
+    """
+    Scrapes all listing pages of a single source for article titles, links, summaries, and publication dates.
+    Args:
+        source (Source): The source to scrape.
+        seen_index (SeenIndex): If given, articles already in the index are skipped before their summaries are fetched.
+    Returns:
+        list: A list of dictionaries containing the article title, summary, URL, source, and publication date.
+    """
+    return crawl_sources([source], seen_index)
+
+
+def scrape_toi(seen_index=None):
+    """
+    Scrapes the homepage of Times of India for article titles, links, summaries, and publication dates.
+    Args:
+        seen_index (SeenIndex): If given, articles already in the index are skipped before their summaries are fetched.
+    Returns:
+        list: A list of dictionaries containing the article title, summary, URL, source, and publication date.
+    """
+    return scrape_source(SOURCES['toi'], seen_index)
+
+
+def scrape_cnn(seen_index=None):
+    """
+    Scrapes the homepage and articles section of CNN for article titles, links, and summaries.
+    Args:
+        seen_index (SeenIndex): If given, articles already in the index are skipped before their summaries are fetched.
+    Returns:
+        list: A list of dictionaries containing the article title, summary, URL, source, and publication date.
+    """
+    return scrape_source(SOURCES['cnn'], seen_index)
+
+
+class CrawlScheduler:
+    """
+    Keeps scraping the listing pages of many sources, each at its own polling interval.
+    Every cycle scrapes the pages that are due, highest priority first, in parallel.
+
+    Args:
+        sources (list): The sources to scrape.
+        max_workers (int): The number of requests in flight at the same time, over all hosts.
+    """
+
+    def __init__(self, sources, max_workers=CRAWL_WORKERS):
+        self.pages = [(source, page) for source in sources for page in source.pages]
+        self.limiter = source_limiter(sources)
+        self.max_workers = max_workers
+        self.next_due = [0.0] * len(self.pages)  # Monotonic time at which each page is due again
+
+    def due_pages(self, now):
+        """
+        Returns the indexes of the pages that are due at `now`, highest priority first, then longest overdue.
+        """
+        due = [i for i, next_due in enumerate(self.next_due) if next_due <= now]
+        due.sort(key=lambda i: (-self.pages[i][1].priority, self.next_due[i]))
+        return due
+
+    def run_once(self, seen_index=None):
+        """
+        Scrapes the pages that are due now.
+        Args:
+            seen_index (SeenIndex): If given, articles already in the index are skipped before their summaries are fetched.
+        Returns:
+            list: The articles of the scraped pages.
+        """
+        now = time.monotonic()
+        due = self.due_pages(now)
+        for i in due:
+            source, page = self.pages[i]
+            self.next_due[i] = now + source.page_interval(page)
+        return crawl_pages([self.pages[i] for i in due], seen_index, self.limiter, self.max_workers)
+
+    def run(self, handle, seen_index=None, cycles=None):
+        """
+        Runs cycles until `cycles` have been run (or forever), sleeping until the next page is due in between.
+        Args:
+            handle (callable): Called with the articles of every cycle.
+            seen_index (SeenIndex): If given, articles already in the index are skipped before their summaries are fetched.
+            cycles (int): The number of cycles to run, or None to run forever.
+        """
+        cycle = 0
+        while cycles is None or cycle < cycles:
+            start = time.monotonic()
+            articles = self.run_once(seen_index)
+            logging.info(f"Crawl cycle {cycle + 1}: {len(articles)} articles in {time.monotonic() - start:.1f}s.")
+            handle(articles)
+            cycle += 1
+            if cycles is None or cycle < cycles:
+                time.sleep(max(min(self.next_due) - time.monotonic(), 0))
+
+
+def save_to_csv(articles, filename='news_articles.csv', append=False):
+    """
+    Saves the scraped articles to a CSV file.
+    Args:
+        articles (list): The list of articles to save.
+        filename (str): The name of the file to save the articles in.
+        append (bool): Whether to append to an existing file instead of rewriting it.
+    """
+    keys = ARTICLE_COLUMNS  # The canonical URL only goes to the article database
+    if append and os.path.exists(filename) and os.path.getsize(filename) > 0:
+        # Keep the column order of the existing file and do not repeat its header
+        with open(filename, 'r', newline='', encoding='utf-8') as f:
+            keys = next(csv.reader(f))
+        with open(filename, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=keys, extrasaction='ignore')
+            writer.writerows(articles)
+        logging.info(f"Appended {len(articles)} articles to {filename}.")
+        return
+
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=keys, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(articles)
+
+    logging.info(f"Saved {len(articles)} articles to {filename}.")
+
+
+def save_to_database(articles, path=DATABASE_PATH):
+    """
+    Saves the scraped articles to the article database, where the categorizer picks them up.
+    An article already stored under the same URL is only added again, as a new version, if it changed;
+    stored articles are never deleted or rewritten, so the API keeps serving them while the new ones are saved.
+    Args:
+        articles (list): The list of articles to save.
+        path (str): The path of the article database.
+    Returns:
+        int: The number of new or changed articles added.
+    """
+    count = ArticleDatabase(path).upsert_articles(articles)
+    logging.info(f"Added {count} new or changed articles to {path}.")
+    return count
+
+
+def save_articles(articles, seen_index=None, to_csv=False, path=DATABASE_PATH):
+    """
+    Saves scraped articles to the article database, or to news_articles.csv if `to_csv`.
+    Articles are always added to the stored ones in the database, as new versions of those with the same URL (see
+    save_to_database). In incremental mode (with a seen index), they are also recorded as seen.
+    Args:
+        articles (list): The list of articles to save.
+        seen_index (SeenIndex): The index of already scraped articles, in incremental mode.
+        to_csv (bool): Whether to save to news_articles.csv instead of the article database.
+        path (str): The path of the article database.
+    Returns:
+        int: The number of articles written.
+    """
+    if seen_index is not None:
+        # Leave articles whose summary could not be fetched for the next run
+        articles = [article for article in articles if article['summary'] != "Summary not available."]
+        if to_csv:
+            save_to_csv(articles, append=True)
+            count = len(articles)
+        else:
+            count = save_to_database(articles, path)
+        seen_index.add(articles)
+        return count
+    elif to_csv:
+        # Save to CSV
+        save_to_csv(articles)
+        return len(articles)
+    else:
+        # Save to the article database
+        return save_to_database(articles, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape news articles from Times of India, CNN and other sources.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Skip already scraped URLs and add only new articles")
+    parser.add_argument('--csv', action='store_true',
+                        help="Save the articles to news_articles.csv instead of the article database")
+    parser.add_argument('--sources', help="JSON file with the sources to scrape instead of the built-in ones")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep scraping every page at its polling interval, adding only new articles")
+    args = parser.parse_args()
+    sources = load_sources(args.sources) if args.sources else list(SOURCES.values())
+    seen_index = SeenIndex(SEEN_INDEX_PATH) if args.incremental or args.watch else None
+
+    if args.watch:
+        def save_cycle(articles):
+            save_articles(articles, seen_index, args.csv)
+            if get_summary_cache():
+                get_summary_cache().evict()
+
+        # Scrape the pages that are due, save their new articles and wait for the next page to be due
+        CrawlScheduler(sources).run(save_cycle, seen_index)
+    else:
+        # Scrape all sources in parallel
+        all_articles = crawl_sources(sources, seen_index)
+        save_articles(all_articles, seen_index, args.csv)
+    # Report how much was fetched from each host
+    log_host_stats()
+    # Keep the summary cache within its age and size limits
+    if get_summary_cache():
+        get_summary_cache().evict()
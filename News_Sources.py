@@ -0,0 +1,229 @@
+#News_Sources.py
+
+import json
+import logging
+from datetime import datetime
+from urllib.parse import urljoin
+
+# Default scheduling and politeness settings of a source
+POLL_INTERVAL = 15 * 60  # Seconds between two scrapes of a listing page
+CRAWL_DELAY = 0.0  # Minimum seconds between the starts of two requests to the same host
+FRONT_PAGE_PRIORITY = 10  # Priority of high-churn front pages, which are scraped before section pages
+
+
+def get_published_date_toi(soup):
+    """
+    Extracts the publication date from the Times of India article soup.
+    Args:
+        soup (BeautifulSoup): The BeautifulSoup object for the article page.
+    Returns:
+        str: The formatted publication date or a default message if not found.
+    """
+    try:
+        date_element = soup.find('div', class_='stroF AZ4wj')
+        if date_element:
+            date_text = date_element.find_all('span')[-1].get_text(strip=True)  # Get the last span for date
+            return date_text.replace("Updated: ", "").strip()  # Remove 'Updated: ' and strip whitespace
+    except Exception as e:
+        logging.error(f"Error fetching publication date for TOI: {str(e)}")
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def get_published_date_cnn(soup):
+    """
+    Extracts the publication date from the CNN article page.
+    Args:
+        soup (BeautifulSoup): Parsed HTML content of the CNN article page.
+    Returns:
+        str: The extracted publication date in 'YYYY-MM-DD' format.
+    """
+    try:
+        # Locate the date container in the HTML
+        date_element = soup.find('div', class_='timestamp vossi-timestamp')
+        if date_element:
+            # Extract the date string and convert it to a proper format
+            date_str = date_element.get_text(strip=True)
+            # Example format: "8:52 PM EDT, Sun September 29, 2024"
+            date_obj = datetime.strptime(date_str, "%I:%M %p %Z, %a %B %d, %Y")
+            # Format the date as 'YYYY-MM-DD'
+            formatted_date = date_obj.strftime("%Y-%m-%d")
+            return formatted_date
+        else:
+            return datetime.now().strftime("%Y-%m-%d")
+    except Exception as e:
+        logging.error(f"Error extracting CNN article date: {str(e)}")
+        return datetime.now().strftime("%Y-%m-%d")
+
+
+# Date extractors that source definitions in JSON files can refer to by name
+DATE_EXTRACTORS = {
+    'toi': get_published_date_toi,
+    'cnn': get_published_date_cnn,
+}
+
+
+class ListingRule:
+    """
+    Describes how to find one kind of article link on a listing page.
+
+    Args:
+        item (str): CSS selector of the element that holds one article.
+        link (str): CSS selector of the <a> tag within the item, or None if the item is the <a> tag itself.
+        title (str): CSS selector of the title element within the item, or None to use the text of the link.
+        summary (str): A fixed summary for these articles (e.g. videos), or None to fetch it from the article page.
+        dated (bool): Whether the source's date extractor applies; otherwise the article gets today's date.
+        kind (str): What the items are, for the logs (e.g. 'article' or 'video').
+    """
+
+    def __init__(self, item, link='a', title=None, summary=None, dated=True, kind='article'):
+        self.item = item
+        self.link = link
+        self.title = title
+        self.summary = summary
+        self.dated = dated
+        self.kind = kind
+
+
+class ListingPage:
+    """
+    A page of a source that lists articles.
+
+    Args:
+        path (str): The path of the page, relative to the source's base URL.
+        rules (list): The ListingRules that find the articles on the page, applied in order.
+        priority (int): Pages with a higher priority are scraped first in every cycle.
+        interval (float): Seconds between two scrapes of the page, or None for the source's interval.
+    """
+
+    def __init__(self, path, rules, priority=0, interval=None):
+        self.path = path
+        self.rules = rules
+        self.priority = priority
+        self.interval = interval
+
+
+class Source:
+    """
+    A news site the scraper collects articles from.
+
+    Args:
+        name (str): The short name of the source in the registry, e.g. 'toi'.
+        label (str): The name stored as the 'source' of its articles, e.g. 'Times of India'.
+        base_url (str): The URL that page paths and relative article links are resolved against.
+        pages (list): The ListingPages of the source.
+        date_extractor (callable): Returns the publication date (str) from the soup of a listing page, or None for today's date.
+        interval (float): Seconds between two scrapes of a listing page.
+        crawl_delay (float): Minimum seconds between the starts of two requests to the source's host.
+        concurrency (int): Maximum number of simultaneous requests to the source's host, or None for the scraper's default.
+    """
+
+    def __init__(self, name, label, base_url, pages, date_extractor=None, interval=POLL_INTERVAL,
+                 crawl_delay=CRAWL_DELAY, concurrency=None):
+        self.name = name
+        self.label = label
+        self.base_url = base_url
+        self.pages = pages
+        self.date_extractor = date_extractor
+        self.interval = interval
+        self.crawl_delay = crawl_delay
+        self.concurrency = concurrency
+
+    def url(self, path):
+        """
+        Resolves a page path or an article link against the base URL of the source.
+        """
+        return urljoin(self.base_url, path)
+
+    def page_interval(self, page):
+        """
+        Returns the number of seconds between two scrapes of one of the source's pages.
+        """
+        return page.interval if page.interval is not None else self.interval
+
+    def with_base_url(self, base_url):
+        """
+        Returns a copy of the source that is scraped from another base URL, e.g. a local fixture server.
+        """
+        return Source(self.name, self.label, base_url, self.pages, self.date_extractor, self.interval,
+                      self.crawl_delay, self.concurrency)
+
+
+# The registered sources by name, in the order they are scraped
+SOURCES = {}
+
+
+def register_source(source):
+    """
+    Adds a source to the registry, replacing any source with the same name.
+    Args:
+        source (Source): The source to register.
+    Returns:
+        Source: The registered source.
+    """
+    SOURCES[source.name] = source
+    return source
+
+
+def source_from_dict(definition):
+    """
+    Builds a source from its JSON definition. Rules and pages take the same keys as the
+    arguments of ListingRule and ListingPage; 'date_extractor' names one of DATE_EXTRACTORS.
+    Args:
+        definition (dict): The definition of the source.
+    Returns:
+        Source: The source.
+    """
+    definition = dict(definition)
+    pages = [
+        ListingPage(**dict(page, rules=[ListingRule(**rule) for rule in page['rules']]))
+        for page in definition.pop('pages')
+    ]
+    date_extractor = definition.pop('date_extractor', None)
+    if date_extractor is not None and date_extractor not in DATE_EXTRACTORS:
+        raise ValueError(f"Unknown date extractor: {date_extractor}")
+    return Source(pages=pages, date_extractor=DATE_EXTRACTORS.get(date_extractor), **definition)
+
+
+def load_sources(path):
+    """
+    Load the source definitions of a JSON file holding a list of sources (see source_from_dict).
+    Args:
+        path (str): The path of the JSON file.
+    Returns:
+        list: The sources, in the order of the file.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [source_from_dict(definition) for definition in json.load(f)]
+
+
+register_source(Source(
+    name='toi',
+    label='Times of India',
+    base_url='https://timesofindia.indiatimes.com',
+    date_extractor=get_published_date_toi,
+    pages=[
+        ListingPage('/', priority=FRONT_PAGE_PRIORITY, rules=[
+            ListingRule('div.col_l_6'),  # Standard articles in the grid
+            ListingRule('figure._YVis', title='figcaption', summary="Video content available.", dated=False,
+                        kind='video'),
+            ListingRule('div.linktype2', kind='additional article'),
+        ]),
+    ],
+))
+
+register_source(Source(
+    name='cnn',
+    label='CNN',
+    base_url='https://edition.cnn.com',
+    date_extractor=get_published_date_cnn,
+    pages=[
+        ListingPage('/', priority=FRONT_PAGE_PRIORITY, rules=[
+            # The headline sits inside the link of the article card
+            ListingRule('a:has(div.container__headline)', link=None,
+                        title='div.container__headline span.container__headline-text', dated=False),
+        ]),
+        ListingPage('/articles', rules=[
+            ListingRule('h3.cd__headline'),
+        ]),
+    ],
+))
@@ -0,0 +1,67 @@
+#conftest.py
+
+import csv
+import os
+import sys
+
+import pytest
+
+# The modules live at the root of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import News_Api
+from Article_Store import ArticleStore
+
+ADMIN_HEADERS = {'X-Admin-Token': 'test-token'}
+
+
+def write_categorized(path, articles):
+    """
+    Write categorized articles to a CSV file, as Content_Categorization does.
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(articles[0]))
+        writer.writeheader()
+        writer.writerows(articles)
+
+
+@pytest.fixture
+def make_article():
+    """
+    Return a function that builds a scraped article dict with the ARTICLE_COLUMNS keys, numbered `i`.
+    """
+    def make(i, **fields):
+        article = {
+            'title': f"Election results {i}",
+            'summary': f"Story {i} about the election and the new government.",
+            'url': f"https://news.example.com/story/{i}",
+            'source': 'Example News',
+            'publication_date': f"2024-09-{i % 28 + 1:02d}",
+        }
+        article.update(fields)
+        return article
+    return make
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Run the test from an empty directory, where the modules create their files.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def api(workdir, monkeypatch):
+    """
+    The API with a fresh store and load state, serving the files of the working directory.
+    Use it as `with TestClient(api.app)` after creating the files, so that they are loaded at startup.
+    Requests to /admin/reload must send ADMIN_HEADERS.
+    """
+    monkeypatch.setattr(News_Api, 'ADMIN_TOKEN', ADMIN_HEADERS['X-Admin-Token'])
+    monkeypatch.setattr(News_Api, 'store', ArticleStore([]))
+    monkeypatch.setattr(News_Api, 'load_state', dict(News_Api.load_state, source=None, offset=0, digest=None,
+                                                      fieldnames=None, stat=None, next_id=1, database=None))
+    News_Api.response_cache.clear()
+    return News_Api
@@ -0,0 +1,50 @@
+#test_api_cache.py
+
+from fastapi.testclient import TestClient
+
+from conftest import ADMIN_HEADERS, write_categorized
+from News_Api import ResponseCache
+
+
+def test_revalidated_requests_get_304(api, make_article):
+    write_categorized(api.ARTICLES_FILE, [dict(make_article(i), category='Politics') for i in range(3)])
+    with TestClient(api.app) as client:
+        response = client.get('/search', params={'q': 'Election'})
+        etag = response.headers['etag']
+        assert response.headers['cache-control'] == f"public, max-age={api.RESPONSE_MAX_AGE}"
+
+        # The same words, whatever their case and punctuation, share the validator
+        not_modified = client.get('/search', params={'q': 'election!'}, headers={'If-None-Match': etag})
+        assert not_modified.status_code == 304 and not_modified.content == b''
+        assert not_modified.headers['etag'] == etag
+        assert client.get('/search', params={'q': 'election', 'limit': 2}).headers['etag'] != etag
+
+        # New articles give new validators
+        write_categorized(api.ARTICLES_FILE, [dict(make_article(i), category='Politics') for i in range(4)])
+        client.post('/admin/reload', headers=ADMIN_HEADERS)
+        response = client.get('/search', params={'q': 'election'}, headers={'If-None-Match': etag})
+        assert response.status_code == 200 and len(response.json()) == 4
+
+
+def test_repeated_requests_are_served_from_the_cache(api, make_article):
+    write_categorized(api.ARTICLES_FILE, [dict(make_article(i), category='Politics') for i in range(3)])
+    with TestClient(api.app) as client:
+        before = client.get('/admin/status').json()['response_cache']
+        first = client.get('/articles', params={'category': 'Politics', 'limit': 2})
+        second = client.get('/articles', params={'category': 'POLITICS', 'limit': 2})
+        after = client.get('/admin/status').json()['response_cache']
+    assert second.content == first.content
+    assert second.headers['x-next-after'] == first.headers['x-next-after'] == '2'
+    assert (after['misses'] - before['misses'], after['hits'] - before['hits']) == (1, 1)
+
+
+def test_least_recently_used_responses_are_evicted():
+    cache = ResponseCache(max_entries=2, max_bytes=10)
+    cache.put('a', b'1234', {})
+    cache.put('b', b'1234', {})
+    cache.get('a')
+    cache.put('c', b'1234', {})  # Over both limits: 'b' is the least recently used
+    assert cache.get('b') is None and cache.get('a') is not None and cache.get('c') is not None
+    cache.put('d', b'12345678901', {})  # Larger than the whole cache, never stored
+    assert cache.get('d') is None
+    assert cache.report()['evictions'] == 1 and cache.report()['bytes'] == 8
@@ -0,0 +1,58 @@
+#test_api_pages.py
+
+import csv
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(api, make_article):
+    with open(api.ARTICLES_FILE, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(make_article(0)) + ['category'])
+        writer.writeheader()
+        writer.writerows(dict(make_article(i), category='Sports' if i % 3 == 0 else 'Politics') for i in range(25))
+    with TestClient(api.app) as client:
+        yield client
+
+
+def all_pages(client, path, **params):
+    ids, after = [], None
+    while True:
+        response = client.get(path, params=dict(params, **({'after': after} if after else {})))
+        ids += [article['id'] for article in response.json()]
+        after = response.headers.get('x-next-after')
+        if after is None:
+            return ids
+
+
+def test_pages_cover_every_article_once(client):
+    assert all_pages(client, '/articles', limit=10) == list(range(1, 26))
+    assert all_pages(client, '/articles', category='sports', limit=4) == \
+        [article['id'] for article in client.get('/articles', params={'category': 'sports'}).json()]
+    assert all_pages(client, '/search', q='election', limit=7) == \
+        [article['id'] for article in client.get('/search', params={'q': 'election'}).json()]
+
+
+def test_last_page_has_no_cursor(client):
+    response = client.get('/articles', params={'limit': 25})
+    assert len(response.json()) == 25
+    assert 'x-next-after' not in response.headers
+    assert client.get('/articles', params={'limit': 0}).status_code == 422
+
+
+def test_fields_are_projected(client):
+    articles = client.get('/articles', params={'fields': 'title, category', 'limit': 2}).json()
+    assert articles == [{'id': 1, 'title': "Election results 0", 'category': 'Sports'},
+                        {'id': 2, 'title': "Election results 1", 'category': 'Politics'}]
+    assert client.get('/articles', params={'fields': 'title,body'}).status_code == 400
+
+
+def test_ndjson_streams_the_same_articles(client):
+    params = {'category': 'politics', 'fields': 'title,url'}
+    response = client.get('/articles', params=dict(params, format='ndjson'))
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == client.get('/articles', params=params).json()
+    assert len(lines) == 16
@@ -0,0 +1,58 @@
+#test_api_reload.py
+
+import asyncio
+import os
+
+from fastapi.testclient import TestClient
+
+from conftest import ADMIN_HEADERS, write_categorized
+
+
+def test_reload_after_the_csv_is_replaced(api, make_article):
+    write_categorized(api.ARTICLES_FILE, [dict(make_article(i), category='Politics') for i in range(3)])
+    with TestClient(api.app) as client:
+        assert len(client.get('/articles').json()) == 3
+        write_categorized('categorized.tmp', [dict(make_article(i), category='Politics') for i in range(5)])
+        os.replace('categorized.tmp', api.ARTICLES_FILE)
+        assert client.post('/admin/reload', headers=ADMIN_HEADERS).json()['articles'] == 5
+        assert client.get('/articles/5').json()['title'] == "Election results 4"
+
+
+def test_reload_is_refused_without_the_token(api, make_article, monkeypatch):
+    write_categorized(api.ARTICLES_FILE, [dict(make_article(1), category='Politics')])
+    with TestClient(api.app) as client:
+        assert client.post('/admin/reload').status_code == 403
+        assert client.post('/admin/reload', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+
+    # Without a token, only local requests that do not come from a web page are accepted
+    monkeypatch.setattr(api, 'ADMIN_TOKEN', None)
+    with TestClient(api.app) as client:
+        assert client.post('/admin/reload').status_code == 403
+    with TestClient(api.app, client=('127.0.0.1', 50000)) as client:
+        assert client.post('/admin/reload', headers={'Origin': 'https://example.com'}).status_code == 403
+        assert client.post('/admin/reload').status_code == 200
+
+
+def test_watcher_survives_a_failed_reload(api, monkeypatch):
+    monkeypatch.setattr(api, 'RELOAD_INTERVAL', 0)
+    monkeypatch.setattr(api, 'source_stat', lambda: ('csv', (1, 1)))
+    calls = []
+
+    def load_articles():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("Unexpected failure")
+        api.load_state['stat'] = ('csv', (1, 1))
+
+    monkeypatch.setattr(api, 'load_articles', load_articles)
+
+    async def watch():
+        watcher = asyncio.create_task(api.watch_articles())
+        while len(calls) < 2 and not watcher.done():
+            await asyncio.sleep(0.01)
+        watcher.cancel()
+        return watcher
+
+    watcher = asyncio.run(asyncio.wait_for(watch(), timeout=10))
+    assert len(calls) == 2  # Kept watching after the failure, and loaded the files again
+    assert watcher.cancelled()
@@ -0,0 +1,72 @@
+#test_article_details.py
+
+import pytest
+
+import News_Scraper
+from News_Benchmark import serve_fixtures
+from News_Scraper import extract_article, extract_article_streaming, fill_article_summaries, parse_published_date
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2024-09-29T20:52:00-04:00', '2024-09-29'),  # The day as published, not in UTC
+    ('2024-09-29T23:30:00Z', '2024-09-29'),
+    ('2024-09-29', '2024-09-29'),
+    ('Sun, 29 Sep 2024 20:52:00 +0530', '2024-09-29'),
+    ('2024-09-29 20:52 IST', '2024-09-29'),
+    ('Sep 29, 2024, 20:52 IST', '2024-09-29'),
+    ('September 9, 2024', '2024-09-09'),
+    ('Updated yesterday', None),
+    ('2024-13-45', None),
+    ('', None),
+])
+def test_published_dates_are_normalized(value, expected):
+    assert parse_published_date(value) == expected
+
+
+def page(head, body="<p>One</p><p>Two</p><p>Three</p><p>Four</p>"):
+    return f"<html><head>{head}</head><body>{body}</body></html>".encode('utf-8')
+
+
+def test_meta_tags_are_read_most_reliable_first():
+    details = extract_article(page('<meta name="date" content="2024-01-01">'
+                                   '<meta property="article:published_time" content="2024-09-29T08:00:00+00:00">'))
+    assert details == {'summary': "One Two Three", 'publication_date': '2024-09-29', 'canonical_url': None}
+
+
+def test_json_ld_date_is_used_without_meta_tags():
+    head = ('<script type="application/ld+json">{broken</script>'
+            '<script type="application/ld+json">{"@graph": [{"@type": "WebPage"},'
+            ' {"@type": "NewsArticle", "datePublished": "2024-09-28T22:00:00-07:00"}]}</script>')
+    assert extract_article(page(head))['publication_date'] == '2024-09-28'
+    assert extract_article(page(''))['publication_date'] is None
+
+
+def test_canonical_url_is_resolved_against_the_page():
+    url = 'https://news.example.com/story/1?utm_source=feed'
+    assert extract_article(page('<link rel="canonical" href="/story/1">'), url)['canonical_url'] == \
+        'https://news.example.com/story/1'
+    assert extract_article(page('<meta property="og:url" content="https://www.example.com/1">'), url)['canonical_url'] == \
+        'https://www.example.com/1'
+
+
+def test_streaming_gives_the_same_details():
+    content = page('<meta property="article:published_time" content="2024-09-29">'
+                   '<link rel="canonical" href="https://news.example.com/1">', body="<p>A</p><p>B</p><p>C</p>" + "x" * 50000)
+    chunks = [content[i:i + 1000] for i in range(0, len(content), 1000)]
+    assert extract_article_streaming(chunks) == extract_article(content)
+
+
+def test_article_pages_replace_the_listing_date(workdir, make_article, monkeypatch):
+    monkeypatch.setattr(News_Scraper, 'SUMMARY_CACHE_PATH', None)  # Fetch the pages, not earlier results
+    monkeypatch.setattr(News_Scraper, '_summary_cache', None)
+    pages = {'/story/1': page('<meta property="article:published_time" content="2024-09-29T20:52:00-04:00">'
+                              '<link rel="canonical" href="/story/1">').decode('utf-8'),
+             '/story/2': page('').decode('utf-8')}
+    with serve_fixtures(pages) as (base_url,):
+        articles = [make_article(i, url=f"{base_url}/story/{i}", summary=None, publication_date='2024-10-01')
+                    for i in (1, 2)]
+        fill_article_summaries(articles)
+    assert [article['summary'] for article in articles] == ["One Two Three"] * 2
+    assert [article['publication_date'] for article in articles] == ['2024-09-29', '2024-10-01']
+    assert articles[0]['canonical_url'] == f"{base_url}/story/1"
+    assert 'canonical_url' not in articles[1]
@@ -0,0 +1,98 @@
+#test_categorization.py
+
+import csv
+
+import pytest
+
+import Content_Categorization
+
+
+@pytest.fixture
+def categorizer(workdir, monkeypatch):
+    """
+    Keyword categorization with a fresh result cache in the working directory.
+    """
+    monkeypatch.setattr(Content_Categorization, 'RESULT_CACHE_PATH', str(workdir / 'cache.sqlite'))
+    monkeypatch.setattr(Content_Categorization, 'result_cache', None)
+    monkeypatch.setattr(Content_Categorization, 'keyword_index', None)
+    Content_Categorization.set_classifier(None)
+    return Content_Categorization
+
+
+def test_cache_hits_do_not_load_the_models(categorizer, monkeypatch):
+    pairs = [("Election results", "The new government"), ("Cup final", "The team won the match")]
+    cache = categorizer.get_result_cache()
+    cache.put_many({cache.key(title, summary): {'category': category, 'entities': [], 'sentiment': 0.0}
+                    for (title, summary), category in zip(pairs, ['politics', 'sports'])})
+
+    def load_models():
+        raise AssertionError("The models were loaded for cached results")
+
+    monkeypatch.setattr(categorizer, 'load_models', load_models)
+    monkeypatch.setattr(categorizer, 'result_cache', None)  # Reopened, as in a new run
+    assert categorizer.categorize_batch(pairs) == ['politics', 'sports']
+    assert categorizer.keyword_index is None
+
+
+def test_cache_version_depends_on_the_categories(categorizer, monkeypatch):
+    version = categorizer.get_result_cache().version
+    monkeypatch.setattr(categorizer, 'categories', {'Politics': ['election']})
+    assert categorizer.get_result_cache().version != version
+
+
+def test_cache_version_is_computed_once_per_table(categorizer, monkeypatch):
+    calls = []
+    taxonomy_version = categorizer.taxonomy_version
+    monkeypatch.setattr(categorizer, 'taxonomy_version', lambda table: calls.append(table) or taxonomy_version(table))
+    for _ in range(3):
+        categorizer.get_result_cache()
+    assert len(calls) == 1
+    monkeypatch.setattr(categorizer, 'categories', {'Politics': ['election']})
+    categorizer.get_result_cache()
+    assert len(calls) == 2
+
+
+def test_cache_hits_are_recorded_in_batches(categorizer, monkeypatch):
+    monkeypatch.setattr(categorizer, 'RESULT_CACHE_TOUCH_BATCH', 3)
+    cache = categorizer.get_result_cache()
+    keys = [cache.key(f"Title {i}", "Summary") for i in range(3)]
+    cache.put_many({key: {'category': 'politics', 'entities': [], 'sentiment': 0.0} for key in keys})
+    cache.db.execute("UPDATE results SET used_at = 0")
+    cache.db.commit()
+
+    def used():
+        return sum(used_at > 0 for (used_at,) in cache.db.execute("SELECT used_at FROM results"))
+
+    cache.get_many(keys[:1])
+    cache.get_many(keys[1:2])
+    assert not cache.db.in_transaction and used() == 0  # Nothing written yet
+    cache.get_many(keys[2:])
+    assert not cache.db.in_transaction and used() == 3
+    cache.get_many(keys[:1])
+    cache.evict()
+    assert cache.touched == {}
+
+
+def test_output_file_is_replaced_in_one_step(categorizer, workdir, make_article):
+    with open('news_articles.csv', 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(make_article(0)))
+        writer.writeheader()
+        writer.writerows(make_article(i) for i in range(3))
+    with open('categorized.csv', 'w', encoding='utf-8') as f:
+        f.write("previous contents\n")
+
+    class Classifier:
+        def categorize(self, pairs):
+            # Readers still see the complete previous file while the articles are categorized
+            with open('categorized.csv', encoding='utf-8') as f:
+                assert f.read() == "previous contents\n"
+            return ['politics'] * len(pairs)
+
+    categorizer.set_classifier(Classifier())
+    try:
+        categorizer.categorize_articles('news_articles.csv', 'categorized.csv')
+    finally:
+        categorizer.set_classifier(None)
+    with open('categorized.csv', newline='', encoding='utf-8') as f:
+        assert [row['category'] for row in csv.DictReader(f)] == ['politics'] * 3
+    assert sorted(path.name for path in workdir.iterdir()) == ['categorized.csv', 'news_articles.csv']
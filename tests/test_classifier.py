@@ -0,0 +1,68 @@
+#test_classifier.py
+
+import random
+
+import numpy as np
+import pytest
+
+import Article_Classifier
+from Article_Classifier import CategoryClassifier, accuracy, hashed_counts
+
+TOPICS = {
+    'politics': "government election president vote senate policy minister parliament".split(),
+    'sports': "football match team coach championship goal league tennis".split(),
+    'technology': "software startup internet phone chip robot computer app".split(),
+}
+FILLER = "the a of and to in on with after before today report new".split()
+
+
+def corpus(n, seed):
+    rng = random.Random(seed)
+    pairs, categories = [], []
+    for i in range(n):
+        category = rng.choice(list(TOPICS) + ['general'])
+        words = rng.choices(FILLER, k=12)
+        if category != 'general':
+            words += rng.choices(TOPICS[category], k=4)
+        rng.shuffle(words)
+        title = ' '.join(words[:5]).capitalize()
+        pairs.append((title, ' '.join(words[5:])))
+        categories.append('general-' + title + ' news' if category == 'general' else category)
+    return pairs, categories
+
+
+def test_words_and_adjacent_pairs_are_counted_per_text():
+    counts = hashed_counts(["vote vote count", "count"])
+    assert counts.shape == (2, Article_Classifier.N_FEATURES)
+    # 'vote' twice, 'count', and the pairs 'vote vote' and 'vote count'; no pair spans the two texts
+    assert sorted(counts[0].data) == [1, 1, 1, 2]
+    assert counts[1].data.tolist() == [1]
+
+
+def test_classifier_learns_the_categories():
+    pairs, categories = corpus(600, seed=1)
+    classifier = CategoryClassifier.train(pairs, categories, min_document_frequency=2)
+    assert classifier.categories == ['general', 'politics', 'sports', 'technology']
+    held_out_pairs, held_out_categories = corpus(200, seed=2)
+    assert accuracy(classifier, held_out_pairs, held_out_categories) > 0.9
+
+    # Articles of no category get their own 'general' category, as with keyword scoring
+    title = "The report of today"
+    assert classifier.categorize([(title, "and a new one"), ("Vote", "the president won the election")]) == \
+        ['general-' + title + ' news', 'politics']
+    assert classifier.predict([]) == []
+
+
+def test_saved_classifier_predicts_the_same(workdir, monkeypatch):
+    pairs, categories = corpus(200, seed=3)
+    classifier = CategoryClassifier.train(pairs, categories, max_iterations=50, min_document_frequency=2)
+    classifier.save('model.npz')
+    loaded = CategoryClassifier.load('model.npz')
+    assert loaded.categories == classifier.categories
+    assert np.array_equal(loaded.weights, classifier.weights)
+    assert loaded.predict(pairs) == classifier.predict(pairs)
+
+    # A model hashed into another number of features cannot be used
+    monkeypatch.setattr(Article_Classifier, 'N_FEATURES', 2 ** 10)
+    with pytest.raises(ValueError):
+        CategoryClassifier.load('model.npz')
@@ -0,0 +1,62 @@
+#test_dedup.py
+
+import os
+import subprocess
+import sys
+
+from Article_Database import ArticleDatabase
+from Article_Dedup import dedup_articles
+
+
+def test_republished_article_replaces_its_earlier_version(workdir, make_article):
+    database = ArticleDatabase(str(workdir / 'news.sqlite'))
+    database.add_articles([make_article(1), make_article(1, url="https://news.example.com/story/1?utm_source=x")])
+    assert dedup_articles(database) == (2, 1)
+    database.set_categories([{'id': 1, 'category': 'Politics'}])
+
+    database.add_articles([make_article(1, title="Election results, updated",
+                                        url="https://news.example.com/story/1?ref=home")])
+    assert dedup_articles(database) == (1, 1)
+    earlier, copy, newer = database.get_many([1, 2, 3])
+    assert (earlier.title, earlier.category) == ("Election results 1", 'Politics')  # Left as it was served
+    assert earlier.cluster_id == copy.cluster_id == newer.cluster_id == 3
+    assert [row['id'] for row in database.uncategorized()] == [3]
+    assert [row.id for row in database.articles()] == []  # Until the new version is categorized
+    database.set_categories([{'id': 3, 'category': 'Politics'}])
+    assert [row.id for row in database.articles()] == [3]
+
+
+def test_syndicated_copy_never_replaces_the_original(workdir, make_article):
+    database = ArticleDatabase(str(workdir / 'news.sqlite'))
+    database.add_articles([
+        make_article(1, title="Storm hits the coast", source='CNN', url="https://cnn.com/storm",
+                     canonical_url="https://wire.com/storm"),
+        make_article(2, title="Coastal storm leaves thousands without power", source='Times of India',
+                     url="https://timesofindia.com/storm", canonical_url="https://wire.com/storm"),
+    ])
+    database.set_categories([{'id': 1, 'category': 'News'}])
+    assert dedup_articles(database) == (2, 1)
+    original, copy = database.get_many([1, 2])
+    assert (original.source, original.title, original.category) == ('CNN', "Storm hits the coast", 'News')
+    assert original.cluster_id == copy.cluster_id == 1
+    assert database.uncategorized() == []
+    assert [row.id for row in database.articles()] == [1]
+
+
+def test_copies_keep_their_category_but_are_not_served(workdir, make_article):
+    database = ArticleDatabase(str(workdir / 'news.sqlite'))
+    database.add_articles([dict(make_article(1), category='Politics'),
+                           dict(make_article(1, url="https://mirror.example.com/story/1"), category='Politics')])
+    assert dedup_articles(database) == (2, 1)
+    assert [row.category for row in database.get_many([1, 2])] == ['Politics', 'Politics']
+    assert [row.id for row in database.articles()] == [1]
+    assert database.count() == 1
+
+
+
+def test_dedup_does_not_import_the_scraper():
+    # A fresh interpreter, since the other tests may have imported the scraper already
+    code = "import sys, Article_Dedup; print(sorted({'News_Scraper', 'requests', 'bs4'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.strip() == '[]'
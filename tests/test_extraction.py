@@ -0,0 +1,26 @@
+#test_extraction.py
+
+import pytest
+
+from News_Benchmark import MALFORMED_PAGES, fast_extract_summary, legacy_extract_summary, synthetic_article_page
+from News_Scraper import extract_summary
+
+
+@pytest.mark.parametrize('page', MALFORMED_PAGES + [synthetic_article_page().encode('utf-8')])
+def test_summaries_match_the_original_extractor(page):
+    assert extract_summary(page) == legacy_extract_summary(page)
+    assert fast_extract_summary(page) == legacy_extract_summary(page)
+
+
+def test_unclosed_paragraphs():
+    assert extract_summary(MALFORMED_PAGES[0]) == 'OneTwoThreeFour TwoThreeFour ThreeFour'
+
+
+def test_block_inside_a_paragraph():
+    assert extract_summary(MALFORMED_PAGES[1]) == 'Intro block tail B C'
+
+
+def test_unclosed_leading_paragraph_is_read_to_the_end():
+    summary = fast_extract_summary(MALFORMED_PAGES[4])
+    assert summary == legacy_extract_summary(MALFORMED_PAGES[4])
+    assert summary.endswith('Later B C')
@@ -0,0 +1,41 @@
+#test_incremental.py
+
+import csv
+
+from News_Scraper import SeenIndex, drop_known_articles, save_articles
+
+
+def test_known_articles_are_skipped_unless_they_changed(workdir, make_article):
+    seen_index = SeenIndex('seen.sqlite')
+    seen_index.add([make_article(1), make_article(2)])
+
+    listed = [
+        make_article(1),
+        make_article(2, title="Election results 2, updated"),
+        make_article(3),
+        make_article(3, url="https://news.example.com/story/3?utm_source=feed"),  # The same story again
+    ]
+    new_articles = drop_known_articles(listed, seen_index)
+    assert [article['title'] for article in new_articles] == ["Election results 2, updated", "Election results 3"]
+
+
+def test_seen_index_keeps_the_first_seen_time(workdir, make_article):
+    seen_index = SeenIndex('seen.sqlite')
+    seen_index.add([make_article(1)])
+    first_seen = seen_index.db.execute("SELECT first_seen FROM seen").fetchone()[0]
+    seen_index.add([make_article(1, title="Election results 1, updated")])
+    assert seen_index.db.execute("SELECT first_seen FROM seen").fetchone()[0] == first_seen
+    assert seen_index.is_known(make_article(1, title="Election results 1, updated"))
+
+
+def test_incremental_runs_append_to_the_csv_file(workdir, make_article):
+    seen_index = SeenIndex('seen.sqlite')
+    save_articles([make_article(1), make_article(2)], seen_index, to_csv=True)
+    failed = make_article(4, summary="Summary not available.")
+    save_articles([make_article(3), failed], seen_index, to_csv=True)
+
+    with open('news_articles.csv', newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['title'] for row in rows] == [f"Election results {i}" for i in (1, 2, 3)]
+    # An article whose summary could not be fetched is tried again on the next run
+    assert drop_known_articles([failed], seen_index) == [failed]
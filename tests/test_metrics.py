@@ -0,0 +1,93 @@
+#test_metrics.py
+
+from fastapi.testclient import TestClient
+
+from conftest import write_categorized
+import Content_Categorization
+import News_Scraper
+from News_Metrics import MetricsRegistry
+from News_Pipeline import PipelineRunner
+
+DEFINITIONS = {
+    'jobs_total': ('counter', "Jobs run."),
+    'queue_length': ('gauge', "Jobs waiting."),
+    'job_seconds': ('histogram', "Job duration.", (0.1, 1)),
+}
+
+
+def test_metrics_are_rendered_in_the_prometheus_format():
+    registry = MetricsRegistry(DEFINITIONS)
+    registry.inc('jobs_total', source='a "quoted" name')
+    registry.inc('jobs_total', 2, source='a "quoted" name')
+    registry.set('queue_length', 2.5)
+    for value in (0.05, 0.5, 5):
+        registry.observe('job_seconds', value, stage='scrape')
+    assert registry.render() == (
+        '# HELP jobs_total Jobs run.\n'
+        '# TYPE jobs_total counter\n'
+        'jobs_total{source="a \\"quoted\\" name"} 3\n'
+        '# HELP queue_length Jobs waiting.\n'
+        '# TYPE queue_length gauge\n'
+        'queue_length 2.5\n'
+        '# HELP job_seconds Job duration.\n'
+        '# TYPE job_seconds histogram\n'
+        'job_seconds_bucket{stage="scrape",le="0.1"} 1\n'
+        'job_seconds_bucket{stage="scrape",le="1"} 2\n'
+        'job_seconds_bucket{stage="scrape",le="+Inf"} 3\n'
+        'job_seconds_sum{stage="scrape"} 5.55\n'
+        'job_seconds_count{stage="scrape"} 3\n'
+    )
+    assert MetricsRegistry(DEFINITIONS).render() == ''
+
+
+def test_saved_metrics_keep_adding_up(workdir):
+    registry = MetricsRegistry(DEFINITIONS)
+    registry.inc('jobs_total', stage='scrape')
+    registry.observe('job_seconds', 0.5)
+    registry.save('metrics.json')
+
+    loaded = MetricsRegistry.load('metrics.json', DEFINITIONS)
+    loaded.inc('jobs_total', stage='scrape')
+    loaded.observe('job_seconds', 2)
+    assert loaded.get('jobs_total', stage='scrape') == 2
+    assert 'job_seconds_count 2' in loaded.render()
+    assert MetricsRegistry.load('missing.json', DEFINITIONS).render() == ''
+
+
+def test_pipeline_run_records_its_stages(workdir, make_article, monkeypatch):
+    monkeypatch.setattr(News_Scraper, 'SUMMARY_CACHE_PATH', None)
+
+    class Classifier:
+        def categorize(self, pairs):
+            return ['politics'] * len(pairs)
+
+    monkeypatch.setattr(Content_Categorization, 'classifier', Classifier())
+    runner = PipelineRunner([], path='news.sqlite', metrics_path='metrics.json')
+    runner.run_once(lambda seen_index: [make_article(i) for i in range(3)])
+
+    def failing_crawl(seen_index):
+        raise RuntimeError("No network")
+
+    runner.run_once(failing_crawl)  # The other stages still run
+
+    metrics = MetricsRegistry.load('metrics.json')
+    assert metrics.get('news_pipeline_runs_total') == 2
+    assert metrics.get('news_pipeline_stage_rows_total', stage='scrape') == 3
+    assert metrics.get('news_pipeline_stage_rows_total', stage='categorize') == 3
+    assert metrics.get('news_pipeline_stage_last_rows', stage='categorize') == 0
+    assert metrics.get('news_pipeline_stage_errors_total', stage='scrape') == 1
+    assert metrics.get('news_scraped_articles_total', source='Example News') == 3
+
+
+def test_metrics_endpoint_serves_api_and_pipeline_metrics(api, make_article):
+    write_categorized(api.ARTICLES_FILE, [dict(make_article(i), category='Politics') for i in range(2)])
+    pipeline = MetricsRegistry(DEFINITIONS)
+    pipeline.inc('jobs_total', 7)
+    pipeline.save(api.PIPELINE_METRICS_PATH)
+    with TestClient(api.app) as client:
+        client.get('/articles')
+        response = client.get('/metrics')
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    assert 'news_api_articles 2\n' in response.text
+    assert 'news_api_requests_total{' in response.text
+    assert 'jobs_total 7\n' in response.text
@@ -0,0 +1,57 @@
+#test_search.py
+
+from Article_Database import ArticleRow
+from Article_Store import ArticleStore, SearchIndex
+
+
+def row(i, title, summary, category='Politics'):
+    return ArticleRow(i, title, summary, f"https://news.example.com/{i}", 'Example', '2024-09-01', category)
+
+
+ROWS = [
+    row(1, "Election day", "Voters went to the polls across the country."),
+    row(2, "Election results", "Election officials confirmed the election result."),
+    row(3, "Market news", "Stocks rose sharply in early trading on Monday after the election, analysts said."),
+    row(4, "Cup final", "The team won the match.", 'Sports'),
+    row(5, "Elections abroad", "Three countries hold elections this week."),
+]
+
+
+def test_more_relevant_articles_rank_first():
+    index = SearchIndex(ROWS)
+    ranked = index.search('election', prefix=False)
+    assert ranked[0] == 2  # The term occurs most often
+    assert ranked[-1] == 3  # Once, in a longer text
+    assert sorted(ranked) == [1, 2, 3, 5]  # 'elections' is stemmed to the same term
+
+
+def test_and_or_modes():
+    index = SearchIndex(ROWS)
+    assert index.search('election market') == [3]
+    assert set(index.search('election market', mode='or')) == {1, 2, 3, 5}
+    assert index.search('election football') == []
+    assert index.search('') == []
+
+
+def test_last_word_matches_as_a_prefix():
+    index = SearchIndex(ROWS)
+    assert index.search('cup fin') == [4]
+    assert index.search('cup fin', prefix=False) == []
+    assert set(index.search('elec')) == {1, 2, 3, 5}
+
+
+def test_extended_index_finds_the_new_articles():
+    index = SearchIndex(ROWS[:3])
+    extended = index.extended(ROWS[3:])
+    assert sorted(extended.search('election', prefix=False)) == [1, 2, 3, 5]
+    assert sorted(index.search('election', prefix=False)) == [1, 2, 3]
+    assert extended.search('match') == [4] and index.search('match') == []
+
+
+def test_search_pages_follow_the_ranking():
+    store = ArticleStore(ROWS)
+    ranked = [article.id for article in store.search('election')]
+    first = store.search('election', limit=2)
+    second = store.search('election', limit=2, after=first[-1].id)
+    assert [article.id for article in first + second] == ranked
+    assert store.search('election', after=4) == []  # The cursor no longer matches
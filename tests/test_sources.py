@@ -0,0 +1,87 @@
+#test_sources.py
+
+import json
+import time
+
+import pytest
+
+from News_Benchmark import serve_fixtures
+from News_Scraper import CrawlScheduler, crawl_sources
+from News_Sources import load_sources
+
+LISTING = """<html><body>
+<div class="story"><a href="/{name}-1">First {name} story</a></div>
+<div class="story"><a href="/{name}-2">Second {name} story</a></div>
+<div class="video"><a href="/{name}-video"><span>A {name} video</span></a></div>
+</body></html>"""
+
+
+def definition(name, base_url, **fields):
+    return dict({
+        'name': name,
+        'label': name.title(),
+        'base_url': base_url,
+        'pages': [
+            {'path': f'/{name}/latest', 'priority': 10, 'interval': 60, 'rules': [{'item': 'div.story'}]},
+            {'path': f'/{name}/videos', 'rules': [
+                {'item': 'div.video', 'title': 'span', 'summary': "Video content available.", 'dated': False,
+                 'kind': 'video'},
+            ]},
+        ],
+    }, **fields)
+
+
+def write_sources(path, definitions):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(definitions, f)
+    return load_sources(path)
+
+
+def test_sources_are_loaded_from_json(workdir):
+    first, second = write_sources('sources.json', [definition('alpha', 'http://alpha.example'),
+                                                   definition('beta', 'http://beta.example', interval=30)])
+    assert (first.name, first.label, second.interval) == ('alpha', 'Alpha', 30)
+    latest, videos = first.pages
+    assert (latest.priority, first.page_interval(latest), first.page_interval(videos)) == (10, 60, first.interval)
+    assert (videos.rules[0].title, videos.rules[0].kind, videos.rules[0].dated) == ('span', 'video', False)
+    assert first.url('/alpha-1') == 'http://alpha.example/alpha-1'
+
+    with pytest.raises(ValueError):
+        write_sources('sources.json', [definition('alpha', 'http://alpha.example', date_extractor='unknown')])
+
+
+def test_sources_are_scraped_in_parallel(workdir):
+    pages = {f'/{name}/{kind}': LISTING.format(name=name) for name in ('alpha', 'beta') for kind in ('latest', 'videos')}
+    latency = 0.3
+    with serve_fixtures(pages, latency=latency, hosts=2) as base_urls:
+        sources = write_sources('sources.json', [definition(name, base_url)
+                                                 for name, base_url in zip(('alpha', 'beta'), base_urls)])
+        start = time.perf_counter()
+        articles = crawl_sources(sources)
+        elapsed = time.perf_counter() - start
+
+    # Front pages first, then the other pages, sources in order within a priority
+    assert [(article['source'], article['title']) for article in articles] == [
+        ('Alpha', "First alpha story"), ('Alpha', "Second alpha story"),
+        ('Beta', "First beta story"), ('Beta', "Second beta story"),
+        ('Alpha', "A alpha video"), ('Beta', "A beta video"),
+    ]
+    assert articles[0]['summary'].startswith("Paragraph one of article alpha-1")
+    assert articles[-1]['summary'] == "Video content available."
+    # Four listing pages and four article pages, but only one round of each
+    assert elapsed < 4 * latency
+
+
+def test_scheduler_only_scrapes_pages_that_are_due(workdir):
+    pages = {f'/alpha/{kind}': LISTING.format(name='alpha') for kind in ('latest', 'videos')}
+    with serve_fixtures(pages) as (base_url,):
+        source, = write_sources('sources.json', [definition('alpha', base_url, interval=600)])
+        scheduler = CrawlScheduler([source])
+        assert [scheduler.pages[i][1].path for i in scheduler.due_pages(time.monotonic())] == \
+            ['/alpha/latest', '/alpha/videos']
+        assert len(scheduler.run_once()) == 3
+
+    now = time.monotonic()
+    assert scheduler.due_pages(now) == []
+    assert [scheduler.pages[i][1].path for i in scheduler.due_pages(now + 61)] == ['/alpha/latest']
+    assert len(scheduler.due_pages(now + 601)) == 2
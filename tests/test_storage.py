@@ -0,0 +1,70 @@
+#test_storage.py
+
+from fastapi.testclient import TestClient
+
+from conftest import ADMIN_HEADERS
+
+from Article_Database import ArticleDatabase
+from News_Scraper import save_articles
+
+
+def test_saving_a_scrape_keeps_the_stored_articles(workdir, make_article):
+    path = str(workdir / 'news.sqlite')
+    assert save_articles([make_article(i) for i in range(3)], path=path) == 3
+    database = ArticleDatabase(path)
+    database.set_categories([{'id': i, 'category': 'Politics'} for i in (1, 2, 3)])
+
+    # The same articles again, one of them with a new summary, and a new one
+    articles = [make_article(i) for i in range(4)]
+    articles[1]['summary'] = "An updated story about the election."
+    assert save_articles(articles, path=path) == 2
+
+    rows = {row.id: row for row in database.articles(categorized=False)}
+    assert sorted(rows) == [1, 2, 3, 4, 5]  # Nothing deleted, unchanged articles not added twice
+    assert rows[2].summary == "Story 1 about the election and the new government."
+    assert rows[2].category == 'Politics' and rows[2].cluster_id == 4  # Replaced by its new version
+    assert rows[4].summary == "An updated story about the election." and rows[4].category is None
+    assert [row.id for row in database.articles()] == [1, 3]  # Served until the new version is categorized
+    database.set_categories([{'id': 4, 'category': 'Politics'}])
+    assert [row.id for row in database.articles()] == [1, 3, 4]
+
+
+def test_api_keeps_serving_while_a_scrape_is_saved(api, make_article):
+    save_articles([make_article(i) for i in range(3)])
+    ArticleDatabase().set_categories([{'id': i, 'category': 'Politics'} for i in (1, 2, 3)])
+
+    with TestClient(api.app) as client:
+        assert len(client.get('/articles').json()) == 3
+        save_articles([make_article(i) for i in range(5)])
+        assert client.post('/admin/reload', headers=ADMIN_HEADERS).status_code == 200
+        assert client.get('/articles/3').json()['title'] == "Election results 2"
+        assert len(client.get('/articles').json()) == 3
+        assert len(client.get('/search', params={'q': 'election'}).json()) == 3
+
+
+def test_api_serves_the_loaded_articles_while_one_changes(api, make_article):
+    save_articles([make_article(i) for i in range(3)])
+    database = ArticleDatabase()
+    database.set_categories([{'id': i, 'category': 'Politics'} for i in (1, 2, 3)])
+
+    with TestClient(api.app) as client:
+        etag = client.get('/articles').headers['etag']
+        articles = [make_article(i) for i in range(3)]
+        articles[1]['summary'] = "An updated story about the vote count."
+        assert save_articles(articles) == 1
+
+        # Until the API reloads, it serves the articles as they were loaded
+        article = client.get('/articles/2')
+        assert article.status_code == 200
+        assert article.json()['summary'] == "Story 1 about the election and the new government."
+        assert article.json()['category'] == 'Politics'
+        assert [row['id'] for row in client.get('/search', params={'q': 'election'}).json()] == [1, 2, 3]
+        assert client.get('/articles', headers={'If-None-Match': etag}).status_code == 304
+
+        # The new version replaces it once categorized, with a new ETag
+        database.set_categories([{'id': 4, 'category': 'Politics'}])
+        client.post('/admin/reload', headers=ADMIN_HEADERS)
+        assert client.get('/articles/2').status_code == 404
+        assert client.get('/articles/4').json()['summary'] == "An updated story about the vote count."
+        assert [row['id'] for row in client.get('/search', params={'q': 'vote'}).json()] == [4]
+        assert client.get('/articles', headers={'If-None-Match': etag}).status_code == 200
@@ -0,0 +1,77 @@
+#test_store.py
+
+import random
+
+import pytest
+
+from Article_Database import ArticleRow
+from Article_Store import ArticleStore, parse_date
+
+CATEGORIES = ['Politics', 'Sports', 'Technology']
+
+
+@pytest.fixture
+def rows():
+    rng = random.Random(7)
+    rows = []
+    for i in range(1, 301):
+        published = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if i % 10 else "Unknown"
+        rows.append(ArticleRow(i * 2, f"Title {i}", f"Summary {i}", f"https://news.example.com/{i}", 'Example',
+                               published, rng.choice(CATEGORIES)))
+    return rows
+
+
+def brute_force(rows, category=None, start=None, end=None, after=None, limit=None):
+    matches = [row.id for row in rows
+               if (category is None or row.category.lower() == category.lower())
+               and (start is None or (parse_date(row.publication_date) or 0) >= start)
+               and (end is None or parse_date(row.publication_date) is not None and parse_date(row.publication_date) <= end)
+               and (after is None or row.id > after)]
+    return matches[:limit]
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'category': 'politics'},
+    {'category': 'SPORTS', 'limit': 7},
+    {'start': parse_date('2024-03-01'), 'end': parse_date('2024-05-31')},
+    {'category': 'Technology', 'start': parse_date('2024-06-01')},
+    {'category': 'Politics', 'end': parse_date('2024-01-31'), 'limit': 3},
+    {'category': 'Politics', 'start': parse_date('2024-01-01'), 'end': parse_date('2024-12-31'), 'after': 300},
+    {'after': 101, 'limit': 10},
+    {'category': 'Weather'},
+])
+def test_queries_match_a_linear_scan(rows, filters):
+    store = ArticleStore(rows, search=False)
+    assert [article.id for article in store.query(**filters)] == brute_force(rows, **filters)
+
+
+def test_pages_follow_each_other(rows):
+    store = ArticleStore(rows, search=False)
+    ids, after = [], None
+    while True:
+        page = store.query(category='sports', limit=25, after=after)
+        if not page:
+            break
+        ids += [article.id for article in page]
+        after = page[-1].id
+    assert ids == brute_force(rows, category='sports')
+
+
+def test_extended_store_leaves_the_original_unchanged(rows):
+    store = ArticleStore(rows[:200], search=False)
+    extended = store.extended(rows[200:])
+    assert len(store) == 200 and len(extended) == 300
+    assert store.get(rows[250].id) is None
+    assert extended.get(rows[250].id).title == rows[250].title
+    assert [article.id for article in extended.query(category='politics')] == brute_force(rows, category='politics')
+    assert [article.id for article in store.query(category='politics')] == brute_force(rows[:200], category='politics')
+    assert extended.version != store.version
+
+
+def test_articles_are_found_by_id(rows):
+    store = ArticleStore(rows, search=False)
+    article = store.get(rows[41].id)
+    assert (article.id, article.title, article.category, article.publication_date) == \
+        (rows[41].id, rows[41].title, rows[41].category, rows[41].publication_date)
+    assert store.get(rows[41].id + 1) is None  # Ids are even